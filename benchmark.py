@@ -0,0 +1,1093 @@
+#!/usr/bin/env python3
+"""
+Benchmark
+
+Offline end-to-end timing of the launch scripts. A sandbox stands in for a
+cluster on the local machine:
+
+    - the Dropbear binary from dropbear/ runs as the login node on
+      127.0.0.1, reached through an ssh wrapper and an ssh_config that map
+      every cluster host name onto it
+    - fake_slurm.py provides squeue, sbatch, srun and friends on the login
+      node's PATH, with a configurable controller delay and job-state script
+    - batch jobs run on the same machine, so remote_sshd.sh's job starts a
+      real Dropbear "compute node" that the benchmark then logs in to
+    - fake VS Code and Cursor CLI releases are served from file:// URLs
+
+tunnel.sh, remote_sshd.sh, pls.sh, deploy_remote_tools.sh and the GUI's
+script runner then run end to end from a copy of this repository. Each
+scenario records wall time, ssh round trips (ssh invocations other than
+local -O control commands), new SSH connections, bytes on the wire (every
+connection passes a counting relay) and the phase spans from
+phase_timing.sh.
+
+Logging in to Dropbear needs a key: the benchmark adds a generated key to
+~/.ssh/authorized_keys for the duration of the run and removes it again
+when it exits, also on SIGTERM or SIGHUP. The system sshd reads that file
+too, so the key's forced command refuses connections from anywhere but the
+loopback interface and the key gets no pty. Past that check it is a full
+shell in the sandbox environment. The private key is deleted with the
+sandbox, or on its own when the sandbox is kept.
+
+Usage:
+    python benchmark.py [--scenario NAME ...] [--repeat N] [--cold]
+                        [--queue-wait SECONDS] [--slurm-delay SECONDS]
+                        [--job-states SCRIPT] [--json PATH]
+                        [--baseline PATH] [--output PATH] [--keep]
+"""
+
+import argparse
+import collections
+import getpass
+import glob
+import json
+import os
+import selectors
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+CLUSTER = "bluehive3"
+LOGIN_HOSTS = "*.circ.rochester.edu"
+COMPUTE_HOST = "bluehive_compute3"
+KEY_TAG = "unix-scripts-benchmark"
+
+SCRIPT_TIMEOUT = 180  # Seconds a script may run before the scenario fails
+TUNNEL_TIMEOUT = 60  # Seconds allowed for the tunnel to announce itself
+LISTEN_TIMEOUT = 5  # Seconds allowed for Dropbear to start listening
+RELAY_FLUSH_INTERVAL = 0.1  # Seconds between byte count updates of a relay
+REGRESSION_TOLERANCE = 0.25  # Allowed wall time growth over a baseline
+REGRESSION_SLACK = 0.2  # Seconds of wall time growth always tolerated
+
+QUEUE_WAIT = 2.0  # Seconds fake jobs stay PENDING by default
+TUNNEL_DELAY = 0.5  # Seconds the fake tunnel takes to announce itself
+TOOL_VERSION = "1.95.0"  # Version in the fake CLI release URLs
+
+RESOURCES = ["-c", "4", "-g", "1", "-m", "16", "-t", "1"]
+
+# name: description; scenarios run in this order
+SCENARIOS = collections.OrderedDict(
+    [
+        ("deploy_cold", "deploy_remote_tools.sh --all into an empty root"),
+        ("deploy_warm", "deploy_remote_tools.sh --all with nothing to do"),
+        ("pls", "pls.sh cluster status"),
+        ("tunnel", "tunnel.sh -n until the tunnel prints its link"),
+        ("sshd", "remote_sshd.sh with a new job, then an SSH login"),
+        ("sshd_reuse", "remote_sshd.sh reusing the running job"),
+        ("gui_sshd", "remote_sshd.sh with a new job through the GUI runner"),
+    ]
+)
+
+Measurement = collections.namedtuple(
+    "Measurement",
+    ["scenario", "ok", "wall", "ssh_calls", "connections", "bytes", "phases", "error"],
+)
+
+# Login shell of the fake cluster, installed as the forced command of the
+# benchmark key: every session gets the fake Slurm commands and the sandbox
+# home, whatever node it lands on. The bundled Dropbear rejects keys with a
+# from= option, so the shell enforces the loopback restriction itself.
+REMOTE_SHELL = """#!/bin/bash
+case "${{SSH_CONNECTION%% *}}" in
+    127.0.0.1 | ::1 | ::ffff:127.0.0.1) ;;
+    *)
+        echo "The benchmark key only logs in over the loopback interface" >&2
+        exit 1
+        ;;
+esac
+source "{sandbox}/cluster.env"
+cd "$HOME" || exit 1
+if [ -n "$SSH_ORIGINAL_COMMAND" ]; then
+    exec bash -c "$SSH_ORIGINAL_COMMAND"
+fi
+exec bash
+"""
+
+# Counts every ssh invocation and points it at the sandbox: its own
+# ssh_config and control sockets instead of the user's
+SSH_WRAPPER = """#!/bin/bash
+printf "%s\\n" "$*" >> "{sandbox}/ssh_calls.log"
+args=()
+for arg in "$@"; do
+    case "$arg" in
+        ControlPath=/tmp/ssh_*)
+            arg="ControlPath={sandbox}/ctl/${{arg#ControlPath=/tmp/}}"
+            ;;
+    esac
+    args+=("$arg")
+done
+exec {ssh} -F "{sandbox}/ssh_config" "${{args[@]}}"
+"""
+
+SSH_CONFIG = """Host {login_hosts}
+    Hostname 127.0.0.1
+    Port {port}
+    ProxyCommand {python} {benchmark} --relay %h %p {sandbox}/traffic
+
+Host bhg* bhc* bhx*
+    Hostname 127.0.0.1
+
+Host *
+    User {user}
+    IdentityFile {sandbox}/id_ed25519
+    IdentitiesOnly yes
+    UserKnownHostsFile {sandbox}/known_hosts
+    StrictHostKeyChecking no
+    BatchMode yes
+    LogLevel error
+"""
+
+# The benchmark logs in with a key, so sshpass only has to run ssh
+SSHPASS_SHIM = """#!/bin/bash
+[ "$1" = "-e" ] && shift
+exec "$@"
+"""
+
+FAKE_CLI = """#!/bin/bash
+case "$1" in
+    --version)
+        echo "{tool} {version} (benchmark stand-in)"
+        ;;
+    tunnel)
+        name=""
+        while [ $# -gt 0 ]; do
+            [ "$1" = "--name" ] && name="$2"
+            shift
+        done
+        sleep "${{BENCH_TUNNEL_DELAY:-0}}"
+        echo "Open this link in your browser https://vscode.dev/tunnel/$name"
+        exec sleep 86400
+        ;;
+esac
+"""
+
+
+def relay(host, port, traffic_dir):
+    """
+    Copy bytes between stdin/stdout and a TCP connection, counting them.
+
+    Used as the ssh ProxyCommand. The running totals are kept in
+    traffic_dir/<pid> as "sent received" so they can be read while the
+    connection is still open.
+
+    Args:
+        host (str): Host to connect to
+        port (str): Port to connect to
+        traffic_dir (str): Directory for the byte counts
+    """
+    connection = socket.create_connection((host, int(port)))
+    counts_path = os.path.join(traffic_dir, str(os.getpid()))
+    counts = [0, 0]
+    flushed = list(counts)
+    last_flush = 0.0
+
+    def flush():
+        with open(counts_path + ".tmp", "w") as f:
+            f.write(f"{counts[0]} {counts[1]}\n")
+        os.replace(counts_path + ".tmp", counts_path)
+        flushed[:] = counts
+
+    selector = selectors.DefaultSelector()
+    selector.register(0, selectors.EVENT_READ, "up")
+    selector.register(connection, selectors.EVENT_READ, "down")
+    closed = False
+    try:
+        while not closed:
+            for key, _ in selector.select(RELAY_FLUSH_INTERVAL):
+                if key.data == "up":
+                    data = os.read(0, 65536)
+                    if data:
+                        connection.sendall(data)
+                        counts[0] += len(data)
+                    else:
+                        # ssh is done sending; let the server finish
+                        selector.unregister(0)
+                        connection.shutdown(socket.SHUT_WR)
+                    continue
+
+                data = connection.recv(65536)
+                if not data:
+                    closed = True
+                    break
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(1, view) :]
+                counts[1] += len(data)
+
+            if (
+                counts != flushed
+                and time.monotonic() - last_flush >= RELAY_FLUSH_INTERVAL
+            ):
+                flush()
+                last_flush = time.monotonic()
+    except OSError:
+        pass
+    finally:
+        flush()
+
+
+def free_port():
+    """Return a TCP port that is free on the loopback interface right now."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def write_executable(path, text):
+    """Write a script and make it executable."""
+    with open(path, "w") as f:
+        f.write(text)
+    os.chmod(path, 0o755)
+
+
+def median(values):
+    """Return the median of a list, or 0 for an empty one."""
+    return statistics.median(values) if values else 0
+
+
+class Sandbox:
+    """
+    A fake cluster and a copy of the repository to run the scripts against.
+
+    setup() builds everything and start() brings up the login node; close()
+    stops every process the benchmark started, removes its key from
+    ~/.ssh/authorized_keys and deletes the sandbox unless it is kept.
+    """
+
+    def __init__(self, queue_wait, slurm_delay, job_states, tunnel_delay, keep):
+        """
+        Initialize the sandbox.
+
+        Args:
+            queue_wait (float): Seconds fake jobs stay PENDING
+            slurm_delay (float): Seconds every fake Slurm command waits first
+            job_states (str): fake_slurm.py state script; overrides queue_wait
+            tunnel_delay (float): Seconds the fake tunnel takes to start
+            keep (bool): Keep the sandbox directory for inspection
+        """
+        self.user = getpass.getuser()
+        self.ssh = shutil.which("ssh")
+        self.job_states = job_states or f"PENDING:{queue_wait:g},RUNNING"
+        self.slurm_delay = slurm_delay
+        self.tunnel_delay = tunnel_delay
+        self.keep = keep
+
+        # Short, so control socket paths stay within the socket path limit
+        self.path = tempfile.mkdtemp(prefix="ucb.", dir="/tmp")
+        self.repo = os.path.join(self.path, "repo")
+        self.shared_root = os.path.join(self.path, "shared")
+        self.cluster_home = os.path.join(self.path, "cluster_home")
+        self.local_home = os.path.join(self.path, "local_home")
+        self.slurm_dir = os.path.join(self.path, "slurm")
+        self.traffic_dir = os.path.join(self.path, "traffic")
+        self.logs_dir = os.path.join(self.path, "logs")
+        self.port = None
+        self.dropbear = None
+        self.key_line = None
+
+    def setup(self):
+        """Create the sandbox, the fake cluster and the repository copy."""
+        if not self.ssh:
+            raise RuntimeError("ssh is required")
+        for name in ("bin", "ctl", "tmp", "traffic", "logs", "releases", "slurm/bin"):
+            os.makedirs(os.path.join(self.path, name), exist_ok=True)
+
+        shutil.copytree(
+            REPO_DIR,
+            self.repo,
+            ignore=shutil.ignore_patterns(
+                ".git", "deprecated", "__pycache__", "user_password.txt", "*.jsonl"
+            ),
+        )
+        with open(os.path.join(self.repo, "user_password.txt"), "w") as f:
+            f.write(f"{self.user}\nbenchmark\nREMOTE_SHARED_ROOT={self.shared_root}\n")
+        for name in ("sshpass_linux_amd64", "sshpass_mac_arm64"):
+            write_executable(os.path.join(self.repo, name), SSHPASS_SHIM)
+
+        subprocess.run(
+            [
+                sys.executable,
+                os.path.join(self.repo, "fake_slurm.py"),
+                "--install",
+                os.path.join(self.slurm_dir, "bin"),
+            ],
+            env=dict(os.environ, FAKE_SLURM_DIR=self.slurm_dir),
+            check=True,
+        )
+        write_executable(
+            os.path.join(self.path, "remote_shell"),
+            REMOTE_SHELL.format(sandbox=self.path),
+        )
+        write_executable(
+            os.path.join(self.path, "bin", "ssh"),
+            SSH_WRAPPER.format(sandbox=self.path, ssh=self.ssh),
+        )
+        self.write_cluster_env()
+        self.write_releases()
+
+        subprocess.run(
+            [
+                "ssh-keygen",
+                "-q",
+                "-t",
+                "ed25519",
+                "-N",
+                "",
+                "-C",
+                KEY_TAG,
+                "-f",
+                os.path.join(self.path, "id_ed25519"),
+            ],
+            check=True,
+        )
+        subprocess.run(
+            [
+                os.path.join(REPO_DIR, "dropbear", "bin", "dropbearkey"),
+                "-t",
+                "ed25519",
+                "-f",
+                os.path.join(self.path, "login_host_key"),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        self.authorize_key()
+
+    def write_cluster_env(self):
+        """Write the environment every fake cluster session starts with."""
+        os.makedirs(os.path.join(self.cluster_home, "logs"), exist_ok=True)
+        with open(os.path.join(self.path, "cluster.env"), "w") as f:
+            f.write(
+                f'export PATH="{self.slurm_dir}/bin:$PATH"\n'
+                f'export HOME="{self.cluster_home}"\n'
+                f'export TMPDIR="{self.path}/tmp"\n'
+                f'export FAKE_SLURM_DIR="{self.slurm_dir}"\n'
+                f'export FAKE_SLURM_DELAY="{self.slurm_delay:g}"\n'
+                f'export FAKE_SLURM_STATES="{self.job_states}"\n'
+                f'export BENCH_TUNNEL_DELAY="{self.tunnel_delay:g}"\n'
+            )
+
+    def write_releases(self):
+        """Build the fake VS Code and Cursor CLI release archives."""
+        for tool in ("code", "cursor"):
+            build_dir = os.path.join(self.path, "releases", tool)
+            os.makedirs(build_dir, exist_ok=True)
+            write_executable(
+                os.path.join(build_dir, tool),
+                FAKE_CLI.format(tool=tool, version=TOOL_VERSION),
+            )
+            with tarfile.open(self.release_path(tool), "w:gz") as archive:
+                archive.add(os.path.join(build_dir, tool), arcname=tool)
+
+    def release_path(self, tool):
+        """Return the path of a fake CLI release archive."""
+        return os.path.join(self.path, "releases", f"{tool}-cli-{TOOL_VERSION}.tar.gz")
+
+    def authorize_key(self):
+        """Allow the benchmark key to log in to a sandbox shell over loopback."""
+        ssh_dir = os.path.expanduser("~/.ssh")
+        os.makedirs(ssh_dir, mode=0o700, exist_ok=True)
+        with open(os.path.join(self.path, "id_ed25519.pub")) as f:
+            public_key = f.read().strip()
+        remote_shell = os.path.join(self.path, "remote_shell")
+        self.key_line = (
+            f'command="{remote_shell}",no-pty,no-agent-forwarding,'
+            "no-X11-forwarding "
+            f"{public_key}:{self.path}"
+        )
+        path = os.path.join(ssh_dir, "authorized_keys")
+        with open(path, "a") as f:
+            f.write(self.key_line + "\n")
+        os.chmod(path, 0o600)
+
+    def revoke_key(self):
+        """Remove the benchmark key from ~/.ssh/authorized_keys."""
+        if self.key_line is None:
+            return
+        path = os.path.expanduser("~/.ssh/authorized_keys")
+        try:
+            with open(path) as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        kept = [line for line in lines if line.rstrip("\n") != self.key_line]
+        tmp_path = f"{path}.{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            f.writelines(kept)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+        self.key_line = None
+
+    def start(self):
+        """Start the login node's Dropbear, retrying taken ports."""
+        pid_file = os.path.join(self.path, "dropbear.pid")
+        # Sessions inherit this environment (-e). With SHLVL set, bash does
+        # not source the local user's ~/.bashrc for every SSH command, which
+        # would otherwise dominate the timings of a fake cluster
+        env = {"PATH": os.environ.get("PATH", "/usr/bin:/bin"), "SHLVL": "1"}
+        for _ in range(5):
+            port = free_port()
+            with open(os.path.join(self.logs_dir, "dropbear.log"), "ab") as log:
+                process = subprocess.Popen(
+                    [
+                        os.path.join(REPO_DIR, "dropbear", "sbin", "dropbear"),
+                        "-F",
+                        "-E",
+                        "-e",
+                        "-s",
+                        "-p",
+                        f"127.0.0.1:{port}",
+                        "-P",
+                        pid_file,
+                        "-r",
+                        os.path.join(self.path, "login_host_key"),
+                    ],
+                    env=env,
+                    stdout=log,
+                    stderr=log,
+                    start_new_session=True,
+                )
+            deadline = time.time() + LISTEN_TIMEOUT
+            while time.time() < deadline and process.poll() is None:
+                if os.path.exists(pid_file) and os.path.getsize(pid_file):
+                    break
+                time.sleep(0.05)
+            if process.poll() is None:
+                self.dropbear = process
+                self.port = port
+                break
+        else:
+            raise RuntimeError("Dropbear could not listen on the loopback interface")
+
+        with open(os.path.join(self.path, "ssh_config"), "w") as f:
+            f.write(
+                SSH_CONFIG.format(
+                    login_hosts=LOGIN_HOSTS,
+                    port=self.port,
+                    python=sys.executable,
+                    benchmark=os.path.abspath(__file__),
+                    sandbox=self.path,
+                    user=self.user,
+                )
+            )
+
+    def env(self, **extra):
+        """Return the environment the scripts run with."""
+        env = dict(
+            os.environ,
+            PATH=f"{self.path}/bin:{os.environ.get('PATH', '')}",
+            HOME=self.local_home,
+            TMPDIR=os.path.join(self.path, "tmp"),
+            REMOTE_LOG_DIR=os.path.join(self.cluster_home, "logs"),
+            VSCODE_CLI_URL="file://" + self.release_path("code"),
+            CURSOR_CLI_URL="file://" + self.release_path("cursor"),
+        )
+        env.pop("PHASE_TIMING_FILE", None)
+        env.pop("JOB_TRACKING_FILE", None)
+        env.pop("PASSWORD", None)
+        env.update(extra)
+        return env
+
+    def slurm(self, *args):
+        """Run a fake Slurm command directly, outside any measurement."""
+        env = dict(os.environ, FAKE_SLURM_DIR=self.slurm_dir, USER=self.user)
+        return subprocess.run(
+            [os.path.join(self.slurm_dir, "bin", args[0])] + list(args[1:]),
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        ).stdout
+
+    def counters(self):
+        """Return (ssh round trips, connections, bytes) so far."""
+        ssh_calls = 0
+        try:
+            with open(os.path.join(self.path, "ssh_calls.log")) as f:
+                ssh_calls = sum(1 for line in f if " -O " not in f" {line}")
+        except OSError:
+            pass
+
+        connections = 0
+        total = 0
+        for path in glob.glob(os.path.join(self.traffic_dir, "*")):
+            if path.endswith(".tmp"):
+                continue
+            connections += 1
+            try:
+                with open(path) as f:
+                    sent, received = f.read().split()
+                total += int(sent) + int(received)
+            except (OSError, ValueError):
+                pass
+        return ssh_calls, connections, total
+
+    def login_node_faults(self):
+        """Return how many Dropbear assertion failures the login node logged."""
+        try:
+            with open(os.path.join(self.logs_dir, "dropbear.log"), "rb") as f:
+                return f.read().count(b"Failed assertion")
+        except OSError:
+            return 0
+
+    def cancel_jobs(self):
+        """Cancel every fake job, as scancel.sh would."""
+        self.slurm("scancel", "-u", self.user)
+        # scancel.sh drops the local job snapshots along with the jobs
+        for path in glob.glob(os.path.join(self.path, "tmp", "remote_state_*")):
+            os.remove(path)
+        for path in glob.glob(os.path.join(self.path, "tmp", "job_watch_*.state")):
+            os.remove(path)
+
+    def close_masters(self):
+        """Stop every control master the scripts started."""
+        for socket_path in glob.glob(os.path.join(self.path, "ctl", "ssh_*")):
+            subprocess.run(
+                [self.ssh, "-o", f"ControlPath={socket_path}", "-O", "exit", "x"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+    def clear_local_state(self):
+        """Forget the scripts' local snapshots, as after a reboot."""
+        # Local job watchers keep their state in TMPDIR; stop them first
+        self.kill_matching(os.path.join(self.repo, "job_watcher.py"))
+        tmp_dir = os.path.join(self.path, "tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+    def reset(self):
+        """Return to an empty cluster, root, cache and local state."""
+        self.cancel_jobs()
+        self.close_masters()
+        self.clear_local_state()
+        for path in (self.shared_root, self.cluster_home, self.local_home):
+            shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(self.local_home)
+        self.write_cluster_env()
+
+    def kill_matching(self, pattern):
+        """Terminate processes whose command line contains pattern."""
+        subprocess.run(
+            ["pkill", "-f", pattern],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def close(self):
+        """Stop everything the benchmark started and clean up."""
+        try:
+            with open(os.path.join(self.slurm_dir, "jobs.json")) as f:
+                job_ids = list(json.load(f)["jobs"])
+        except (OSError, ValueError, KeyError):
+            job_ids = []
+        try:
+            self.cancel_jobs()
+            self.close_masters()
+        finally:
+            self.revoke_key()
+            if self.dropbear is not None and self.dropbear.poll() is None:
+                self.dropbear.terminate()
+                self.dropbear.wait()
+            # Relays, job watchers and anything else still using the sandbox
+            self.kill_matching(self.path)
+            for job_id in job_ids:
+                pid_file = f"/tmp/dropbear_{job_id}.pid"
+                if os.path.exists(pid_file):
+                    os.remove(pid_file)
+            if not self.keep:
+                shutil.rmtree(self.path, ignore_errors=True)
+            elif os.path.exists(os.path.join(self.path, "id_ed25519")):
+                # The key is revoked, but it has no business outliving the run
+                os.remove(os.path.join(self.path, "id_ed25519"))
+
+
+class Runner:
+    """Runs the scenarios against a sandbox and measures them."""
+
+    def __init__(self, sandbox, cold=False):
+        """
+        Initialize the runner.
+
+        Args:
+            sandbox (Sandbox): Started sandbox
+            cold (bool): Close control masters and clear local state before
+                every scenario instead of only before the first
+        """
+        self.sandbox = sandbox
+        self.cold = cold
+        self.round = 0
+
+    def script(self, name, *args):
+        """Return the command for a script of the repository copy."""
+        return [os.path.join(self.sandbox.repo, name)] + list(args)
+
+    def run_script(self, scenario, cmd, timing_file):
+        """
+        Run one script to completion with its output in the sandbox logs.
+
+        Raises:
+            RuntimeError: If the script fails or times out
+        """
+        log_path = os.path.join(
+            self.sandbox.logs_dir,
+            f"{self.round}.{scenario}.{os.path.basename(cmd[0])}.log",
+        )
+        with open(log_path, "ab") as log:
+            process = subprocess.Popen(
+                cmd,
+                env=self.sandbox.env(PHASE_TIMING_FILE=timing_file),
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+            try:
+                return_code = process.wait(SCRIPT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+                raise RuntimeError(f"timed out after {SCRIPT_TIMEOUT}s; see {log_path}")
+        if return_code != 0:
+            raise RuntimeError(f"exit code {return_code}; see {log_path}")
+
+    def measure(self, scenario):
+        """Prepare, run and measure one scenario."""
+        if self.cold:
+            self.sandbox.close_masters()
+            self.sandbox.clear_local_state()
+        if scenario in ("deploy_cold",):
+            self.sandbox.reset()
+        if scenario in ("sshd", "gui_sshd", "tunnel"):
+            self.sandbox.cancel_jobs()
+
+        timing_fd, timing_file = tempfile.mkstemp(dir=self.sandbox.path, suffix=".tsv")
+        os.close(timing_fd)
+        before = self.sandbox.counters()
+        faults = self.sandbox.login_node_faults()
+        start = time.monotonic()
+        error = ""
+        phases = {}
+        try:
+            spans = getattr(self, f"scenario_{scenario}")(timing_file)
+        except Exception as e:
+            error = str(e)
+            spans = None
+        wall = time.monotonic() - start
+        # Relays flush their counts periodically
+        time.sleep(RELAY_FLUSH_INTERVAL * 2)
+        after = self.sandbox.counters()
+        if error and self.sandbox.login_node_faults() > faults:
+            # Dropbear standing in for the login node occasionally drops a
+            # multiplexed connection with many parallel channels; OpenSSH on
+            # the real login nodes does not, so say so instead of blaming
+            # the scripts
+            error += " (the fake login node's Dropbear crashed; see dropbear.log)"
+
+        if spans is None:
+            spans = read_spans(timing_file)
+        for phase, duration in spans:
+            phases[phase] = phases.get(phase, 0) + duration
+
+        return Measurement(
+            scenario=scenario,
+            ok=not error,
+            wall=wall,
+            ssh_calls=after[0] - before[0],
+            connections=after[1] - before[1],
+            bytes=after[2] - before[2],
+            phases=phases,
+            error=error,
+        )
+
+    def scenario_deploy_cold(self, timing_file):
+        """Deploy every tool into an empty root."""
+        self.run_script(
+            "deploy_cold",
+            self.script("deploy_remote_tools.sh", "-a", CLUSTER, "--all"),
+            timing_file,
+        )
+
+    def scenario_deploy_warm(self, timing_file):
+        """Deploy again with everything up to date."""
+        self.run_script(
+            "deploy_warm",
+            self.script("deploy_remote_tools.sh", "-a", CLUSTER, "--all"),
+            timing_file,
+        )
+
+    def scenario_pls(self, timing_file):
+        """Print the cluster status."""
+        self.run_script("pls", self.script("pls.sh", "-a", CLUSTER), timing_file)
+
+    def scenario_tunnel(self, timing_file):
+        """Start a tunnel job and wait until the tunnel is up."""
+        log_path = os.path.join(self.sandbox.cluster_home, "logs", "tunnel.log")
+        self.run_script(
+            "tunnel",
+            self.script("tunnel.sh", "-a", CLUSTER, "-n", *RESOURCES),
+            timing_file,
+        )
+        deadline = time.time() + TUNNEL_TIMEOUT
+        while time.time() < deadline:
+            try:
+                with open(log_path) as f:
+                    if "vscode.dev/tunnel/" in f.read():
+                        return None
+            except OSError:
+                pass
+            time.sleep(0.05)
+        raise RuntimeError(f"the tunnel did not start within {TUNNEL_TIMEOUT}s")
+
+    def scenario_sshd(self, timing_file):
+        """Start an SSHD job and log in to it."""
+        self.run_script(
+            "sshd",
+            self.script(
+                "remote_sshd.sh", "-a", CLUSTER, "-p", "doppelbock", *RESOURCES
+            ),
+            timing_file,
+        )
+        self.login_compute_node()
+
+    def scenario_sshd_reuse(self, timing_file):
+        """Run remote_sshd.sh again while its job runs."""
+        self.scenario_sshd(timing_file)
+
+    def scenario_gui_sshd(self, timing_file):
+        """Start an SSHD job through the GUI's script runner."""
+        # Imported here so the relay processes this file also runs as start
+        # without loading asyncio
+        from orchestrator import Engine, SessionFinished
+        from script_runner import SessionManager
+
+        cmd = self.script(
+            "remote_sshd.sh",
+            "-a",
+            CLUSTER,
+            "-p",
+            "doppelbock",
+            *RESOURCES,
+            "--root",
+            self.sandbox.shared_root,
+        )
+        # ScriptSession runs scripts with the process environment
+        saved_environ = dict(os.environ)
+        env = self.sandbox.env()
+        os.environ.clear()
+        os.environ.update(env)
+        engine = Engine()
+        engine.start()
+        try:
+            session = SessionManager(engine, self.sandbox.user).start(
+                "Remote SSHD", cmd
+            )
+            log_path = os.path.join(self.sandbox.logs_dir, f"{self.round}.gui_sshd.log")
+            with open(log_path, "w") as log:
+                while True:
+                    event = engine.events.get(timeout=SCRIPT_TIMEOUT)
+                    if isinstance(event, SessionFinished):
+                        break
+                    log.write(getattr(event, "text", ""))
+        finally:
+            engine.stop()
+            os.environ.clear()
+            os.environ.update(saved_environ)
+
+        spans = [(span.phase, span.end - span.start) for span in session.phase_spans()]
+        session.cleanup()
+        if event.state != "success":
+            raise RuntimeError(f"session {event.state}; see {log_path}")
+        self.login_compute_node()
+        return spans
+
+    def login_compute_node(self):
+        """Log in to the Dropbear the job started, as a user would."""
+        fragment = os.path.join(
+            self.sandbox.local_home, ".ssh", "config.d", "unix-scripts.conf"
+        )
+        node = port = None
+        current = None
+        with open(fragment) as f:
+            for line in f:
+                fields = line.split()
+                if fields[:1] == ["Host"]:
+                    current = fields[1]
+                elif current == COMPUTE_HOST and fields[:1] == ["Hostname"]:
+                    node = fields[1]
+                elif current == COMPUTE_HOST and fields[:1] == ["Port"]:
+                    port = fields[1]
+        if not node or not port:
+            raise RuntimeError(f"no {COMPUTE_HOST} entry in {fragment}")
+
+        result = subprocess.run(
+            [
+                os.path.join(self.sandbox.path, "bin", "ssh"),
+                "-J",
+                f"{self.sandbox.user}@bluehive3.circ.rochester.edu",
+                "-p",
+                port,
+                f"{self.sandbox.user}@{node}",
+                "true",
+            ],
+            env=self.sandbox.env(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            timeout=SCRIPT_TIMEOUT,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"login to {node}:{port} failed: {result.stderr.strip()}"
+            )
+
+
+def read_spans(path):
+    """Return (phase, seconds) pairs from a PHASE_TIMING_FILE."""
+    spans = []
+    try:
+        with open(path) as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) >= 3:
+                    try:
+                        spans.append((fields[0], float(fields[2]) - float(fields[1])))
+                    except ValueError:
+                        continue
+    except OSError:
+        pass
+    return spans
+
+
+def summarize(measurements):
+    """
+    Reduce repeated measurements to one result per scenario.
+
+    Returns:
+        collections.OrderedDict: scenario -> dict of medians and failures
+    """
+    results = collections.OrderedDict()
+    for scenario in SCENARIOS:
+        runs = [m for m in measurements if m.scenario == scenario]
+        if not runs:
+            continue
+        good = [m for m in runs if m.ok] or runs
+        phase_names = []
+        for m in good:
+            phase_names.extend(name for name in m.phases if name not in phase_names)
+        results[scenario] = {
+            "runs": len(runs),
+            "failures": sum(1 for m in runs if not m.ok),
+            "errors": [m.error for m in runs if m.error],
+            "wall": median([m.wall for m in good]),
+            "wall_min": min(m.wall for m in good),
+            "wall_max": max(m.wall for m in good),
+            "ssh_calls": median([m.ssh_calls for m in good]),
+            "connections": median([m.connections for m in good]),
+            "bytes": median([m.bytes for m in good]),
+            "phases": collections.OrderedDict(
+                (name, median([m.phases.get(name, 0) for m in good]))
+                for name in phase_names
+            ),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    List the regressions of results against a baseline.
+
+    A scenario regresses when its median wall time grows by more than
+    tolerance (and REGRESSION_SLACK seconds), when it needs more ssh round
+    trips, or when it fails where the baseline passed.
+
+    Returns:
+        list: One message per regression
+    """
+    regressions = []
+    for scenario, result in results.items():
+        old = baseline.get(scenario)
+        if old is None:
+            continue
+        if result["failures"] and not old["failures"]:
+            regressions.append(f"{scenario}: failed ({result['errors'][0]})")
+            continue
+        limit = old["wall"] * (1 + tolerance) + REGRESSION_SLACK
+        if result["wall"] > limit:
+            regressions.append(
+                f"{scenario}: wall time {result['wall']:.2f}s, baseline {old['wall']:.2f}s"
+            )
+        if result["ssh_calls"] > old["ssh_calls"]:
+            regressions.append(
+                f"{scenario}: {result['ssh_calls']:g} ssh round trips, "
+                f"baseline {old['ssh_calls']:g}"
+            )
+    return regressions
+
+
+def format_report(results, settings):
+    """Render the results as a text table."""
+    lines = [
+        f"Benchmark of {CLUSTER} against a local fake cluster ({settings})",
+        "",
+        f"{'SCENARIO':<13} {'WALL':>8} {'MIN':>8} {'MAX':>8} {'SSH':>5} {'CONN':>5} "
+        f"{'KIB':>9}  STATUS",
+    ]
+    for scenario, result in results.items():
+        status = "ok"
+        if result["failures"]:
+            status = f"{result['failures']}/{result['runs']} failed"
+        lines.append(
+            f"{scenario:<13} {result['wall']:>7.2f}s {result['wall_min']:>7.2f}s "
+            f"{result['wall_max']:>7.2f}s {result['ssh_calls']:>5g} "
+            f"{result['connections']:>5g} {result['bytes'] / 1024:>9.1f}  {status}"
+        )
+        for name, duration in result["phases"].items():
+            lines.append(f"    {name:<28} {duration:>7.2f}s")
+        for error in result["errors"][:1]:
+            lines.append(f"    error: {error}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Run the benchmark and report the results."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["--relay"]:
+        relay(*argv[1:4])
+        return 0
+
+    parser = argparse.ArgumentParser(
+        description="Time the launch scripts end to end against a local fake cluster."
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="Scenario to run, repeatable; defaults to all, in order",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Rounds to run")
+    parser.add_argument(
+        "--cold",
+        action="store_true",
+        help="Close control masters and local state before every scenario",
+    )
+    parser.add_argument(
+        "--queue-wait",
+        type=float,
+        default=QUEUE_WAIT,
+        help="Seconds fake jobs stay PENDING",
+    )
+    parser.add_argument(
+        "--slurm-delay",
+        type=float,
+        default=0.0,
+        help="Seconds every fake Slurm command takes to answer",
+    )
+    parser.add_argument(
+        "--job-states",
+        default="",
+        help='fake_slurm.py state script, e.g. "my_sshd=PENDING:5,RUNNING"',
+    )
+    parser.add_argument(
+        "--tunnel-delay",
+        type=float,
+        default=TUNNEL_DELAY,
+        help="Seconds the fake tunnel takes to print its link",
+    )
+    parser.add_argument("--json", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against an earlier --json file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=REGRESSION_TOLERANCE,
+        help="Allowed relative wall time growth over the baseline",
+    )
+    parser.add_argument("--output", help="Also write the report to this file")
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the sandbox for inspection"
+    )
+    args = parser.parse_args(argv)
+
+    scenarios = [name for name in SCENARIOS if name in (args.scenario or SCENARIOS)]
+
+    # Unwind through the finally below, which revokes the key
+    def exit_on_signal(signum, frame):
+        raise SystemExit(128 + signum)
+
+    for signum in (signal.SIGTERM, signal.SIGHUP):
+        signal.signal(signum, exit_on_signal)
+
+    sandbox = Sandbox(
+        args.queue_wait, args.slurm_delay, args.job_states, args.tunnel_delay, args.keep
+    )
+    measurements = []
+    try:
+        sandbox.setup()
+        sandbox.start()
+        print(f"Sandbox: {sandbox.path}, login node on 127.0.0.1:{sandbox.port}")
+        runner = Runner(sandbox, args.cold)
+        for round_number in range(1, args.repeat + 1):
+            runner.round = round_number
+            sandbox.reset()
+            for scenario in scenarios:
+                measurement = runner.measure(scenario)
+                measurements.append(measurement)
+                print(
+                    f"[{round_number}/{args.repeat}] {scenario}: "
+                    f"{measurement.wall:.2f}s"
+                    + ("" if measurement.ok else f" FAILED: {measurement.error}")
+                )
+    except KeyboardInterrupt:
+        print("Interrupted; reporting the rounds so far.")
+    finally:
+        # Failed runs point into the sandbox logs, so keep those around
+        sandbox.keep = args.keep or not all(m.ok for m in measurements)
+        sandbox.close()
+        if sandbox.keep:
+            print(f"Kept the sandbox at {sandbox.path}")
+
+    results = summarize(measurements)
+    settings = (
+        f"queue wait {args.queue_wait:g}s, Slurm delay {args.slurm_delay:g}s, "
+        f"{args.repeat} round(s){', cold' if args.cold else ''}"
+    )
+    if args.job_states:
+        settings += f", states {args.job_states}"
+    report = format_report(results, settings)
+    print()
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+
+    failed = any(result["failures"] for result in results.values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print()
+            print("Regressions against " + args.baseline + ":")
+            for message in regressions:
+                print("  " + message)
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
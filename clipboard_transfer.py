@@ -0,0 +1,253 @@
+"""
+Clipboard Transfer
+
+Streams a payload, such as the clipboard, to a cluster over the
+/tmp/ssh_$CLUSTER control master the GUI and the shell scripts keep, instead
+of typing it as keystrokes. The payload is gzipped on the way and lands
+either in a new file under the remote home or on the stdin of a remote
+command, optionally on a compute node reached from the login node. Files
+are written under a .part name and renamed when complete, and a command
+only starts once the whole payload has been received into a temporary
+file, so nothing ever sees half a payload. This module depends on neither
+tkinter nor pyautogui.
+"""
+
+import collections
+import os
+import secrets
+import shlex
+import subprocess
+import threading
+import time
+import zlib
+
+from ssh_pool import cluster_hostname, control_path
+
+DEFAULT_REMOTE_DIR = "clipboard"  # Relative to the remote home
+DEFAULT_SUFFIX = ".txt"
+CHUNK_BYTES = 256 * 1024  # Payload bytes compressed and sent per write
+COMPRESS_LEVEL = 6
+CANCEL_TIMEOUT = 5  # Seconds a cancelled transfer gets to clean up
+
+# Outcome of one transfer. path is the remote file, or None when the
+# payload went to a command, whose stdout is output.
+TransferResult = collections.namedtuple(
+    "TransferResult", ["path", "output", "sent", "total", "elapsed", "cancelled"]
+)
+
+
+def remote_file_name(suffix=DEFAULT_SUFFIX):
+    """Return a new, unique name for a transferred file."""
+    return f"clip-{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}{suffix}"
+
+
+def build_remote_script(remote_dir=DEFAULT_REMOTE_DIR, name=None, command=None):
+    """
+    Build the shell script that receives the gzipped payload on stdin.
+
+    Args:
+        remote_dir (str): Directory for the file, relative to the remote
+            home unless absolute
+        name (str): File name; defaults to remote_file_name()
+        command (str): Shell command to feed the payload to instead of
+            writing a file; it runs only after the payload arrived intact
+
+    Returns:
+        str: Script for the remote shell; in file mode it prints the
+            absolute path of the written file
+    """
+    if command is not None:
+        # A pipe would hand the command the prefix of a cancelled or broken
+        # stream, and report the command's status rather than gzip's
+        return (
+            't="$(mktemp "${TMPDIR:-/tmp}/clip.XXXXXX")" && '
+            "trap 'rm -f -- \"$t\"' EXIT && "
+            'gzip -dc > "$t" && {\n'
+            f"{command}\n"
+            '} < "$t"'
+        )
+
+    name = name or remote_file_name()
+    return (
+        f"cd && mkdir -p -- {shlex.quote(remote_dir)} && "
+        f"cd -- {shlex.quote(remote_dir)} && "
+        f"f={shlex.quote(name)} && "
+        "trap 'rm -f -- \"$f.part\"' EXIT && "
+        'gzip -dc > "$f.part" && mv -- "$f.part" "$f" && '
+        "printf '%s\\n' \"$PWD/$f\""
+    )
+
+
+def build_ssh_command(cluster, user, script, node=None):
+    """
+    Build the ssh command that runs a script over the cluster's master.
+
+    The command never opens a connection of its own: without a live master
+    it fails instead of prompting for a password.
+
+    Args:
+        cluster (str): Cluster name
+        user (str): Login user name
+        script (str): Remote shell script
+        node (str): Compute node to run the script on, reached by ssh from
+            the login node, or None for the login node
+
+    Returns:
+        list: Command and arguments
+    """
+    if node:
+        script = f"ssh -T -o BatchMode=yes {shlex.quote(node)} {shlex.quote(script)}"
+    return [
+        "ssh",
+        "-o",
+        "ControlMaster=no",
+        "-o",
+        f"ControlPath={control_path(cluster)}",
+        "-o",
+        "BatchMode=yes",
+        "-T",
+        f"{user}@{cluster_hostname(cluster)}",
+        script,
+    ]
+
+
+def stream(cmd, data, progress=None, cancel=None, output=None):
+    """
+    Feed a payload, gzipped, to the stdin of a command.
+
+    Args:
+        cmd (list): Command and arguments, e.g. from build_ssh_command()
+        data (bytes): Payload
+        progress (callable): Called with (sent, total, elapsed) after each
+            chunk, counting payload bytes
+        cancel (threading.Event): Ends the transfer between chunks when set
+        output (callable): Called with each line the command prints, as it
+            arrives
+
+    Returns:
+        TransferResult: path is None and output holds the printed lines
+
+    Raises:
+        RuntimeError: If the command fails
+    """
+    start = time.monotonic()
+    process = subprocess.Popen(
+        cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    # Both pipes are drained while stdin is written so neither can fill up
+    lines = []
+    errors = []
+
+    def drain(pipe, target, callback):
+        for raw in pipe:
+            line = raw.decode("utf-8", errors="replace").rstrip("\n")
+            target.append(line)
+            if callback is not None:
+                callback(line)
+
+    readers = [
+        threading.Thread(target=drain, args=(process.stdout, lines, output)),
+        threading.Thread(target=drain, args=(process.stderr, errors, None)),
+    ]
+    for reader in readers:
+        reader.daemon = True
+        reader.start()
+
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    sent = 0
+    cancelled = False
+    try:
+        for offset in range(0, len(data), CHUNK_BYTES):
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+                break
+            chunk = data[offset : offset + CHUNK_BYTES]
+            process.stdin.write(compressor.compress(chunk))
+            sent += len(chunk)
+            if progress is not None:
+                progress(sent, len(data), time.monotonic() - start)
+        if not cancelled:
+            process.stdin.write(compressor.flush())
+    except BrokenPipeError:
+        # The command exited early; its exit code and stderr say why
+        pass
+
+    # A cancelled stream ends mid-gzip, so the remote side fails before
+    # renaming its file or starting the command, and removes its temp file
+    try:
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    try:
+        return_code = process.wait(timeout=CANCEL_TIMEOUT if cancelled else None)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        return_code = process.wait()
+    for reader in readers:
+        reader.join()
+
+    elapsed = time.monotonic() - start
+    if cancelled:
+        return TransferResult(None, lines, sent, len(data), elapsed, True)
+    if return_code != 0:
+        detail = errors[-1] if errors else f"exit code {return_code}"
+        raise RuntimeError(f"Transfer failed: {detail}")
+    return TransferResult(None, lines, sent, len(data), elapsed, False)
+
+
+def transfer(
+    data,
+    cluster,
+    user,
+    remote_dir=DEFAULT_REMOTE_DIR,
+    suffix=DEFAULT_SUFFIX,
+    command=None,
+    node=None,
+    progress=None,
+    cancel=None,
+    output=None,
+):
+    """
+    Send a payload to a new remote file or to a remote command.
+
+    Args:
+        data (bytes): Payload
+        cluster (str): Cluster whose control master carries the payload
+        user (str): Login user name
+        remote_dir (str): Directory for the file, relative to the remote
+            home unless absolute
+        suffix (str): File name suffix, e.g. ".ipynb"
+        command (str): Shell command to feed the payload to instead
+        node (str): Compute node to deliver to, or None for the login node
+        progress (callable): See stream()
+        cancel (threading.Event): See stream()
+        output (callable): See stream()
+
+    Returns:
+        TransferResult: The outcome, with the remote file's absolute path
+            in file mode
+
+    Raises:
+        RuntimeError: If the cluster has no control master or the
+            transfer fails
+    """
+    if not os.path.exists(control_path(cluster)):
+        raise RuntimeError(
+            f"No SSH control master for {cluster}; connect in the GUI "
+            f"or run start_ssh_control.sh -a {cluster}"
+        )
+
+    script = build_remote_script(remote_dir, remote_file_name(suffix), command)
+    result = stream(
+        build_ssh_command(cluster, user, script, node),
+        data,
+        progress,
+        cancel,
+        output,
+    )
+    if command is None and not result.cancelled:
+        if not result.output:
+            raise RuntimeError("Transfer failed: the remote side reported no path")
+        result = result._replace(path=result.output[-1])
+    return result
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Cluster CLI
+
+Headless counterpart of gui_cluster_manager.py for cron jobs and sessions
+without a display. It builds the same tunnel.sh, remote_sshd.sh and
+deploy_remote_tools.sh commands from the same parameter model and runs them
+as script sessions on the orchestrator engine, printing their output and
+completion banner. It never imports tkinter.
+
+Usage:
+    python cluster_cli.py tunnel -a bluehive3 --tool cursor
+    python cluster_cli.py sshd -a bhward -c 8 -g 0 -t 24
+    python cluster_cli.py deploy -a bluehive3
+"""
+
+import argparse
+import collections
+import queue
+import sys
+
+from cluster_commands import (
+    DEPLOY_MESSAGES,
+    REMOTE_SSHD_MESSAGES,
+    TUNNEL_MESSAGES,
+    build_deploy_command,
+    build_resource_command,
+    build_tunnel_command,
+    default_params,
+    finished_texts,
+    read_credentials,
+)
+from orchestrator import Engine, SessionFinished, SessionOutput
+from script_runner import SessionManager
+from ssh_pool import CLUSTER_HOSTNAMES, SCRIPT_DIR
+
+DEFAULT_CLUSTER = "bluehive3"
+EVENT_POLL_INTERVAL = 0.5  # Seconds between checks for Ctrl-C while idle
+INTERRUPTED_EXIT_CODE = 130
+
+# Script and completion texts of each command
+Action = collections.namedtuple("Action", ["script", "messages"])
+
+ACTIONS = {
+    "tunnel": Action("tunnel.sh", TUNNEL_MESSAGES),
+    "sshd": Action("remote_sshd.sh", REMOTE_SSHD_MESSAGES),
+    "deploy": Action("deploy_remote_tools.sh", DEPLOY_MESSAGES),
+}
+
+
+def parse_args(argv):
+    """Parse the command line; resource options default as in the GUI."""
+    defaults = default_params(DEFAULT_CLUSTER)
+    parser = argparse.ArgumentParser(
+        description="Run the cluster scripts without the GUI."
+    )
+    parser.add_argument("action", choices=list(ACTIONS), help="What to run")
+    parser.add_argument(
+        "-a",
+        "--cluster",
+        choices=list(CLUSTER_HOSTNAMES),
+        default=DEFAULT_CLUSTER,
+        help=f"Cluster (default: {DEFAULT_CLUSTER})",
+    )
+    for flag, name, label in (
+        ("-p", "partition", "SLURM partition"),
+        ("-c", "cpus", "CPU cores"),
+        ("-g", "gpus", "GPUs"),
+        ("-m", "memory", "Memory in GB"),
+        ("-t", "time", "Runtime in hours"),
+    ):
+        parser.add_argument(
+            flag,
+            dest=name,
+            default=defaults[name],
+            help=f"{label} (default: {defaults[name]})",
+        )
+    parser.add_argument("-w", dest="node", default="", help="Specific node")
+    parser.add_argument(
+        "-n", dest="no_log", action="store_true", help="Disable tunnel logging"
+    )
+    parser.add_argument(
+        "--tool",
+        dest="tunnel_tool",
+        choices=["code", "cursor"],
+        default=defaults["tunnel_tool"],
+        help="Tunnel backend (default: code)",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Submit to the placement with the earliest expected start",
+    )
+    parser.add_argument(
+        "--root", help="Remote tool root (default: from user_password.txt)"
+    )
+    parser.add_argument(
+        "--cancel-jobs",
+        action="store_true",
+        help="On Ctrl-C also scancel the Slurm jobs the run started",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the command without running it"
+    )
+    return parser.parse_args(argv)
+
+
+def build_command(args, remote_shared_root):
+    """
+    Build the script command for the parsed arguments.
+
+    Args:
+        args (argparse.Namespace): Parsed command line
+        remote_shared_root (str): Remote tool root
+
+    Returns:
+        list: Command and arguments
+    """
+    script = str(SCRIPT_DIR / ACTIONS[args.action].script)
+    if args.action == "deploy":
+        return build_deploy_command(script, args.cluster, remote_shared_root)
+
+    params = default_params(args.cluster)
+    for key in params:
+        params[key] = getattr(args, key)
+    if args.action == "tunnel":
+        return build_tunnel_command(script, params, remote_shared_root)
+    return build_resource_command(script, params, remote_shared_root)
+
+
+def wait_for_session(engine, session, messages, cancel_jobs):
+    """
+    Print a session's output until it finishes.
+
+    The first Ctrl-C stops the session; its completion is still reported.
+
+    Args:
+        engine (Engine): Engine running the session
+        session (ScriptSession): The session to follow
+        messages (SessionMessages): Texts shown when the script ends
+        cancel_jobs (bool): Also scancel the run's Slurm jobs when stopped
+
+    Returns:
+        int: Exit code for the command line
+    """
+    while True:
+        try:
+            event = engine.events.get(timeout=EVENT_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+        except KeyboardInterrupt:
+            print("\n⏹️ Stopping...", flush=True)
+            session.stop(cancel_jobs)
+            continue
+
+        if getattr(event, "session_id", None) != session.session_id:
+            continue
+        if isinstance(event, SessionOutput):
+            sys.stdout.write(event.text)
+            sys.stdout.flush()
+        elif isinstance(event, SessionFinished):
+            status_text, banner = finished_texts(messages, event)
+            print(f"\n{banner}", flush=True)
+            print(status_text, file=sys.stderr)
+            if event.state == "success":
+                return 0
+            if event.state == "failed":
+                return event.return_code
+            if event.state == "stopped":
+                return INTERRUPTED_EXIT_CODE
+            return 1
+
+
+def main(argv=None):
+    """Run one cluster script headlessly and return its exit code."""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    credentials = read_credentials(SCRIPT_DIR / "user_password.txt")
+    remote_shared_root = args.root or credentials["remote_shared_root"]
+    cmd = build_command(args, remote_shared_root)
+
+    if args.dry_run:
+        print(" ".join(cmd))
+        return 0
+
+    engine = Engine()
+    engine.start()
+    sessions = SessionManager(engine, credentials["username"] or None)
+    try:
+        session = sessions.start(ACTIONS[args.action].script, cmd)
+        return_code = wait_for_session(
+            engine, session, ACTIONS[args.action].messages, args.cancel_jobs
+        )
+        if session.log.error is None:
+            print(f"Session log: {session.log.path}", file=sys.stderr)
+        return return_code
+    finally:
+        engine.stop()
+        for session in list(sessions.sessions.values()):
+            sessions.remove(session.session_id)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
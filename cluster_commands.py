@@ -0,0 +1,187 @@
+"""
+Cluster Commands
+
+The parameter model shared by the GUI and the headless command line: the
+default Slurm resources, how they turn into tunnel.sh, remote_sshd.sh and
+deploy_remote_tools.sh commands, and the texts shown when a run ends. This
+module does not depend on tkinter.
+"""
+
+import collections
+from pathlib import Path
+
+DEFAULT_REMOTE_SHARED_ROOT = "/scratch/snormanh_lab/shared"
+
+# Status bar and banner texts shown when a script session ends; {code} is
+# replaced with the exit code
+SessionMessages = collections.namedtuple(
+    "SessionMessages",
+    ["success_status", "success_banner", "failure_status", "failure_banner"],
+)
+
+TUNNEL_MESSAGES = SessionMessages(
+    "✅ Script completed successfully",
+    "✅ Script completed successfully",
+    "❌ Script failed (exit code: {code})",
+    "❌ Script failed with exit code: {code}",
+)
+REMOTE_SSHD_MESSAGES = SessionMessages(
+    "✅ Remote SSHD started successfully",
+    "✅ remote_sshd.sh completed successfully",
+    "❌ Remote SSHD failed (exit code: {code})",
+    "❌ remote_sshd.sh failed with exit code: {code}",
+)
+DEPLOY_MESSAGES = SessionMessages(
+    "✅ Remote tools deployed successfully",
+    "✅ Remote tool deployment completed successfully",
+    "❌ Remote tool deployment failed (exit code: {code})",
+    "❌ Remote tool deployment failed with exit code: {code}",
+)
+
+
+def default_params(cluster):
+    """
+    Return the default tunnel parameters for a cluster.
+
+    Args:
+        cluster (str): Cluster name
+
+    Returns:
+        dict: Parameter values; resources are strings as typed in the GUI,
+            no_log and plan are booleans
+    """
+    return {
+        "cluster": cluster,
+        "partition": "doppelbock",
+        "cpus": "16",
+        "gpus": "1",
+        "memory": "256",
+        "time": "12",
+        "node": "",
+        "tunnel_tool": "code",
+        "no_log": False,
+        "plan": False,
+    }
+
+
+def read_credentials(path="user_password.txt"):
+    """
+    Read the user name, password and remote tool root the GUI saves.
+
+    Args:
+        path (str): Credentials file; line one is the user name, line two
+            the password (may be empty) and line three the remote root,
+            optionally prefixed with REMOTE_SHARED_ROOT=
+
+    Returns:
+        dict: username, password and remote_shared_root; missing entries
+            are empty, the root falls back to DEFAULT_REMOTE_SHARED_ROOT
+    """
+    credentials = {
+        "username": "",
+        "password": "",
+        "remote_shared_root": DEFAULT_REMOTE_SHARED_ROOT,
+    }
+    credentials_file = Path(path)
+    if not credentials_file.exists():
+        return credentials
+
+    lines = credentials_file.read_text().strip().split("\n")
+    if len(lines) >= 1:
+        credentials["username"] = lines[0].strip()
+    if len(lines) >= 2:
+        credentials["password"] = lines[1].strip()
+    if len(lines) >= 3:
+        remote_shared_root = lines[2].strip()
+        if remote_shared_root.startswith("REMOTE_SHARED_ROOT="):
+            remote_shared_root = remote_shared_root.split("=", 1)[1]
+        credentials["remote_shared_root"] = (
+            remote_shared_root or DEFAULT_REMOTE_SHARED_ROOT
+        )
+    return credentials
+
+
+def build_resource_command(script_name, params, remote_shared_root):
+    """
+    Build a command with the shared SLURM resource parameters.
+
+    Args:
+        script_name (str): Script to run, e.g. "./tunnel.sh"
+        params (dict): Parameter values as returned by default_params
+        remote_shared_root (str): Remote tool root passed with --root
+
+    Returns:
+        list: Command and arguments
+    """
+    cmd = [
+        script_name,
+        "-a",
+        params["cluster"],
+        "-p",
+        params["partition"],
+        "-c",
+        params["cpus"],
+        "-g",
+        params["gpus"],
+        "-m",
+        params["memory"],
+        "-t",
+        params["time"],
+        "--root",
+        remote_shared_root or DEFAULT_REMOTE_SHARED_ROOT,
+    ]
+
+    if params["node"]:
+        cmd.extend(["-w", params["node"]])
+
+    if params["plan"]:
+        cmd.append("--plan")
+
+    return cmd
+
+
+def build_tunnel_command(script_name, params, remote_shared_root):
+    """Build a tunnel.sh command with the tunnel tool and logging choice."""
+    cmd = build_resource_command(script_name, params, remote_shared_root)
+    cmd.extend(["--tool", params["tunnel_tool"]])
+
+    if params["no_log"]:
+        cmd.append("-n")
+
+    return cmd
+
+
+def build_deploy_command(script_name, cluster, remote_shared_root):
+    """Build a deploy_remote_tools.sh command that deploys every tool."""
+    return [
+        script_name,
+        "-a",
+        cluster,
+        "--root",
+        remote_shared_root or DEFAULT_REMOTE_SHARED_ROOT,
+        "--all",
+    ]
+
+
+def finished_texts(messages, event):
+    """
+    Describe how a script session ended.
+
+    Args:
+        messages (SessionMessages): Texts of the script that ran
+        event (SessionFinished): The session's completion event
+
+    Returns:
+        tuple: (status_text, banner) for the status bar and the output
+    """
+    if event.state == "stopped":
+        return "⏹️ Script stopped", "=== ⏹️ Script execution stopped by user ==="
+    if event.state == "success":
+        return messages.success_status, f"=== {messages.success_banner} ==="
+    if event.state == "failed":
+        failure_banner = messages.failure_banner.format(code=event.return_code)
+        return (
+            messages.failure_status.format(code=event.return_code),
+            f"=== {failure_banner} ===",
+        )
+    return "❌ Script execution error", f"=== ❌ Error: {event.error} ==="
@@ -51,6 +51,20 @@ cluster_compute_host() {
     esac
 }
 
+# Cluster whose login host a compute host alias jumps through
+cluster_for_compute_host() {
+    local cluster
+
+    for cluster in bluehive bluehive3 bhward; do
+        if [ "$(cluster_compute_host "$cluster")" = "$1" ]; then
+            printf "%s" "$cluster"
+            return 0
+        fi
+    done
+    echo "Error: Unknown compute host '$1'. Supported clusters: $(cluster_supported_list)" >&2
+    return 1
+}
+
 require_cluster() {
     if ! cluster_supported "$1"; then
         echo "Error: Unknown cluster '$1'. Supported clusters: $(cluster_supported_list)" >&2
@@ -0,0 +1,386 @@
+"""
+Cluster Status
+
+Background polling of job, node and quota information for every cluster.
+Each cluster is queried with one batched remote command per interval over
+its pooled SSH control master, and the output is parsed into structured
+rows. The polling runs as coroutines on the orchestrator engine. This module
+does not depend on tkinter.
+"""
+
+import asyncio
+import collections
+import re
+import time
+
+from ssh_pool import CLUSTER_HOSTNAMES, control_path
+
+DASHBOARD_PARTITIONS = ("doppelbock", "dmi")  # Partitions shown for all users
+DASHBOARD_POLL_INTERVAL = 30  # Seconds between queries of one cluster
+QUERY_TIMEOUT = 20  # Seconds allowed for one batched query
+QUOTA_GROUP = "snormanh_lab"
+
+JOB_FIELDS = "%i|%P|%u|%T|%M|%l|%C|%b|%m|%N|%j|%r"
+
+JobRow = collections.namedtuple(
+    "JobRow",
+    [
+        "job_id",
+        "partition",
+        "user",
+        "state",
+        "time_used",
+        "time_limit",
+        "cpus",
+        "gres",
+        "memory",
+        "nodes",
+        "name",
+        "reason",
+    ],
+)
+
+NodeRow = collections.namedtuple(
+    "NodeRow",
+    [
+        "node",
+        "partitions",
+        "state",
+        "cpu_free",
+        "cpu_total",
+        "gpu_free",
+        "gpu_total",
+        "memory_free_gb",
+        "memory_total_gb",
+    ],
+)
+
+QuotaRow = collections.namedtuple(
+    "QuotaRow", ["filesystem", "used", "quota", "limit", "files"]
+)
+
+ClusterSnapshot = collections.namedtuple(
+    "ClusterSnapshot", ["cluster", "jobs", "nodes", "quota", "updated_at", "error"]
+)
+
+# Runs on the login node; prints all three sections in one round trip
+STATUS_QUERY = r"""
+partitions="$1"
+job_fields="$2"
+quota_group="$3"
+
+echo "@@JOBS"
+# A pending job lists every partition it was submitted to, comma separated
+squeue -h -o "$job_fields" | awk -F'|' -v user="$USER" -v parts=",$partitions," '
+    function listed(job_parts,    names, n, i) {
+        n = split(job_parts, names, ",")
+        for (i = 1; i <= n; i++) {
+            if (index(parts, "," names[i] ",")) return 1
+        }
+        return 0
+    }
+    listed($2) || $3 == user'
+
+echo "@@NODES"
+nodes="$(sinfo -h -p "$partitions" -o %N 2>/dev/null | paste -sd, -)"
+if [ -n "$nodes" ]; then
+    scontrol show node -o "$nodes"
+fi
+
+echo "@@QUOTA"
+quota "$quota_group" 2>&1
+"""
+
+
+def parse_tres_gpus(tres):
+    """Return the GPU count from a TRES string such as cpu=16,gres/gpu=2."""
+    match = re.search(r"gres/gpu=(\d+)", tres or "")
+    return int(match.group(1)) if match else 0
+
+
+def parse_jobs(lines):
+    """Parse squeue lines printed with JOB_FIELDS."""
+    jobs = []
+    for line in lines:
+        fields = line.split("|")
+        if len(fields) == len(JobRow._fields):
+            jobs.append(JobRow(*fields))
+    return jobs
+
+
+def parse_nodes(lines):
+    """Parse `scontrol show node -o` lines into NodeRow records."""
+    nodes = []
+    for line in lines:
+        values = dict(re.findall(r"(\w+)=(\S*)", line))
+        if "NodeName" not in values:
+            continue
+
+        try:
+            cpu_total = int(values.get("CPUTot", 0))
+            cpu_alloc = int(values.get("CPUAlloc", 0))
+            memory_total = int(values.get("RealMemory", 0))
+            memory_alloc = int(values.get("AllocMem", 0))
+        except ValueError:
+            continue
+
+        gpu_total = parse_tres_gpus(values.get("CfgTRES"))
+        gpu_alloc = parse_tres_gpus(values.get("AllocTRES"))
+
+        nodes.append(
+            NodeRow(
+                node=values["NodeName"],
+                partitions=values.get("Partitions", ""),
+                state=values.get("State", ""),
+                cpu_free=cpu_total - cpu_alloc,
+                cpu_total=cpu_total,
+                gpu_free=gpu_total - gpu_alloc,
+                gpu_total=gpu_total,
+                memory_free_gb=round((memory_total - memory_alloc) / 1024),
+                memory_total_gb=round(memory_total / 1024),
+            )
+        )
+    return nodes
+
+
+def parse_quota(lines):
+    """
+    Parse `quota` output into QuotaRow records.
+
+    quota wraps long filesystem names onto their own line; such lines are
+    joined with the numbers that follow them.
+    """
+    rows = []
+    in_table = False
+    pending_filesystem = None
+
+    for line in lines:
+        tokens = line.split()
+        if not tokens:
+            continue
+        if tokens[0] == "Filesystem":
+            in_table = True
+            continue
+        if not in_table:
+            continue
+
+        if pending_filesystem is not None:
+            tokens = [pending_filesystem] + tokens
+            pending_filesystem = None
+        if len(tokens) == 1:
+            pending_filesystem = tokens[0]
+            continue
+        if len(tokens) < 5:
+            continue
+
+        # Columns: filesystem blocks quota limit [grace] files quota limit [grace]
+        numbers = [token for token in tokens[1:] if token[:1].isdigit()]
+        files = numbers[3] if len(numbers) > 3 else ""
+        rows.append(QuotaRow(tokens[0], tokens[1], tokens[2], tokens[3], files))
+
+    return rows
+
+
+def parse_status_output(cluster, text):
+    """
+    Split batched query output into its sections and parse each one.
+
+    Args:
+        cluster (str): Cluster the output came from
+        text (str): Output of STATUS_QUERY
+
+    Returns:
+        ClusterSnapshot: Parsed jobs, nodes and quota
+    """
+    sections = {"@@JOBS": [], "@@NODES": [], "@@QUOTA": []}
+    current = None
+    for line in text.splitlines():
+        if line in sections:
+            current = sections[line]
+        elif current is not None and line.strip():
+            current.append(line)
+
+    return ClusterSnapshot(
+        cluster=cluster,
+        jobs=parse_jobs(sections["@@JOBS"]),
+        nodes=parse_nodes(sections["@@NODES"]),
+        quota=parse_quota(sections["@@QUOTA"]),
+        updated_at=time.time(),
+        error="",
+    )
+
+
+class ClusterStatusPoller:
+    """
+    Poll every cluster in the background and publish parsed snapshots.
+
+    One coroutine per cluster runs STATUS_QUERY every poll_interval seconds
+    on the orchestrator engine, over that cluster's pooled control master
+    and inside the engine's "remote" pool. Snapshots, including failed ones
+    with error set, are posted as engine events for the UI to drain. A
+    cluster whose control master cannot be established is only queried
+    again on an explicit refresh(). A refresh never resends a password the
+    cluster rejected: the pool then only reuses a live master, until the
+    user logs in again.
+    """
+
+    def __init__(
+        self,
+        engine,
+        ssh_pool,
+        user,
+        password,
+        clusters=None,
+        poll_interval=DASHBOARD_POLL_INTERVAL,
+    ):
+        """
+        Initialize the poller.
+
+        Args:
+            engine (Engine): Orchestrator engine that runs the queries
+            ssh_pool (ControlMasterPool): Pool providing the control masters
+            user (str): Login user name
+            password (str): Password used if a master must be (re)created
+            clusters (list): Clusters to poll, defaults to all supported ones
+            poll_interval (float): Seconds between queries of one cluster
+        """
+        self.engine = engine
+        self.ssh_pool = ssh_pool
+        self.user = user
+        self.password = password
+        self.clusters = list(clusters or CLUSTER_HOSTNAMES)
+        self.poll_interval = poll_interval
+
+        self.futures = []
+        self.refresh_events = {}
+        self.unreachable = set()
+
+    def start(self):
+        """Start one polling coroutine per cluster."""
+        for cluster in self.clusters:
+            self.futures.append(self.engine.submit(self._poll(cluster)))
+
+    def stop(self):
+        """Cancel polling, including queries in flight."""
+        for future in self.futures:
+            future.cancel()
+        self.futures = []
+
+    def refresh(self, cluster=None):
+        """
+        Query clusters now instead of waiting for the interval.
+
+        Args:
+            cluster (str): Query only this cluster, and only if it is
+                reachable; None queries every cluster and retries the
+                unreachable ones
+        """
+        if cluster is None:
+            self.engine.call_soon(self._refresh_all)
+        else:
+            self.engine.call_soon(self._refresh_cluster, cluster)
+
+    def _refresh_all(self):
+        """
+        Wake every polling coroutine; runs on the engine loop.
+
+        Unreachable clusters are tried again, but a cluster that rejected
+        the password only answers if it has a live master by now.
+        """
+        self.unreachable.clear()
+        for event in self.refresh_events.values():
+            event.set()
+
+    def _refresh_cluster(self, cluster):
+        """Wake one reachable cluster's polling coroutine; runs on the loop."""
+        event = self.refresh_events.get(cluster)
+        if event is not None and cluster not in self.unreachable:
+            event.set()
+
+    async def query(self, cluster):
+        """
+        Run the batched status query against one cluster.
+
+        Args:
+            cluster (str): Cluster name
+
+        Returns:
+            ClusterSnapshot: Parsed snapshot, with error set on failure
+        """
+        try:
+            await self.engine.run_blocking(
+                self.ssh_pool.connect, cluster, self.user, self.password
+            )
+        except Exception as e:
+            self.unreachable.add(cluster)
+            return ClusterSnapshot(cluster, [], [], [], time.time(), str(e))
+
+        process = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ssh",
+                "-o",
+                "ControlMaster=no",
+                "-o",
+                f"ControlPath={control_path(cluster)}",
+                "-o",
+                "BatchMode=yes",
+                "-T",
+                f"{self.user}@{CLUSTER_HOSTNAMES[cluster]}",
+                "bash",
+                "-s",
+                "--",
+                ",".join(DASHBOARD_PARTITIONS),
+                f"'{JOB_FIELDS}'",
+                QUOTA_GROUP,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(STATUS_QUERY.encode()), QUERY_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return ClusterSnapshot(
+                cluster,
+                [],
+                [],
+                [],
+                time.time(),
+                f"Query timed out after {QUERY_TIMEOUT}s",
+            )
+        except asyncio.CancelledError:
+            if process is not None and process.returncode is None:
+                process.kill()
+            raise
+        except Exception as e:
+            return ClusterSnapshot(cluster, [], [], [], time.time(), str(e))
+
+        output = stdout.decode(errors="replace")
+        if process.returncode != 0 and "@@JOBS" not in output:
+            error = stderr.decode(errors="replace").strip()
+            error = error or f"exit code {process.returncode}"
+            return ClusterSnapshot(cluster, [], [], [], time.time(), error)
+
+        return parse_status_output(cluster, output)
+
+    async def _poll(self, cluster):
+        """Query one cluster until cancelled."""
+        refresh_event = asyncio.Event()
+        self.refresh_events[cluster] = refresh_event
+        try:
+            while True:
+                self.engine.post(
+                    await self.engine.limited(self.query(cluster), pool="remote")
+                )
+
+                timeout = None if cluster in self.unreachable else self.poll_interval
+                try:
+                    await asyncio.wait_for(refresh_event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                refresh_event.clear()
+        finally:
+            self.refresh_events.pop(cluster, None)
@@ -1,17 +1,19 @@
 #!/bin/bash
 current_path="$(dirname "$0")"
 source "$current_path/cluster_helpers.sh"
+source "$current_path/phase_timing.sh"
 
-CLUSTER="bluehive3"
+CLUSTERS=()
 ROOT_OVERRIDE=""
 DEPLOY_CODE=false
 DEPLOY_CURSOR=false
 DEPLOY_DROPBEAR=false
 
 usage() {
-    echo "Usage: $0 [-a CLUSTER] [--root PATH] [--code] [--cursor] [--dropbear] [--all]"
+    echo "Usage: $0 [-a CLUSTER[,CLUSTER...]] [--all-clusters] [--root PATH] [--code] [--cursor] [--dropbear] [--all]"
     echo "Supported clusters: $(cluster_supported_list)"
-    echo "If no tool is specified, --all is used."
+    echo "-a may be repeated. Clusters are deployed in parallel, and so are the tools of each cluster."
+    echo "If no cluster is specified, bluehive3 is used. If no tool is specified, --all is used."
 }
 
 while [[ $# -gt 0 ]]; do
@@ -21,11 +23,17 @@ while [[ $# -gt 0 ]]; do
                 echo "Error: $1 requires a cluster name" >&2
                 exit 1
             fi
-            CLUSTER="$2"
+            IFS=',' read -r -a cluster_args <<< "$2"
+            CLUSTERS+=("${cluster_args[@]}")
             shift 2
             ;;
         --cluster=*)
-            CLUSTER="${1#*=}"
+            IFS=',' read -r -a cluster_args <<< "${1#*=}"
+            CLUSTERS+=("${cluster_args[@]}")
+            shift
+            ;;
+        --all-clusters)
+            CLUSTERS=(bluehive bluehive3 bhward)
             shift
             ;;
         -r|--root)
@@ -80,32 +88,184 @@ if [ "$DEPLOY_CODE" = false ] && [ "$DEPLOY_CURSOR" = false ] && [ "$DEPLOY_DROP
     DEPLOY_DROPBEAR=true
 fi
 
-require_cluster "$CLUSTER" || exit 1
-HOSTNAME="$(cluster_hostname "$CLUSTER")" || exit 1
+if [ ${#CLUSTERS[@]} -eq 0 ]; then
+    CLUSTERS=(bluehive3)
+fi
 
-source "$current_path/start_ssh_control.sh" -a "$CLUSTER"
+TOOLS=()
+[ "$DEPLOY_CODE" = true ] && TOOLS+=(code)
+[ "$DEPLOY_CURSOR" = true ] && TOOLS+=(cursor)
+[ "$DEPLOY_DROPBEAR" = true ] && TOOLS+=(dropbear)
+
+# Drop duplicate cluster names while keeping their order
+unique_clusters=()
+for cluster in "${CLUSTERS[@]}"; do
+    require_cluster "$cluster" || exit 1
+    case " ${unique_clusters[*]} " in
+        *" $cluster "*)
+            ;;
+        *)
+            unique_clusters+=("$cluster")
+            ;;
+    esac
+done
+CLUSTERS=("${unique_clusters[@]}")
+
+# Read credentials once so parallel connections never prompt
+source "$current_path/read_user_password.sh"
 
 if [ -n "$ROOT_OVERRIDE" ]; then
     REMOTE_SHARED_ROOT="$ROOT_OVERRIDE"
     export REMOTE_SHARED_ROOT
 fi
 
-echo "CLUSTER: $CLUSTER"
-echo "HOSTNAME: $HOSTNAME"
+echo "CLUSTERS: ${CLUSTERS[*]}"
+echo "TOOLS: ${TOOLS[*]}"
 echo "REMOTE_SHARED_ROOT: $REMOTE_SHARED_ROOT"
 
 source "$current_path/remote_tools.sh"
 
-if [ "$DEPLOY_CODE" = true ]; then
-    ensure_remote_vscode_cli || exit $?
-fi
+# An explicit deploy rehashes remote files rather than trusting the cached
+# remote state snapshot
+REMOTE_TOOLS_VERIFY=1
+
+status_dir="$(mktemp -d "${TMPDIR:-/tmp}/deploy_remote_tools.XXXXXX")"
+trap 'rm -rf "$status_dir"' EXIT
+
+# Prefix every line with the target it belongs to
+prefix_output() {
+    local line
+    while IFS= read -r line; do
+        printf "[%s] %s\n" "$1" "$line"
+    done
+}
+
+# Connect to a cluster and record the id of its $REMOTE_SHARED_ROOT. The id
+# is created once per filesystem (ln refuses to overwrite, so concurrent
+# first runs agree on one value), which lets clusters sharing a filesystem
+# be deployed once.
+identify_target() {
+    local root="$REMOTE_SHARED_ROOT"
+    CLUSTER="$1"
+    HOSTNAME="$(cluster_hostname "$CLUSTER")" || return 1
+    phase_run ssh_control source "$current_path/start_ssh_control.sh" -a "$CLUSTER" >&2 || return 1
+    # start_ssh_control.sh rereads the configured root; keep --root
+    REMOTE_SHARED_ROOT="$root"
 
-if [ "$DEPLOY_CURSOR" = true ]; then
-    ensure_remote_cursor_cli || exit $?
+    remote_tools_ssh_bash > "$status_dir/$CLUSTER.root" <<'ENDSSH'
+set -euo pipefail
+
+mkdir -p "$REMOTE_SHARED_ROOT"
+id_file="$REMOTE_SHARED_ROOT/.root_id"
+if [ ! -s "$id_file" ]; then
+    tmp_file="$id_file.$$"
+    cat /proc/sys/kernel/random/uuid > "$tmp_file" 2>/dev/null || echo "$(hostname)-$$-$RANDOM$RANDOM" > "$tmp_file"
+    ln "$tmp_file" "$id_file" 2>/dev/null || true
+    rm -f "$tmp_file"
 fi
+cat "$id_file"
+ENDSSH
+}
+
+deploy_tool() {
+    CLUSTER="$1"
+    HOSTNAME="$(cluster_hostname "$CLUSTER")" || return 1
+    case "$2" in
+        code)
+            ensure_remote_vscode_cli
+            ;;
+        cursor)
+            ensure_remote_cursor_cli
+            ;;
+        dropbear)
+            ensure_remote_dropbear
+            ;;
+    esac
+}
+
+# Run a step in the background, prefixing its output and recording its exit
+# code and duration under $status_dir/<name>.status
+run_target() {
+    local name="$1"
+    local tag="$2"
+    shift 2
+    (
+        start=$SECONDS
+        echo "started"
+        # Nested so an exit in a sourced helper still records a status
+        ("$@") 2>&1
+        status=$?
+        printf "%s %s\n" "$status" "$((SECONDS - start))" > "$status_dir/$name.status"
+        if [ $status -eq 0 ]; then
+            echo "finished in $((SECONDS - start))s"
+        else
+            echo "failed with exit code $status after $((SECONDS - start))s"
+        fi
+    ) 2>&1 | prefix_output "$tag" &
+}
+
+for cluster in "${CLUSTERS[@]}"; do
+    run_target "$cluster.connect" "$cluster" identify_target "$cluster"
+done
+wait
+
+# Deploy each shared root from the first cluster that reaches it
+declare -a TARGETS=()
+for cluster in "${CLUSTERS[@]}"; do
+    status=1
+    read -r status _ < "$status_dir/$cluster.connect.status"
+    root_id="$(cat "$status_dir/$cluster.root" 2>/dev/null)"
+    if [ "$status" != 0 ] || [ -z "$root_id" ]; then
+        continue
+    fi
+    for other in "${TARGETS[@]}"; do
+        if [ "$(cat "$status_dir/$other.root")" = "$root_id" ]; then
+            echo "$other" > "$status_dir/$cluster.shared"
+            echo "[$cluster] $REMOTE_SHARED_ROOT is shared with $other; skipping"
+            continue 2
+        fi
+    done
+    TARGETS+=("$cluster")
+done
+
+for cluster in "${TARGETS[@]}"; do
+    for tool in "${TOOLS[@]}"; do
+        run_target "$cluster.$tool" "$cluster/$tool" deploy_tool "$cluster" "$tool"
+    done
+done
+wait
+
+echo
+echo "Deployment summary:"
+failures=0
+for cluster in "${CLUSTERS[@]}"; do
+    status=1
+    read -r status elapsed < "$status_dir/$cluster.connect.status"
+    if [ "$status" != 0 ]; then
+        printf "  %-10s %-9s %s\n" "$cluster" "connect" "FAILED (exit $status)"
+        failures=$((failures + 1))
+        continue
+    fi
+    if [ -f "$status_dir/$cluster.shared" ]; then
+        printf "  %-10s %-9s %s\n" "$cluster" "all" "shared with $(cat "$status_dir/$cluster.shared")"
+        continue
+    fi
+    for tool in "${TOOLS[@]}"; do
+        status=1
+        elapsed=0
+        read -r status elapsed < "$status_dir/$cluster.$tool.status"
+        if [ "$status" = 0 ]; then
+            printf "  %-10s %-9s %s\n" "$cluster" "$tool" "ok (${elapsed}s)"
+        else
+            printf "  %-10s %-9s %s\n" "$cluster" "$tool" "FAILED (exit $status, ${elapsed}s)"
+            failures=$((failures + 1))
+        fi
+    done
+done
 
-if [ "$DEPLOY_DROPBEAR" = true ]; then
-    ensure_remote_dropbear || exit $?
+if [ $failures -gt 0 ]; then
+    echo "Remote tool deployment finished with $failures failure(s)."
+    exit 1
 fi
 
 echo "Remote tool deployment completed."
@@ -0,0 +1,941 @@
+#!/usr/bin/env python3
+"""
+Fake Slurm
+
+Offline stand-ins for the Slurm commands the scripts run on the login node:
+squeue, sbatch, srun, scancel, scontrol, sinfo, sacct and quota. Each command
+is a symlink to this file and the program name selects the command, so a
+directory of symlinks put first on PATH turns any machine into a fake login
+node for the benchmark (benchmark.py).
+
+Jobs are kept in a JSON file guarded by flock. Every job is driven through
+a scripted sequence of states before it starts, for example
+"PENDING:3,RUNNING", where the number is the seconds spent in a state and
+the last state is where the job ends up: RUNNING runs the job's payload,
+any other state (FAILED, CANCELLED, ...) ends the job without running it.
+Scripts may be set per job name: "my_sshd=PENDING:5,RUNNING;PENDING:1,RUNNING"
+gives my_sshd jobs a longer queue wait than all others.
+
+Configuration comes from the environment:
+    FAKE_SLURM_DIR     directory holding the job table (required)
+    FAKE_SLURM_DELAY   seconds every command waits first, standing in for
+                       the controller's response time (default 0)
+    FAKE_SLURM_STATES  state script (default "PENDING:1,RUNNING")
+
+This module only uses the standard library.
+"""
+
+import collections
+import datetime
+import fcntl
+import getpass
+import json
+import os
+import re
+import shlex
+import signal
+import subprocess
+import sys
+import time
+
+DEFAULT_STATES = "PENDING:1,RUNNING"
+FIRST_JOB_ID = 7000001
+JOB_POLL_INTERVAL = 0.1  # Seconds between checks of a waiting job's state
+
+Node = collections.namedtuple(
+    "Node", ["name", "partition", "cpus", "gpus", "memory_gb"]
+)
+
+NODES = [
+    Node("bhg0061", "doppelbock", 48, 4, 512),
+    Node("bhg0062", "doppelbock", 48, 4, 512),
+    Node("bhc0208", "dmi", 64, 8, 1024),
+    Node("bhc0209", "dmi", 64, 8, 1024),
+    Node("bhx0101", "preempt", 32, 2, 256),
+]
+
+ACTIVE_STATES = ("PENDING", "CONFIGURING", "RUNNING", "COMPLETING", "SUSPENDED")
+
+COMPACT_STATES = {
+    "PENDING": "PD",
+    "CONFIGURING": "CF",
+    "RUNNING": "R",
+    "COMPLETING": "CG",
+    "SUSPENDED": "S",
+    "COMPLETED": "CD",
+    "CANCELLED": "CA",
+    "FAILED": "F",
+    "TIMEOUT": "TO",
+}
+
+# squeue -O field names and the -o letter each one is printed with
+LONG_FIELDS = {
+    "jobid": "i",
+    "jobarrayid": "i",
+    "name": "j",
+    "state": "T",
+    "statecompact": "t",
+    "partition": "P",
+    "username": "u",
+    "timeused": "M",
+    "timelimit": "l",
+    "numcpus": "C",
+    "gres": "b",
+    "tres-per-node": "b",
+    "minmemory": "m",
+    "nodelist": "N",
+    "reason": "r",
+    "starttime": "S",
+    "submittime": "V",
+    "prioritylong": "Q",
+    "numnodes": "D",
+}
+
+DEFAULT_SQUEUE_FORMAT = "%.18i %.9P %.8j %.8u %.2t %.10M %.6D %R"
+
+# Options that take a value, per command; everything else is a flag
+VALUE_OPTIONS = {
+    "squeue": "-u --user -n --name -t --states -j --jobs -p --partition -o "
+    "--format -O --Format -S --sort -w --nodelist -A --account",
+    "sbatch": "-p --partition -t --time -c --cpus-per-task -N --nodes -n "
+    "--ntasks --ntasks-per-node --mem --gres -w --nodelist -o --output -e "
+    "--error -J --job-name --mail-type --mail-user --wrap -A --account "
+    "--begin -D --chdir",
+    "srun": "-p --partition -t --time -c --cpus-per-task -N --nodes -n "
+    "--ntasks --ntasks-per-node --mem --gres -w --nodelist -J --job-name "
+    "-o --output -A --account",
+    "scancel": "-u --user -n --name -p --partition -t --state -s --signal",
+    "sinfo": "-p --partition -o --format -O --Format -n --nodes -t --states",
+    "sacct": "-j --jobs -o --format -u --user -S --starttime",
+}
+
+
+def env_float(name, default):
+    """Return a float from the environment, or default when unset or bad."""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def parse_args(command, argv):
+    """
+    Split command-line arguments into options and positional arguments.
+
+    Args:
+        command (str): Command whose VALUE_OPTIONS apply
+        argv (list): Arguments after the program name
+
+    Returns:
+        tuple: (options dict of long or short name to value, positionals);
+            flags map to True, repeated options keep the last value
+    """
+    takes_value = set(VALUE_OPTIONS.get(command, "").split())
+    options = {}
+    positionals = []
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        index += 1
+        if arg == "--":
+            positionals.extend(argv[index:])
+            break
+        if arg.startswith("--") and "=" in arg:
+            name, value = arg.split("=", 1)
+            options[name] = value
+        elif arg in takes_value:
+            options[arg] = argv[index] if index < len(argv) else ""
+            index += 1
+        elif arg.startswith("-") and not arg.startswith("--") and len(arg) > 2:
+            # Attached short value such as -p<partition> or -hN flag groups
+            if arg[:2] in takes_value:
+                options[arg[:2]] = arg[2:]
+            else:
+                for letter in arg[1:]:
+                    options["-" + letter] = True
+        elif arg.startswith("-") and len(arg) > 1:
+            options[arg] = True
+        elif positionals or command not in ("srun", "sbatch"):
+            positionals.append(arg)
+        else:
+            # srun and sbatch stop parsing at the command or script
+            positionals.extend(argv[index - 1 :])
+            break
+    return options, positionals
+
+
+def option(options, *names, default=None):
+    """Return the value of the first of several option names that is set."""
+    for name in names:
+        if name in options:
+            return options[name]
+    return default
+
+
+def parse_states(spec, name):
+    """
+    Parse a state script into (state, seconds) steps for one job.
+
+    Args:
+        spec (str): FAKE_SLURM_STATES value
+        name (str): Job name, selecting a "name=" entry when there is one
+
+    Returns:
+        list: (state, seconds) tuples; the last one has seconds None
+    """
+    chosen = None
+    fallback = None
+    for entry in spec.split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if "=" in entry:
+            entry_name, script = entry.split("=", 1)
+            if entry_name.strip() == name:
+                chosen = script
+        elif fallback is None:
+            fallback = entry
+    script = chosen or fallback or DEFAULT_STATES
+
+    steps = []
+    for part in script.split(","):
+        state, _, seconds = part.strip().partition(":")
+        steps.append((state.upper(), float(seconds) if seconds else 0.0))
+    if not steps:
+        steps = [("RUNNING", 0.0)]
+    steps[-1] = (steps[-1][0], None)
+    return steps
+
+
+def parse_memory_mb(value):
+    """Convert a Slurm memory value such as 256G or 4096 to megabytes."""
+    match = re.match(r"^(\d+)([KMGT]?)", str(value or "").upper())
+    if not match:
+        return 0
+    scale = {"K": 1 / 1024, "": 1, "M": 1, "G": 1024, "T": 1024 * 1024}
+    return int(int(match.group(1)) * scale[match.group(2)])
+
+
+def parse_gpus(gres):
+    """Return the GPU count of a --gres value such as gpu:2 or gpu:a100:1."""
+    match = re.search(r"gpu(?::[A-Za-z0-9_]+)?:(\d+)", str(gres or ""))
+    return int(match.group(1)) if match else 0
+
+
+def format_duration(seconds):
+    """Format seconds the way squeue prints times, e.g. 1-02:03:04."""
+    seconds = max(0, int(seconds))
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if days:
+        return f"{days}-{hours:02d}:{minutes:02d}:{seconds:02d}"
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def format_time(timestamp):
+    """Format an epoch timestamp as Slurm's ISO local time, or N/A."""
+    if not timestamp:
+        return "N/A"
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class JobTable:
+    """
+    The fake controller's job table, stored as JSON under FAKE_SLURM_DIR.
+
+    Use as a context manager for a locked read-modify-write; the table is
+    saved on exit when it was changed.
+    """
+
+    def __init__(self, state_dir):
+        """
+        Initialize the table.
+
+        Args:
+            state_dir (str): Directory holding jobs.json and its lock
+        """
+        self.state_dir = state_dir
+        self.path = os.path.join(state_dir, "jobs.json")
+        self.lock_file = None
+        self.data = None
+        self.changed = False
+
+    def __enter__(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.lock_file = open(os.path.join(self.state_dir, "jobs.lock"), "a")
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+        try:
+            with open(self.path) as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {"next_id": FIRST_JOB_ID, "jobs": {}}
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if self.changed and exc_type is None:
+                tmp_path = f"{self.path}.{os.getpid()}"
+                with open(tmp_path, "w") as f:
+                    json.dump(self.data, f)
+                os.replace(tmp_path, self.path)
+        finally:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+            self.lock_file.close()
+
+    @property
+    def jobs(self):
+        """Return all jobs, active and finished, keyed by job id."""
+        return self.data["jobs"]
+
+    def add(self, job):
+        """Assign a job id, store the job and return the id."""
+        job_id = str(self.data["next_id"])
+        self.data["next_id"] += 1
+        job["job_id"] = job_id
+        self.jobs[job_id] = job
+        self.changed = True
+        return job_id
+
+    def update(self, job_id, **fields):
+        """Change fields of a job unless it has already ended."""
+        job = self.jobs.get(job_id)
+        if job is None or job["state"] not in ACTIVE_STATES:
+            return False
+        job.update(fields)
+        self.changed = True
+        return True
+
+
+def read_jobs(state_dir):
+    """Return a snapshot of the job table."""
+    with JobTable(state_dir) as table:
+        return dict(table.jobs)
+
+
+def node_usage(jobs):
+    """Return {node: (cpus, gpus, memory_mb)} allocated to running jobs."""
+    usage = {}
+    for job in jobs.values():
+        if job["state"] not in ("RUNNING", "COMPLETING") or not job["nodes"]:
+            continue
+        cpus, gpus, memory = usage.get(job["nodes"], (0, 0, 0))
+        usage[job["nodes"]] = (
+            cpus + job["cpus"],
+            gpus + job["gpus"],
+            memory + job["memory_mb"],
+        )
+    return usage
+
+
+def pick_node(partition, requested, jobs):
+    """Return the requested node, or the partition's least used node."""
+    if requested:
+        return requested.split(",")[0]
+    usage = node_usage(jobs)
+    candidates = [node for node in NODES if node.partition == partition]
+    if not candidates:
+        candidates = NODES
+    return min(candidates, key=lambda node: usage.get(node.name, (0, 0, 0))).name
+
+
+def new_job(name, options, user, script_steps):
+    """Build a job record from sbatch or srun options."""
+    now = time.time()
+    pending = sum(seconds or 0 for _, seconds in script_steps[:-1])
+    return {
+        "job_id": "",
+        "name": name,
+        "user": user,
+        "partition": option(options, "-p", "--partition", default="doppelbock"),
+        "state": script_steps[0][0] if len(script_steps) > 1 else "PENDING",
+        "reason": "Priority",
+        "nodes": "",
+        "requested_node": option(options, "-w", "--nodelist", default=""),
+        "cpus": int(
+            option(
+                options,
+                "-c",
+                "--cpus-per-task",
+                "--ntasks-per-node",
+                "-n",
+                "--ntasks",
+                default=1,
+            )
+        ),
+        "gpus": parse_gpus(option(options, "--gres", default="")),
+        "memory_mb": parse_memory_mb(option(options, "--mem", default="4G")),
+        "time_limit": option(options, "-t", "--time", default="1:00:00"),
+        "submit_time": now,
+        "start_time": now + pending,
+        "end_time": None,
+        "runner_pid": None,
+    }
+
+
+def drive_job(state_dir, job_id, steps):
+    """
+    Walk a job through its scripted states up to its final one.
+
+    Args:
+        state_dir (str): FAKE_SLURM_DIR
+        job_id (str): Job to drive
+        steps (list): (state, seconds) steps from parse_states()
+
+    Returns:
+        bool: True when the job reached RUNNING and its payload should run
+    """
+    for state, seconds in steps[:-1]:
+        with JobTable(state_dir) as table:
+            if not table.update(job_id, state=state):
+                return False
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            time.sleep(min(JOB_POLL_INTERVAL, max(0, deadline - time.time())))
+
+    final_state = steps[-1][0]
+    with JobTable(state_dir) as table:
+        job = table.jobs.get(job_id)
+        if job is None or job["state"] not in ACTIVE_STATES:
+            return False
+        if final_state != "RUNNING":
+            table.update(job_id, state=final_state, reason="None", end_time=time.time())
+            return False
+        node = pick_node(job["partition"], job["requested_node"], table.jobs)
+        table.update(
+            job_id, state="RUNNING", reason="None", nodes=node, start_time=time.time()
+        )
+    return True
+
+
+def finish_job(state_dir, job_id, return_code):
+    """Record how a job ended, unless it was cancelled first."""
+    with JobTable(state_dir) as table:
+        job = table.jobs.get(job_id)
+        if job is None or job["state"] not in ACTIVE_STATES:
+            return
+        job["state"] = "COMPLETED" if return_code == 0 else "FAILED"
+        job["end_time"] = time.time()
+        table.changed = True
+
+
+def job_environment(job):
+    """Return the environment a job's payload runs with."""
+    return dict(
+        os.environ,
+        SLURM_JOB_ID=job["job_id"],
+        SLURM_JOBID=job["job_id"],
+        SLURM_JOB_NAME=job["name"],
+        SLURM_JOB_PARTITION=job["partition"],
+        SLURM_JOB_NODELIST=job["nodes"],
+        SLURMD_NODENAME=job["nodes"],
+    )
+
+
+def run_payload(state_dir, job_id, cmd, stdout=None):
+    """
+    Run a started job's payload in its own process group until it exits
+    or the job is cancelled.
+
+    Returns:
+        int: The payload's exit code
+    """
+    job = read_jobs(state_dir)[job_id]
+    process = subprocess.Popen(
+        cmd,
+        env=job_environment(job),
+        stdin=subprocess.DEVNULL,
+        stdout=stdout,
+        stderr=subprocess.STDOUT if stdout is not None else None,
+        start_new_session=True,
+    )
+
+    def stop(signum, frame):
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, stop)
+    return process.wait()
+
+
+def squeue_value(job, letter, now):
+    """Return the text squeue prints for one -o field letter."""
+    if letter == "i":
+        return job["job_id"]
+    if letter == "j":
+        return job["name"]
+    if letter == "T":
+        return job["state"]
+    if letter == "t":
+        return COMPACT_STATES.get(job["state"], job["state"][:2])
+    if letter == "P":
+        return job["partition"]
+    if letter == "u":
+        return job["user"]
+    if letter == "M":
+        if job["state"] == "PENDING":
+            return "0:00"
+        return format_duration(now - job["start_time"])
+    if letter == "l":
+        return job["time_limit"]
+    if letter == "C":
+        return str(job["cpus"])
+    if letter == "b":
+        return f"gres/gpu:{job['gpus']}" if job["gpus"] else "N/A"
+    if letter == "m":
+        return f"{job['memory_mb'] // 1024}G"
+    if letter in ("N", "R"):
+        if letter == "R" and job["state"] == "PENDING":
+            return f"({job['reason']})"
+        return job["nodes"]
+    if letter == "r":
+        return job["reason"]
+    if letter == "S":
+        return format_time(job["start_time"])
+    if letter == "V":
+        return format_time(job["submit_time"])
+    if letter == "Q":
+        return "1000"
+    if letter == "D":
+        return "1"
+    return ""
+
+
+def format_squeue(job, fields, now):
+    """Render one job for a parsed squeue format."""
+    parts = []
+    for literal, letter, width, right in fields:
+        parts.append(literal)
+        if letter is None:
+            continue
+        value = squeue_value(job, letter, now)
+        if width:
+            value = value[:width]
+            value = value.rjust(width) if right else value.ljust(width)
+        parts.append(value)
+    return "".join(parts)
+
+
+def parse_squeue_format(text):
+    """Parse a -o format into (literal, letter, width, right_justify) fields."""
+    fields = []
+    position = 0
+    for match in re.finditer(r"%(\.?)(\d*)([A-Za-z])", text):
+        literal = text[position : match.start()]
+        width = int(match.group(2)) if match.group(2) else 0
+        fields.append((literal, match.group(3), width, bool(match.group(1))))
+        position = match.end()
+    fields.append((text[position:], None, 0, False))
+    return fields
+
+
+def parse_squeue_long_format(text):
+    """Parse a -O field list into the same field tuples as -o."""
+    fields = []
+    for entry in text.split(","):
+        name, _, width = entry.partition(":")
+        letter = LONG_FIELDS.get(name.strip().lower(), "")
+        fields.append(("", letter or None, int(width or 20), False))
+    return fields
+
+
+def header_for(fields, long_names=None):
+    """Render a header line for squeue fields."""
+    names = {value: key.upper() for key, value in LONG_FIELDS.items()}
+    names.update({"i": "JOBID", "R": "NODELIST(REASON)", "t": "ST"})
+    parts = []
+    for index, (literal, letter, width, right) in enumerate(fields):
+        parts.append(literal)
+        if letter is None:
+            continue
+        title = long_names[index] if long_names else names.get(letter, letter)
+        if width:
+            title = title[:width]
+            title = title.rjust(width) if right else title.ljust(width)
+        parts.append(title)
+    return "".join(parts)
+
+
+def cmd_squeue(state_dir, options, positionals):
+    """squeue: list active jobs."""
+    jobs = read_jobs(state_dir)
+    now = time.time()
+
+    def values(*names):
+        value = option(options, *names)
+        return set(str(value).split(",")) if value else None
+
+    users = values("-u", "--user")
+    names = values("-n", "--name")
+    job_ids = values("-j", "--jobs")
+    partitions = values("-p", "--partition")
+    states = values("-t", "--states")
+    if states:
+        full_names = {short: long for long, short in COMPACT_STATES.items()}
+        states = {full_names.get(state.upper(), state.upper()) for state in states}
+
+    long_format = option(options, "-O", "--Format")
+    long_names = None
+    if long_format:
+        fields = parse_squeue_long_format(long_format)
+        long_names = [
+            entry.partition(":")[0].upper() for entry in long_format.split(",")
+        ]
+    else:
+        fields = parse_squeue_format(
+            option(options, "-o", "--format", default=DEFAULT_SQUEUE_FORMAT)
+        )
+
+    lines = []
+    if not option(options, "-h", "--noheader"):
+        lines.append(header_for(fields, long_names))
+    for job in sorted(jobs.values(), key=lambda job: int(job["job_id"])):
+        if job["state"] not in ACTIVE_STATES:
+            continue
+        if users and job["user"] not in users:
+            continue
+        if names and job["name"] not in names:
+            continue
+        if job_ids and job["job_id"] not in job_ids:
+            continue
+        if partitions and job["partition"] not in partitions:
+            continue
+        if states and job["state"] not in states:
+            continue
+        lines.append(format_squeue(job, fields, now))
+
+    if job_ids and not any(jobs.get(job_id) for job_id in job_ids):
+        print("slurm_load_jobs error: Invalid job id specified", file=sys.stderr)
+        return 1
+    for line in lines:
+        print(line)
+    return 0
+
+
+def sbatch_directives(script):
+    """Return the #SBATCH options of a batch script as an argument list."""
+    args = []
+    for line in script.splitlines():
+        if line.startswith("#SBATCH"):
+            args.extend(shlex.split(line[len("#SBATCH") :], comments=False))
+        elif line.strip() and not line.startswith("#"):
+            break
+    return args
+
+
+def cmd_sbatch(state_dir, options, positionals):
+    """sbatch: queue a batch script and start its runner."""
+    wrap = option(options, "--wrap")
+    if wrap:
+        script = f"#!/bin/bash\n{wrap}\n"
+    elif positionals:
+        with open(positionals[0]) as f:
+            script = f.read()
+    else:
+        script = sys.stdin.read()
+
+    directive_options, _ = parse_args("sbatch", sbatch_directives(script))
+    directive_options.update(options)
+    options = directive_options
+
+    name = option(options, "-J", "--job-name", default="sbatch")
+    user = os.environ.get("USER") or getpass.getuser()
+    steps = parse_states(os.environ.get("FAKE_SLURM_STATES", DEFAULT_STATES), name)
+
+    if option(options, "--test-only"):
+        job = new_job(name, options, user, steps)
+        node = pick_node(job["partition"], job["requested_node"], read_jobs(state_dir))
+        print(
+            f"sbatch: Job {FIRST_JOB_ID - 1} to start at "
+            f"{format_time(job['start_time'])} using {job['cpus']} processors "
+            f"on nodes {node} in partition {job['partition']}",
+            file=sys.stderr,
+        )
+        return 0
+
+    cwd = option(options, "-D", "--chdir", default=os.getcwd())
+    with JobTable(state_dir) as table:
+        job_id = table.add(new_job(name, options, user, steps))
+        output = option(options, "-o", "--output", default=f"slurm-{job_id}.out")
+        output = output.replace("%j", job_id).replace("%u", user)
+        script_path = os.path.join(state_dir, f"job_{job_id}.sh")
+        with open(script_path, "w") as f:
+            f.write(script)
+
+        runner = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--run-batch", job_id],
+            cwd=cwd,
+            env=dict(os.environ, FAKE_SLURM_OUTPUT=os.path.join(cwd, output)),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        table.jobs[job_id]["runner_pid"] = runner.pid
+
+    if option(options, "--parsable"):
+        print(job_id)
+    else:
+        print(f"Submitted batch job {job_id}")
+    return 0
+
+
+def run_batch(state_dir, job_id):
+    """Drive a batch job and run its script; the runner behind sbatch."""
+    name = read_jobs(state_dir)[job_id]["name"]
+    steps = parse_states(os.environ.get("FAKE_SLURM_STATES", DEFAULT_STATES), name)
+    if not drive_job(state_dir, job_id, steps):
+        return 0
+
+    script_path = os.path.join(state_dir, f"job_{job_id}.sh")
+    with open(os.environ["FAKE_SLURM_OUTPUT"], "ab") as output:
+        return_code = run_payload(state_dir, job_id, ["bash", script_path], output)
+    finish_job(state_dir, job_id, return_code)
+    return 0
+
+
+def cmd_srun(state_dir, options, positionals):
+    """srun: queue a job, wait for it to start, then run the command."""
+    if not positionals:
+        print("srun: fatal: No command given to execute.", file=sys.stderr)
+        return 1
+
+    name = option(options, "-J", "--job-name", default=os.path.basename(positionals[0]))
+    user = os.environ.get("USER") or getpass.getuser()
+    steps = parse_states(os.environ.get("FAKE_SLURM_STATES", DEFAULT_STATES), name)
+    with JobTable(state_dir) as table:
+        job = new_job(name, options, user, steps)
+        job["runner_pid"] = os.getpid()
+        job_id = table.add(job)
+
+    cancelled = []
+
+    def cancel(signum, frame):
+        cancelled.append(signum)
+        raise KeyboardInterrupt
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, cancel)
+
+    try:
+        print(f"srun: job {job_id} queued and waiting for resources", file=sys.stderr)
+        if not drive_job(state_dir, job_id, steps):
+            print(f"srun: error: job {job_id} did not start", file=sys.stderr)
+            return 1
+        print(f"srun: job {job_id} has been allocated resources", file=sys.stderr)
+        return_code = run_payload(state_dir, job_id, positionals)
+    except KeyboardInterrupt:
+        return_code = 1
+    finish_job(state_dir, job_id, return_code)
+    return return_code
+
+
+def cmd_scancel(state_dir, options, positionals):
+    """scancel: end jobs by id, user or name and stop their runners."""
+    users = option(options, "-u", "--user")
+    names = option(options, "-n", "--name")
+    job_ids = {job_id.split("_")[0] for job_id in positionals}
+    if not job_ids and not users and not names:
+        print("scancel: error: No job identification provided", file=sys.stderr)
+        return 1
+
+    runners = []
+    with JobTable(state_dir) as table:
+        for job in table.jobs.values():
+            if job["state"] not in ACTIVE_STATES:
+                continue
+            if job_ids and job["job_id"] not in job_ids:
+                continue
+            if users and job["user"] not in users.split(","):
+                continue
+            if names and job["name"] not in names.split(","):
+                continue
+            job["state"] = "CANCELLED"
+            job["end_time"] = time.time()
+            table.changed = True
+            if job["runner_pid"]:
+                runners.append(job["runner_pid"])
+
+    for pid in runners:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    return 0
+
+
+def sinfo_rows(state_dir, partitions):
+    """Return (node, usage) pairs for the nodes of the given partitions."""
+    usage = node_usage(read_jobs(state_dir))
+    wanted = set(partitions.split(",")) if partitions else None
+    return [
+        (node, usage.get(node.name, (0, 0, 0)))
+        for node in NODES
+        if wanted is None or node.partition in wanted
+    ]
+
+
+def sinfo_value(node, used, name):
+    """Return the text sinfo prints for one -O field of a node."""
+    cpus, gpus, memory = used
+    name = name.lower()
+    if name == "nodelist":
+        return node.name
+    if name == "partition":
+        return node.partition
+    if name == "statecompact":
+        if cpus >= node.cpus:
+            return "alloc"
+        return "mix" if cpus else "idle"
+    if name == "cpusstate":
+        return f"{cpus}/{node.cpus - cpus}/0/{node.cpus}"
+    if name == "memory":
+        return str(node.memory_gb * 1024)
+    if name == "allocmem":
+        return str(memory)
+    if name == "gres":
+        return f"gpu:{node.gpus}"
+    if name == "gresused":
+        return f"gpu:{gpus}"
+    return ""
+
+
+def cmd_sinfo(state_dir, options, positionals):
+    """sinfo: report the fake nodes and what running jobs use of them."""
+    rows = sinfo_rows(state_dir, option(options, "-p", "--partition"))
+    long_format = option(options, "-O", "--Format")
+    lines = []
+
+    if long_format:
+        fields = []
+        for entry in long_format.split(","):
+            name, _, width = entry.partition(":")
+            fields.append((name, int(width or 20)))
+        if not option(options, "-h", "--noheader"):
+            lines.append("".join(name.upper().ljust(width) for name, width in fields))
+        for node, used in rows:
+            lines.append(
+                "".join(
+                    sinfo_value(node, used, name)[:width].ljust(width)
+                    for name, width in fields
+                )
+            )
+    elif option(options, "-o", "--format") == "%N":
+        if not option(options, "-h", "--noheader"):
+            lines.append("NODELIST")
+        if option(options, "-N", "--Node"):
+            lines.extend(node.name for node, _ in rows)
+        elif rows:
+            lines.append(",".join(node.name for node, _ in rows))
+    else:
+        if not option(options, "-h", "--noheader"):
+            lines.append("PARTITION AVAIL NODES STATE NODELIST")
+        for node, used in rows:
+            state = sinfo_value(node, used, "statecompact")
+            lines.append(f"{node.partition} up 1 {state} {node.name}")
+
+    for line in lines:
+        print(line)
+    return 0
+
+
+def cmd_scontrol(state_dir, options, positionals):
+    """scontrol: only `show node [-o] [NODES]` is supported."""
+    if positionals[:1] != ["show"] or positionals[1:2] not in (["node"], ["nodes"]):
+        print("scontrol: only 'show node' is available offline", file=sys.stderr)
+        return 1
+
+    wanted = set(",".join(positionals[2:]).split(",")) - {""}
+    usage = node_usage(read_jobs(state_dir))
+    for node in NODES:
+        if wanted and node.name not in wanted:
+            continue
+        cpus, gpus, memory = usage.get(node.name, (0, 0, 0))
+        print(
+            f"NodeName={node.name} CPUAlloc={cpus} CPUTot={node.cpus} "
+            f"RealMemory={node.memory_gb * 1024} AllocMem={memory} "
+            f"State={sinfo_value(node, (cpus, gpus, memory), 'statecompact').upper()} "
+            f"Partitions={node.partition} "
+            f"CfgTRES=cpu={node.cpus},mem={node.memory_gb}G,gres/gpu={node.gpus} "
+            f"AllocTRES=cpu={cpus},mem={memory}M,gres/gpu={gpus}"
+        )
+    return 0
+
+
+def cmd_sacct(state_dir, options, positionals):
+    """sacct: report the state of jobs, including finished ones."""
+    job_ids = set(str(option(options, "-j", "--jobs", default="")).split(","))
+    jobs = read_jobs(state_dir)
+    for job_id in sorted(job_ids - {""}):
+        job = jobs.get(job_id)
+        if job is not None:
+            print(job["state"])
+    return 0
+
+
+def cmd_quota(state_dir, options, positionals):
+    """quota: print a fixed group quota table."""
+    print("Disk quotas for group " + (positionals[0] if positionals else "users"))
+    print("Filesystem  blocks   quota   limit   grace   files   quota   limit   grace")
+    print("/scratch    1024G    10T     12T             51234   0       0")
+    return 0
+
+
+COMMANDS = {
+    "squeue": cmd_squeue,
+    "sbatch": cmd_sbatch,
+    "srun": cmd_srun,
+    "scancel": cmd_scancel,
+    "sinfo": cmd_sinfo,
+    "scontrol": cmd_scontrol,
+    "sacct": cmd_sacct,
+    "quota": cmd_quota,
+}
+
+
+def install(bin_dir):
+    """
+    Create one symlink per fake command in a directory.
+
+    Args:
+        bin_dir (str): Directory to put first on PATH
+    """
+    os.makedirs(bin_dir, exist_ok=True)
+    for command in COMMANDS:
+        link = os.path.join(bin_dir, command)
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(os.path.abspath(__file__), link)
+
+
+def main(argv=None):
+    """Dispatch on the program name, or run a batch job's runner."""
+    argv = list(sys.argv if argv is None else argv)
+    state_dir = os.environ.get("FAKE_SLURM_DIR")
+    if not state_dir:
+        print("fake_slurm: FAKE_SLURM_DIR is not set", file=sys.stderr)
+        return 1
+
+    if argv[1:2] == ["--run-batch"]:
+        return run_batch(state_dir, argv[2])
+    if argv[1:2] == ["--install"]:
+        install(argv[2])
+        return 0
+
+    command = os.path.basename(argv[0])
+    if command not in COMMANDS:
+        print(f"fake_slurm: unknown command {command}", file=sys.stderr)
+        return 1
+
+    time.sleep(env_float("FAKE_SLURM_DELAY", 0))
+    options, positionals = parse_args(command, argv[1:])
+    return COMMANDS[command](state_dir, options, positionals)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
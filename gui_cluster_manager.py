@@ -11,14 +11,46 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
 from tkinter import font as tkFont
 import os
-import subprocess
 import sys
-import threading
 import queue
+import time
+import asyncio
+import collections
+import re
 from pathlib import Path
 
-
-DEFAULT_REMOTE_SHARED_ROOT = "/scratch/snormanh_lab/shared"
+from cluster_commands import (
+    DEFAULT_REMOTE_SHARED_ROOT,
+    DEPLOY_MESSAGES,
+    REMOTE_SSHD_MESSAGES,
+    TUNNEL_MESSAGES,
+    build_deploy_command,
+    build_resource_command,
+    build_tunnel_command,
+    default_params,
+    finished_texts,
+    read_credentials,
+)
+from cluster_status import ClusterSnapshot, ClusterStatusPoller
+from job_watcher import JobEvent, follow_events
+from output_index import LineFilter, OutputIndex, classify_line
+from orchestrator import ConnectionResult, Engine, SessionFinished, SessionOutput
+from script_runner import SessionManager
+from session_log import SessionLogReader, list_session_logs, log_state
+from ssh_pool import CONNECT_TIMEOUT, ControlMasterPool
+
+# Output pane limits
+MAX_OUTPUT_LINES = 5000  # Scrollback kept in the output widget
+MAX_QUEUE_MESSAGES_PER_TICK = 2000  # Engine events handled per pump_events call
+QUEUE_POLL_MIN_MS = 30  # Poll interval while output is flowing
+QUEUE_POLL_MAX_MS = 500  # Poll interval while idle
+LOGIN_TIMEOUT = CONNECT_TIMEOUT + 5  # Seconds before a login attempt is abandoned
+JOB_REFRESH_DELAY_MS = 2000  # Job changes collected before their clusters refresh
+
+# Views of the output filter bar and the line category each one shows
+OUTPUT_VIEWS = collections.OrderedDict(
+    [("All", None), ("Errors", "error"), ("Warnings", "warning"), ("Status", "status")]
+)
 
 
 # Modern color scheme constants
@@ -347,24 +379,15 @@ class LoginPage:
 
     def load_user_credentials(self):
         """Load user credentials from user_password.txt file."""
-        user_password_file = Path("user_password.txt")
+        if not Path("user_password.txt").exists():
+            return
 
-        if user_password_file.exists():
-            content = user_password_file.read_text().strip()
-            lines = content.split("\n")
-
-            if len(lines) >= 1:
-                self.user_var.set(lines[0].strip())
-            if len(lines) >= 2:
-                self.password_var.set(lines[1].strip())
-                self.remember_password.set(True)
-            if len(lines) >= 3:
-                remote_shared_root = lines[2].strip()
-                if remote_shared_root.startswith("REMOTE_SHARED_ROOT="):
-                    remote_shared_root = remote_shared_root.split("=", 1)[1]
-                self.remote_shared_root_var.set(
-                    remote_shared_root or DEFAULT_REMOTE_SHARED_ROOT
-                )
+        credentials = read_credentials("user_password.txt")
+        self.user_var.set(credentials["username"])
+        if credentials["password"]:
+            self.password_var.set(credentials["password"])
+            self.remember_password.set(True)
+        self.remote_shared_root_var.set(credentials["remote_shared_root"])
 
     def save_user_credentials(self):
         """Save user credentials to user_password.txt file."""
@@ -426,38 +449,54 @@ class LoginPage:
         self.status_label.config(text="Connecting to cluster...", foreground="orange")
         self.connect_btn.config(state=tk.DISABLED)
 
-        # Test connection in background thread
-        thread = threading.Thread(target=self.test_ssh_connection)
-        thread.daemon = True
-        thread.start()
+        # Test connection on the orchestrator engine
+        self.app_controller.engine.submit(
+            self.test_ssh_connection(
+                self.cluster_var.get(), self.user_var.get(), self.password_var.get()
+            ),
+            pool="remote",
+        )
 
-    def test_ssh_connection(self):
-        """Test SSH connection in background thread."""
-        try:
-            # Get hostname based on cluster
-            cluster = self.cluster_var.get()
+    async def test_ssh_connection(self, cluster, user, password):
+        """
+        Establish the cluster's pooled SSH control master.
 
-            # Test SSH connection with a simple command
-            test_cmd = [
-                "./start_ssh_control.sh",
-                "-a",
-                cluster,
-            ]
+        Runs on the engine loop and posts a ConnectionResult event.
 
-            result = subprocess.run(
-                test_cmd, capture_output=True, text=True, timeout=15
+        Args:
+            cluster (str): Cluster name
+            user (str): Login user name
+            password (str): Password for authentication
+        """
+        engine = self.app_controller.engine
+        try:
+            # Reuses a live master, otherwise authenticates a new one
+            await engine.run_blocking(
+                self.app_controller.ssh_pool.connect,
+                cluster,
+                user,
+                password,
+                timeout=LOGIN_TIMEOUT,
+                retry_rejected=True,
+            )
+            engine.post(ConnectionResult(cluster, True, ""))
+        except asyncio.TimeoutError:
+            engine.post(
+                ConnectionResult(
+                    cluster, False, f"Connection timed out after {LOGIN_TIMEOUT}s"
+                )
             )
-
-            if result.returncode == 0:
-                # Connection successful
-                self.root.after(0, self.connection_success)
-            else:
-                error_msg = result.stderr or "Connection failed"
-                self.root.after(0, lambda: self.connection_failed(error_msg))
-
         except Exception as e:
-            error_msg = str(e)
-            self.root.after(0, lambda: self.connection_failed(error_msg))
+            engine.post(ConnectionResult(cluster, False, str(e)))
+
+    def handle_events(self, events):
+        """Handle engine events on the Tk thread."""
+        for event in events:
+            if isinstance(event, ConnectionResult):
+                if event.ok:
+                    self.connection_success()
+                else:
+                    self.connection_failed(event.error)
 
     def connection_success(self):
         """Handle successful connection."""
@@ -489,6 +528,908 @@ class LoginPage:
         )
 
 
+class SessionTab:
+    """
+    Output tab for a single script session.
+
+    Holds the session's terminal-style text widget, its status line and its
+    own stop and close buttons. Output is indexed line by line as it
+    arrives, which colours it by category and drives the filter bar: a
+    category view shows only the matching lines, and Find steps through the
+    lines a regex matches.
+    """
+
+    def __init__(
+        self,
+        notebook,
+        title,
+        on_stop=None,
+        on_close=None,
+        on_timing=None,
+        on_log=None,
+        messages=None,
+    ):
+        """
+        Create the tab and add it to the notebook.
+
+        Args:
+            notebook (ttk.Notebook): Notebook hosting the tab
+            title (str): Tab label
+            on_stop (callable): Stop button callback; tabs without a
+                session (on_stop is None) have no status line or buttons
+            on_close (callable): Close button callback
+            on_timing (callable): Timing button callback
+            on_log (callable): Log button callback
+            messages (SessionMessages): Texts shown when the session ends
+        """
+        self.frame = tk.Frame(notebook, bg=Colors.BG_CARD)
+        notebook.add(self.frame, text=title)
+        self.messages = messages
+
+        self.status_label = None
+        self.stop_btn = None
+        self.close_btn = None
+
+        if on_stop is not None:
+            header = tk.Frame(self.frame, bg=Colors.BG_CARD)
+            header.pack(fill=tk.X, pady=6)
+
+            self.status_label = ttk.Label(header, text="", style="Body.TLabel")
+            self.status_label.pack(side=tk.LEFT)
+
+            self.close_btn = ttk.Button(
+                header,
+                text="✖ Close",
+                style="MainControl.TButton",
+                command=on_close,
+                state=tk.DISABLED,
+            )
+            self.close_btn.pack(side=tk.RIGHT, ipadx=6, ipady=2)
+
+            self.stop_btn = ttk.Button(
+                header,
+                text="⏹️ Stop",
+                style="Error.TButton",
+                command=on_stop,
+            )
+            self.stop_btn.pack(side=tk.RIGHT, padx=(0, 10), ipadx=6, ipady=2)
+
+            timing_btn = ttk.Button(
+                header,
+                text="⏱️ Timing",
+                style="MainControl.TButton",
+                command=on_timing,
+            )
+            timing_btn.pack(side=tk.RIGHT, padx=(0, 10), ipadx=6, ipady=2)
+
+            log_btn = ttk.Button(
+                header,
+                text="📜 Log",
+                style="MainControl.TButton",
+                command=on_log,
+            )
+            log_btn.pack(side=tk.RIGHT, padx=(0, 10), ipadx=6, ipady=2)
+
+        # Filter bar over the line index
+        self.index = OutputIndex(MAX_OUTPUT_LINES)
+        self.line_filter = None
+        self.filtered = False
+        self.current_match = None
+        self.view_var = tk.StringVar(value="All")
+        self.find_var = tk.StringVar()
+
+        filter_bar = tk.Frame(self.frame, bg=Colors.BG_CARD)
+        filter_bar.pack(fill=tk.X, pady=(0, 6))
+
+        ttk.Label(filter_bar, text="Show:", style="Body.TLabel").pack(side=tk.LEFT)
+        view_box = ttk.Combobox(
+            filter_bar,
+            textvariable=self.view_var,
+            values=list(OUTPUT_VIEWS),
+            state="readonly",
+            width=10,
+        )
+        view_box.pack(side=tk.LEFT, padx=(4, 12))
+        view_box.bind("<<ComboboxSelected>>", lambda event: self.apply_filter())
+
+        ttk.Label(filter_bar, text="Find:", style="Body.TLabel").pack(side=tk.LEFT)
+        find_entry = ttk.Entry(filter_bar, textvariable=self.find_var, width=30)
+        find_entry.pack(side=tk.LEFT, padx=(4, 6))
+        find_entry.bind("<Return>", lambda event: self.jump(1))
+        find_entry.bind("<Shift-Return>", lambda event: self.jump(-1))
+        self.find_var.trace_add("write", lambda *args: self.apply_filter())
+
+        previous_btn = ttk.Button(
+            filter_bar, text="▲", width=3, command=lambda: self.jump(-1)
+        )
+        previous_btn.pack(side=tk.LEFT)
+        next_btn = ttk.Button(
+            filter_bar, text="▼", width=3, command=lambda: self.jump(1)
+        )
+        next_btn.pack(side=tk.LEFT, padx=(2, 8))
+
+        self.match_label = ttk.Label(filter_bar, text="", style="Body.TLabel")
+        self.match_label.pack(side=tk.LEFT)
+
+        # Output text area with modern terminal styling
+        text_container = tk.Frame(self.frame, bg=Colors.BG_CARD)
+        text_container.pack(fill=tk.BOTH, expand=True)
+
+        # Create modern terminal-style text widget
+        self.output_text = tk.Text(
+            text_container,
+            wrap=tk.WORD,
+            font=Fonts.MONOSPACE,
+            bg="#1E1E1E",  # Dark terminal background
+            fg="#D4D4D4",  # Light gray text
+            insertbackground="#FFFFFF",  # White cursor
+            selectbackground="#264F78",  # Selection background
+            selectforeground="#FFFFFF",  # Selection text
+            relief="flat",
+            borderwidth=0,
+            padx=15,
+            pady=10,
+        )
+
+        # Modern scrollbar
+        scrollbar = ttk.Scrollbar(
+            text_container, orient=tk.VERTICAL, command=self.output_text.yview
+        )
+        self.output_text.configure(yscrollcommand=scrollbar.set)
+
+        # Pack with modern layout
+        self.output_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Make output text read-only
+        self.output_text.configure(state=tk.DISABLED)
+
+        # Configure text tags for colored output
+        self.setup_output_text_tags(self.output_text)
+
+        # In a filtered view, double-click shows the line in the full output
+        self.output_text.bind("<Double-Button-1>", self.show_in_context)
+
+    @staticmethod
+    def setup_output_text_tags(text_widget):
+        """Setup text tags for colored terminal output on a text widget."""
+        # Success messages
+        text_widget.tag_configure(
+            "success", foreground=Colors.SUCCESS, font=Fonts.MONOSPACE
+        )
+
+        # Error messages
+        text_widget.tag_configure(
+            "error", foreground=Colors.ERROR, font=Fonts.MONOSPACE
+        )
+
+        # Warning messages
+        text_widget.tag_configure(
+            "warning", foreground=Colors.WARNING, font=Fonts.MONOSPACE
+        )
+
+        # Info messages
+        text_widget.tag_configure(
+            "info", foreground=Colors.SECONDARY, font=Fonts.MONOSPACE
+        )
+
+        # Command headers
+        text_widget.tag_configure(
+            "header", foreground="#61DAFB", font=("Consolas", 11, "bold")
+        )
+
+        # Ports, links, job ids and other status lines
+        text_widget.tag_configure("status", foreground="#DCDCAA", font=Fonts.MONOSPACE)
+
+        # Current Find match
+        text_widget.tag_configure("match", background="#515C6A")
+        text_widget.tag_raise("match")
+
+    def set_status(self, text, color):
+        """Update the tab's status line."""
+        if self.status_label is not None:
+            self.status_label.config(text=text, foreground=color)
+
+    def set_finished(self):
+        """Disable the stop button and allow the tab to be closed."""
+        if self.stop_btn is not None:
+            self.stop_btn.config(state=tk.DISABLED)
+            self.close_btn.config(state=tk.NORMAL)
+
+    def append_output(self, text, auto_scroll=True):
+        """
+        Append text to the tab, keeping at most MAX_OUTPUT_LINES.
+
+        The text is indexed first; the widget then only receives what the
+        current view shows and tags the lines the text completed.
+
+        Args:
+            text (str): Text to append
+            auto_scroll (bool): Scroll to the end after inserting
+        """
+        if not text:
+            return
+
+        completed, trimmed = self.index.append(text)
+        if self.line_filter is not None:
+            added, dropped = self.line_filter.update()
+
+        self.output_text.configure(state=tk.NORMAL)
+        if self.filtered:
+            if dropped:
+                self.output_text.delete("1.0", f"{dropped + 1}.0")
+            self.insert_lines(added)
+        elif text.count("\n") > MAX_OUTPUT_LINES:
+            # Most of the widget would be trimmed right away
+            self.render()
+        else:
+            self.output_text.insert(tk.END, text)
+            if trimmed:
+                self.output_text.delete("1.0", f"{trimmed + 1}.0")
+            for number in completed:
+                if number < self.index.first:
+                    continue
+                category = self.index.line(number)[1]
+                if category is not None:
+                    row = number - self.index.first + 1
+                    self.output_text.tag_add(category, f"{row}.0", f"{row}.end")
+        self.output_text.configure(state=tk.DISABLED)
+
+        if self.line_filter is not None:
+            self.update_match_label()
+        if auto_scroll:
+            self.output_text.see(tk.END)
+
+    def insert_lines(self, numbers):
+        """Insert indexed lines, one per row and tagged by category."""
+        chunks = []
+        for number in numbers:
+            line, category = self.index.line(number)
+            chunks.extend((line + "\n", category or ()))
+        if chunks:
+            self.output_text.insert(tk.END, *chunks)
+
+    def render(self):
+        """Redraw the widget from the index for the current view."""
+        self.output_text.configure(state=tk.NORMAL)
+        self.output_text.delete("1.0", tk.END)
+        if self.filtered:
+            self.insert_lines(self.line_filter.matches)
+        else:
+            self.insert_lines(range(self.index.first, self.index.end))
+            self.output_text.insert(tk.END, self.index.line(self.index.end)[0])
+        self.output_text.configure(state=tk.DISABLED)
+
+    def apply_filter(self):
+        """Rebuild the filter and the view from the filter bar."""
+        category = OUTPUT_VIEWS[self.view_var.get()]
+        pattern = self.find_var.get()
+        try:
+            re.compile(pattern)
+        except re.error:
+            pattern = ""
+        if category is None and not pattern:
+            self.line_filter = None
+        else:
+            self.line_filter = LineFilter(self.index, category, pattern)
+
+        self.filtered = category is not None
+        self.current_match = None
+        self.render()
+        self.update_match_label()
+        if pattern != self.find_var.get():
+            self.match_label.config(text="Invalid regex")
+        self.output_text.see(tk.END)
+
+    def row_of(self, number):
+        """Return the widget row showing an indexed line in this view."""
+        if self.filtered:
+            return self.line_filter.matches.position(number) + 1
+        return number - self.index.first + 1
+
+    def jump(self, direction):
+        """
+        Move to the next or previous matching line, wrapping around.
+
+        Args:
+            direction (int): 1 for the next match, -1 for the previous one
+        """
+        if self.line_filter is None or not self.line_filter.matches:
+            return
+
+        matches = self.line_filter.matches
+        number = None
+        if self.current_match is not None and self.current_match >= self.index.first:
+            if direction > 0:
+                number = matches.after(self.current_match)
+            else:
+                number = matches.before(self.current_match)
+        if number is None:
+            # Start over from the other end
+            if direction > 0:
+                number = matches.after(self.index.first - 1)
+            else:
+                number = matches.before(self.index.end + 1)
+        self.select_match(number)
+
+    def select_match(self, number):
+        """Highlight a matching line and scroll it into view."""
+        self.current_match = number
+        row = self.row_of(number)
+        self.output_text.tag_remove("match", "1.0", tk.END)
+        self.output_text.tag_add("match", f"{row}.0", f"{row}.end")
+        self.output_text.see(f"{row}.0")
+        self.update_match_label()
+
+    def show_in_context(self, event):
+        """Switch a filtered view to all output at the double-clicked line."""
+        if not self.filtered or not self.line_filter.matches:
+            return None
+
+        row = int(self.output_text.index(f"@{event.x},{event.y}").split(".")[0])
+        position = min(row, len(self.line_filter.matches)) - 1
+        number = self.line_filter.matches.at(position)
+        self.view_var.set("All")
+        self.apply_filter()
+        self.select_match(number)
+        return "break"
+
+    def update_match_label(self):
+        """Show the match count and the position of the current match."""
+        if self.line_filter is None:
+            self.match_label.config(text="")
+            return
+
+        matches = self.line_filter.matches
+        position = None
+        if self.current_match is not None:
+            position = matches.position(self.current_match)
+        if position is None:
+            self.match_label.config(text=f"{len(matches)} lines")
+        else:
+            self.match_label.config(text=f"{position + 1} of {len(matches)}")
+
+    def clear(self):
+        """Clear the tab's output."""
+        self.index.clear()
+        self.apply_filter()
+
+
+class ClusterDashboard:
+    """
+    Live job, node and quota tables for every cluster.
+
+    Rows are keyed by cluster and node, job or filesystem and updated in
+    place, so each snapshot only touches the rows that changed.
+    """
+
+    TABLES = {
+        "nodes": (
+            "🖥️ Resources",
+            [
+                ("cluster", "Cluster", 90),
+                ("node", "Node", 90),
+                ("partitions", "Partitions", 150),
+                ("state", "State", 90),
+                ("cpu", "CPU free/total", 110),
+                ("gpu", "GPU free/total", 110),
+                ("memory", "Memory free/total", 140),
+            ],
+        ),
+        "jobs": (
+            "📋 Jobs",
+            [
+                ("cluster", "Cluster", 80),
+                ("job_id", "Job ID", 80),
+                ("partition", "Partition", 90),
+                ("user", "User", 80),
+                ("state", "State", 80),
+                ("time_used", "Time", 80),
+                ("time_limit", "Limit", 80),
+                ("cpus", "CPUs", 50),
+                ("gres", "GRES", 80),
+                ("memory", "Memory", 70),
+                ("nodes", "Nodes", 90),
+                ("name", "Name", 140),
+                ("reason", "Reason", 120),
+            ],
+        ),
+        "quota": (
+            "💾 Quota",
+            [
+                ("cluster", "Cluster", 90),
+                ("filesystem", "Filesystem", 260),
+                ("used", "Used", 90),
+                ("quota", "Quota", 90),
+                ("limit", "Limit", 90),
+                ("files", "Files", 90),
+            ],
+        ),
+    }
+
+    def __init__(self, notebook, on_refresh):
+        """
+        Create the dashboard tab and add it to the notebook.
+
+        Args:
+            notebook (ttk.Notebook): Notebook hosting the tab
+            on_refresh (callable): Refresh button callback
+        """
+        self.frame = tk.Frame(notebook, bg=Colors.BG_CARD)
+        notebook.add(self.frame, text="📈 Dashboard")
+
+        header = tk.Frame(self.frame, bg=Colors.BG_CARD)
+        header.pack(fill=tk.X, pady=6)
+
+        self.updated_label = ttk.Label(
+            header, text="⏳ Waiting for first update...", style="Body.TLabel"
+        )
+        self.updated_label.pack(side=tk.LEFT)
+
+        ttk.Button(
+            header,
+            text="🔄 Refresh",
+            style="MainControl.TButton",
+            command=on_refresh,
+        ).pack(side=tk.RIGHT, ipadx=6, ipady=2)
+
+        tables = ttk.Notebook(self.frame)
+        tables.pack(fill=tk.BOTH, expand=True)
+
+        self.trees = {}
+        self.rows = {}
+        self.snapshots = {}
+
+        for name, (title, columns) in self.TABLES.items():
+            container = tk.Frame(tables, bg=Colors.BG_CARD)
+            tables.add(container, text=title)
+
+            tree = ttk.Treeview(
+                container,
+                columns=[column for column, _, _ in columns],
+                show="headings",
+            )
+            for column, heading, width in columns:
+                tree.heading(column, text=heading)
+                tree.column(column, width=width, anchor=tk.W)
+
+            scrollbar = ttk.Scrollbar(container, orient=tk.VERTICAL, command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+            self.trees[name] = tree
+            self.rows[name] = {}
+
+    def apply_snapshot(self, snapshot):
+        """
+        Merge one cluster's snapshot into the tables.
+
+        A failed snapshot keeps the cluster's previous rows and only marks
+        the cluster as failing in the header.
+        """
+        self.snapshots[snapshot.cluster] = snapshot
+
+        if not snapshot.error:
+            cluster = snapshot.cluster
+            self.update_rows(
+                "nodes",
+                cluster,
+                {
+                    (cluster, node.node): (
+                        cluster,
+                        node.node,
+                        node.partitions,
+                        node.state,
+                        f"{node.cpu_free}c/{node.cpu_total}c",
+                        f"{node.gpu_free}g/{node.gpu_total}g",
+                        f"{node.memory_free_gb}GB/{node.memory_total_gb}GB",
+                    )
+                    for node in snapshot.nodes
+                },
+            )
+            self.update_rows(
+                "jobs",
+                cluster,
+                {
+                    (cluster, job.job_id): (cluster,) + tuple(job)
+                    for job in snapshot.jobs
+                },
+            )
+            self.update_rows(
+                "quota",
+                cluster,
+                {
+                    (cluster, row.filesystem): (cluster,) + tuple(row)
+                    for row in snapshot.quota
+                },
+            )
+
+        self.update_header()
+
+    def update_rows(self, name, cluster, new_rows):
+        """Insert, update and delete one cluster's rows in a table."""
+        tree = self.trees[name]
+        current = self.rows[name]
+
+        for key in [key for key in current if key[0] == cluster]:
+            if key not in new_rows:
+                tree.delete("|".join(key))
+                del current[key]
+
+        for key, values in new_rows.items():
+            if key not in current:
+                tree.insert("", tk.END, iid="|".join(key), values=values)
+            elif current[key] != values:
+                tree.item("|".join(key), values=values)
+            current[key] = values
+
+    def update_header(self):
+        """Show when each cluster was last updated, or why it failed."""
+        parts = []
+        for cluster, snapshot in sorted(self.snapshots.items()):
+            updated = time.strftime("%H:%M:%S", time.localtime(snapshot.updated_at))
+            if snapshot.error:
+                parts.append(f"⚠️ {cluster} {updated}")
+            else:
+                parts.append(f"✅ {cluster} {updated}")
+        self.updated_label.config(text="   ".join(parts))
+
+
+class TimingWindow:
+    """
+    Waterfall of the phase timing spans reported by one script session.
+
+    Each phase is drawn as a bar on a shared time axis starting when the
+    script was launched; failed phases are drawn in the error color. The
+    view refreshes while the session is still running.
+    """
+
+    ROW_HEIGHT = 26
+    LABEL_WIDTH = 180
+    BAR_WIDTH = 460
+    REFRESH_MS = 1000
+
+    def __init__(self, root, session):
+        """
+        Open the timing window.
+
+        Args:
+            root (tk.Tk): The main tkinter window
+            session (ScriptSession): Session whose spans are shown
+        """
+        self.session = session
+
+        self.window = tk.Toplevel(root)
+        self.window.title(f"⏱️ Timing - {session.title} #{session.session_id}")
+        self.window.configure(bg=Colors.BG_CARD)
+
+        self.summary_label = ttk.Label(self.window, text="", style="Body.TLabel")
+        self.summary_label.pack(anchor=tk.W, padx=15, pady=(12, 6))
+
+        self.canvas = tk.Canvas(
+            self.window,
+            bg=Colors.BG_CARD,
+            highlightthickness=0,
+            width=self.LABEL_WIDTH + self.BAR_WIDTH + 80,
+            height=self.ROW_HEIGHT * 4,
+        )
+        self.canvas.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 12))
+
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the waterfall and reschedule while the session runs."""
+        if not self.window.winfo_exists():
+            return
+
+        self.draw(self.session.phase_spans())
+
+        if self.session.is_running:
+            self.window.after(self.REFRESH_MS, self.refresh)
+
+    def draw(self, spans):
+        """Draw one bar per span on a shared time axis."""
+        self.canvas.delete("all")
+
+        if not spans:
+            self.summary_label.config(text="No timing spans reported yet")
+            return
+
+        # Remote clocks can be slightly ahead of or behind the local one
+        start = min(
+            [span.start for span in spans] + [self.session.started_at or time.time()]
+        )
+        end = max(
+            [span.end for span in spans] + [self.session.finished_at or time.time()]
+        )
+        total = max(end - start, 0.001)
+        scale = self.BAR_WIDTH / total
+
+        for row, span in enumerate(spans):
+            top = row * self.ROW_HEIGHT + 4
+            middle = top + self.ROW_HEIGHT / 2 - 2
+            duration = span.end - span.start
+            x0 = self.LABEL_WIDTH + (span.start - start) * scale
+            x1 = max(x0 + 2, self.LABEL_WIDTH + (span.end - start) * scale)
+            color = Colors.SUCCESS if span.exit_code == 0 else Colors.ERROR
+
+            self.canvas.create_text(
+                0, middle, anchor=tk.W, text=span.phase, font=Fonts.SMALL
+            )
+            self.canvas.create_rectangle(
+                x0, top + 4, x1, top + self.ROW_HEIGHT - 8, fill=color, outline=""
+            )
+            self.canvas.create_text(
+                x1 + 6,
+                middle,
+                anchor=tk.W,
+                text=f"{duration:.2f}s",
+                font=Fonts.SMALL,
+                fill=Colors.TEXT_SECONDARY,
+            )
+
+        self.canvas.config(height=len(spans) * self.ROW_HEIGHT + 8)
+
+        slowest = max(spans, key=lambda span: span.end - span.start)
+        self.summary_label.config(
+            text=(
+                f"Total {total:.1f}s • {len(spans)} phases • slowest: "
+                f"{slowest.phase} ({slowest.end - slowest.start:.1f}s)"
+            )
+        )
+
+
+class SessionLogWindow:
+    """
+    Virtualized viewer over a session log on disk.
+
+    Only the rows that fit in the window are read from the log and put in
+    the text widget, while the scrollbar spans the whole log, so the
+    viewer's memory does not grow with the session. A live log is polled
+    for new output, and the view follows it while scrolled to the end.
+    """
+
+    REFRESH_MS = 1000
+    WHEEL_LINES = 3
+
+    def __init__(self, root, path, title):
+        """
+        Open the log window.
+
+        Args:
+            root (tk.Tk): The main tkinter window
+            path (Path): Session log directory
+            title (str): Label of the session
+        """
+        self.reader = SessionLogReader(path)
+        self.title = title
+        self.top = 0
+        self.follow = True
+
+        self.window = tk.Toplevel(root)
+        self.window.title(f"📜 Log - {title}")
+        self.window.configure(bg=Colors.BG_CARD)
+        self.window.geometry("960x600")
+
+        self.summary_label = ttk.Label(self.window, text="", style="Body.TLabel")
+        self.summary_label.pack(anchor=tk.W, padx=15, pady=(12, 6))
+
+        container = tk.Frame(self.window, bg=Colors.BG_CARD)
+        container.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 12))
+        container.rowconfigure(0, weight=1)
+        container.columnconfigure(0, weight=1)
+
+        self.text = tk.Text(
+            container,
+            wrap=tk.NONE,
+            font=Fonts.MONOSPACE,
+            bg="#1E1E1E",
+            fg="#D4D4D4",
+            selectbackground="#264F78",
+            selectforeground="#FFFFFF",
+            relief="flat",
+            borderwidth=0,
+            padx=10,
+            pady=6,
+        )
+        SessionTab.setup_output_text_tags(self.text)
+        self.line_height = tkFont.Font(font=Fonts.MONOSPACE).metrics("linespace")
+
+        # The vertical scrollbar moves the window over the log, not the widget
+        self.scrollbar = ttk.Scrollbar(
+            container, orient=tk.VERTICAL, command=self.on_scrollbar
+        )
+        x_scrollbar = ttk.Scrollbar(
+            container, orient=tk.HORIZONTAL, command=self.text.xview
+        )
+        self.text.configure(xscrollcommand=x_scrollbar.set, state=tk.DISABLED)
+
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        x_scrollbar.grid(row=1, column=0, sticky="ew")
+
+        self.text.bind("<Configure>", lambda event: self.render())
+        self.text.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.text.bind("<Button-4>", lambda event: self.on_wheel_step(-1))
+        self.text.bind("<Button-5>", lambda event: self.on_wheel_step(1))
+        self.window.bind("<Prior>", lambda event: self.scroll(-self.visible_rows()))
+        self.window.bind("<Next>", lambda event: self.scroll(self.visible_rows()))
+        self.window.bind("<Home>", lambda event: self.scroll_to(0))
+        self.window.bind("<End>", lambda event: self.scroll_to(self.end_line()))
+
+        self.refresh()
+
+    def visible_rows(self):
+        """Return how many lines fit in the text widget."""
+        return max(1, (self.text.winfo_height() - 12) // self.line_height)
+
+    def end_line(self):
+        """Return the number after the last line, counting an open line."""
+        return self.reader.line_count + (1 if self.reader.tail else 0)
+
+    def render(self):
+        """Read the visible lines from the log and show them."""
+        rows = self.visible_rows()
+        first = self.reader.first_line
+        end = self.end_line()
+        last_top = max(first, end - rows)
+        if self.follow:
+            self.top = last_top
+        self.top = max(first, min(self.top, last_top))
+
+        lines = self.reader.lines(self.top, self.top + rows)
+        if self.reader.tail and self.top + rows > self.reader.line_count:
+            lines.append(self.reader.tail)
+
+        chunks = []
+        for line in lines:
+            chunks.extend((line + "\n", classify_line(line) or ()))
+        if chunks:
+            # No empty row after the last line to scroll the widget by
+            chunks[-2] = chunks[-2][:-1]
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        if chunks:
+            self.text.insert(tk.END, *chunks)
+        self.text.configure(state=tk.DISABLED)
+
+        span = max(end - first, 1)
+        self.scrollbar.set((self.top - first) / span, (self.top - first + rows) / span)
+
+        summary = f"{self.title} • no output"
+        if lines:
+            summary = (
+                f"{self.title} • lines {self.top + 1}–{self.top + len(lines)} of {end}"
+            )
+        manifest = self.reader.manifest
+        if manifest is None:
+            summary += " • log missing"
+        else:
+            summary += f" • {log_state(manifest)}"
+            if manifest["return_code"]:
+                summary += f" (exit {manifest['return_code']})"
+        self.summary_label.config(text=summary)
+
+    def scroll_to(self, top):
+        """Show the log from a line, following new output at the end."""
+        self.top = top
+        self.follow = top >= self.end_line() - self.visible_rows()
+        self.render()
+
+    def scroll(self, lines):
+        """Move the view by a number of lines."""
+        self.scroll_to(self.top + lines)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """Translate scrollbar commands into line positions."""
+        if action == "moveto":
+            first = self.reader.first_line
+            self.scroll_to(first + int(float(amount) * (self.end_line() - first)))
+        elif unit == "pages":
+            self.scroll(int(amount) * self.visible_rows())
+        else:
+            self.scroll(int(amount))
+
+    def on_mouse_wheel(self, event):
+        """Handle a wheel event carrying a delta (Windows and macOS)."""
+        return self.on_wheel_step(-1 if event.delta > 0 else 1)
+
+    def on_wheel_step(self, direction):
+        """Scroll WHEEL_LINES lines instead of scrolling the widget itself."""
+        self.scroll(direction * self.WHEEL_LINES)
+        return "break"
+
+    def refresh(self):
+        """Pick up new output and reschedule while the log is live."""
+        if not self.window.winfo_exists():
+            return
+
+        if self.reader.refresh() or self.reader.manifest is None:
+            self.render()
+
+        if self.reader.is_live:
+            self.window.after(self.REFRESH_MS, self.refresh)
+
+
+class SessionLogBrowser:
+    """
+    List of the session logs on disk, newest first.
+
+    Double-click a log or select it and press Open to view it in a
+    SessionLogWindow.
+    """
+
+    def __init__(self, root):
+        """
+        Open the browser window.
+
+        Args:
+            root (tk.Tk): The main tkinter window
+        """
+        self.root = root
+        self.paths = {}
+
+        self.window = tk.Toplevel(root)
+        self.window.title("🗂️ Session Logs")
+        self.window.configure(bg=Colors.BG_CARD)
+
+        buttons = tk.Frame(self.window, bg=Colors.BG_CARD)
+        buttons.pack(fill=tk.X, padx=15, pady=(12, 6))
+        open_btn = ttk.Button(
+            buttons, text="📜 Open", style="MainControl.TButton", command=self.open
+        )
+        open_btn.pack(side=tk.LEFT, ipadx=6, ipady=2)
+        refresh_btn = ttk.Button(
+            buttons,
+            text="🔄 Refresh",
+            style="MainControl.TButton",
+            command=self.refresh,
+        )
+        refresh_btn.pack(side=tk.LEFT, padx=(10, 0), ipadx=6, ipady=2)
+
+        columns = ("started", "title", "state", "command")
+        self.tree = ttk.Treeview(
+            self.window, columns=columns, show="headings", height=16
+        )
+        for column, width in zip(columns, (150, 170, 110, 420)):
+            self.tree.heading(column, text=column.capitalize())
+            self.tree.column(column, width=width, anchor=tk.W)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 12))
+        self.tree.bind("<Double-1>", lambda event: self.open())
+
+        self.refresh()
+
+    def refresh(self):
+        """Reload the list of logs."""
+        self.tree.delete(*self.tree.get_children())
+        self.paths = {}
+        for path, manifest in list_session_logs():
+            started = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(manifest.get("started_at") or 0)
+            )
+            state = log_state(manifest)
+            if manifest.get("return_code"):
+                state += f" ({manifest['return_code']})"
+            item = self.tree.insert(
+                "",
+                tk.END,
+                values=(
+                    started,
+                    manifest.get("title", ""),
+                    state,
+                    " ".join(manifest.get("cmd", [])),
+                ),
+            )
+            self.paths[item] = (path, f"{manifest.get('title', '')} {started}")
+
+    def open(self):
+        """Open the selected logs."""
+        for item in self.tree.selection():
+            path, title = self.paths[item]
+            SessionLogWindow(self.root, path, title)
+
+
 class MainPage:
     """
     Main functionality page for cluster management operations.
@@ -496,7 +1437,8 @@ class MainPage:
     Provides interface for:
     - Cluster connection parameter configuration
     - tunnel.sh and remote_sshd.sh execution with real-time output
-    - pls.sh script execution
+    - Concurrent script sessions, each with its own output tab
+    - Live multi-cluster job and resource dashboard
     - Cursor server updates
     """
 
@@ -514,33 +1456,38 @@ class MainPage:
         self.user_info = user_info
 
         # Define default tunnel parameters
-        self.default_params = {
-            "cluster": user_info["cluster"],
-            "partition": "doppelbock",
-            "cpus": "16",
-            "gpus": "1",
-            "memory": "256",
-            "time": "12",
-            "node": "",
-            "tunnel_tool": "code",
-            "no_log": False,
-        }
+        self.default_params = default_params(user_info["cluster"])
 
         # Initialize parameter variables
         self.param_vars = {}
 
         # Command execution control
-        self.current_process = None
-        self.output_queue = queue.Queue()
-        self.is_running = False
+        self.sessions = SessionManager(app_controller.engine, user_info["username"])
+        self.session_tabs = {}
+
+        # Background job and resource polling for the dashboard
+        self.status_poller = ClusterStatusPoller(
+            app_controller.engine,
+            app_controller.ssh_pool,
+            user_info["username"],
+            user_info["password"],
+        )
+
+        # Job state changes from the local job watcher shared with the scripts
+        self.job_events_future = None
+        # Clusters whose jobs changed, refreshed together after a short delay
+        self.job_refresh_clusters = set()
+        self.job_refresh_after = None
 
         # Set up GUI components
         self.setup_styles()
         self.create_main_widgets()
-
-        # Start output monitoring
-        self.after_id = None
-        self.check_queue()
+        self.status_poller.start()
+        self.job_events_future = app_controller.engine.submit(
+            follow_events(
+                app_controller.engine, user_info["username"], user_info["cluster"]
+            )
+        )
 
     def setup_styles(self):
         """Configure modern ttk styles for better appearance."""
@@ -687,11 +1634,11 @@ class MainPage:
         )
         title_label.pack(side=tk.LEFT)
 
-        # Connection indicator
-        status_indicator = tk.Label(
+        # Connection indicator (follows the pooled control master)
+        self.status_indicator = tk.Label(
             title_section, text="🟢", bg=Colors.BG_LIGHT, font=("Arial", 14)
         )
-        status_indicator.pack(side=tk.LEFT, padx=(10, 0))
+        self.status_indicator.pack(side=tk.LEFT, padx=(10, 0))
 
         # User info and logout section
         user_section = tk.Frame(header_frame, bg=Colors.BG_LIGHT)
@@ -755,7 +1702,7 @@ class MainPage:
 
         # Initialize parameter variables with default values
         for key, default_value in self.default_params.items():
-            if key == "no_log":
+            if isinstance(default_value, bool):
                 self.param_vars[key] = tk.BooleanVar(value=default_value)
             else:
                 self.param_vars[key] = tk.StringVar(value=str(default_value))
@@ -892,6 +1839,13 @@ class MainPage:
             variable=self.param_vars["no_log"],
         ).pack(side=tk.LEFT)
 
+        # Let the scripts pick the partition and node with the earliest start
+        ttk.Checkbutton(
+            checkbox_frame,
+            text="🧭 Plan placement",
+            variable=self.param_vars["plan"],
+        ).pack(side=tk.LEFT, padx=(15, 0))
+
     def create_buttons_section(self, parent):
         """Create action buttons section."""
         button_frame = tk.Frame(parent, bg=Colors.BG_LIGHT)
@@ -922,16 +1876,16 @@ class MainPage:
         # PLS button
         self.pls_btn = ttk.Button(
             left_buttons,
-            text="📊 Execute pls.sh",
+            text="📊 Cluster Status",
             style="Success.TButton",
-            command=self.execute_pls_script,
+            command=self.show_dashboard,
         )
         self.pls_btn.pack(side=tk.LEFT, padx=(0, 15), ipadx=15, ipady=8)
 
-        # Stop Command button
+        # Stop Command button (stops every running session)
         self.stop_btn = ttk.Button(
             left_buttons,
-            text="⏹️ Stop Execution",
+            text="⏹️ Stop All",
             style="Error.TButton",
             command=self.stop_command,
             state=tk.DISABLED,
@@ -950,13 +1904,6 @@ class MainPage:
         )
         self.update_btn.pack(ipadx=15, ipady=8)
 
-        self.action_buttons = [
-            self.connect_btn,
-            self.remote_sshd_btn,
-            self.pls_btn,
-            self.update_btn,
-        ]
-
         # Status section
         status_frame = tk.Frame(parent, bg=Colors.BG_LIGHT)
         status_frame.pack(fill=tk.X, pady=(5, 0))
@@ -968,7 +1915,7 @@ class MainPage:
         self.status_label.pack()
 
     def create_output_section(self, parent):
-        """Create real-time output display section."""
+        """Create real-time output display section with one tab per session."""
         output_frame = ttk.LabelFrame(
             parent,
             text="  📊 Script Execution Output  ",
@@ -994,6 +1941,15 @@ class MainPage:
         )
         clear_btn.pack(side=tk.LEFT, padx=(0, 15), ipadx=10, ipady=4)
 
+        # Past and current session logs kept on disk
+        logs_btn = ttk.Button(
+            left_controls,
+            text="🗂️ Session Logs",
+            style="MainControl.TButton",
+            command=self.show_session_logs,
+        )
+        logs_btn.pack(side=tk.LEFT, padx=(0, 15), ipadx=10, ipady=4)
+
         # Auto-scroll checkbox with modern styling
         self.auto_scroll = tk.BooleanVar(value=True)
         scroll_cb = ttk.Checkbutton(
@@ -1011,424 +1967,373 @@ class MainPage:
         terminal_info.configure(foreground=Colors.TEXT_SECONDARY)
         terminal_info.pack()
 
-        # Output text area with modern terminal styling
-        text_container = tk.Frame(output_frame, bg=Colors.BG_CARD)
-        text_container.pack(fill=tk.BOTH, expand=True)
+        # One tab per script session, plus a general tab for setup messages
+        self.output_notebook = ttk.Notebook(output_frame)
+        self.output_notebook.pack(fill=tk.BOTH, expand=True)
 
-        # Create modern terminal-style text widget
-        self.output_text = tk.Text(
-            text_container,
-            wrap=tk.WORD,
-            font=Fonts.MONOSPACE,
-            bg="#1E1E1E",  # Dark terminal background
-            fg="#D4D4D4",  # Light gray text
-            insertbackground="#FFFFFF",  # White cursor
-            selectbackground="#264F78",  # Selection background
-            selectforeground="#FFFFFF",  # Selection text
-            relief="flat",
-            borderwidth=0,
-            padx=15,
-            pady=10,
-        )
-
-        # Modern scrollbar
-        scrollbar = ttk.Scrollbar(
-            text_container, orient=tk.VERTICAL, command=self.output_text.yview
-        )
-        self.output_text.configure(yscrollcommand=scrollbar.set)
-
-        # Pack with modern layout
-        self.output_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # Make output text read-only
-        self.output_text.configure(state=tk.DISABLED)
-
-        # Configure text tags for colored output
-        self.setup_output_text_tags()
-
-    def setup_output_text_tags(self):
-        """Setup text tags for colored terminal output."""
-        # Success messages
-        self.output_text.tag_configure(
-            "success", foreground=Colors.SUCCESS, font=Fonts.MONOSPACE
-        )
-
-        # Error messages
-        self.output_text.tag_configure(
-            "error", foreground=Colors.ERROR, font=Fonts.MONOSPACE
-        )
-
-        # Warning messages
-        self.output_text.tag_configure(
-            "warning", foreground=Colors.WARNING, font=Fonts.MONOSPACE
-        )
-
-        # Info messages
-        self.output_text.tag_configure(
-            "info", foreground=Colors.SECONDARY, font=Fonts.MONOSPACE
-        )
-
-        # Command headers
-        self.output_text.tag_configure(
-            "header", foreground="#61DAFB", font=("Consolas", 11, "bold")
-        )
+        self.general_tab = SessionTab(self.output_notebook, "📋 General")
+        self.dashboard = ClusterDashboard(self.output_notebook, self.refresh_dashboard)
 
     def logout(self):
         """Return to login page."""
         # Stop any running processes
-        if self.current_process:
-            try:
-                self.current_process.terminate()
-            except:
-                pass
-
-        # Stop the queue checking
-        self.is_running = False
-
-        # Clear any pending after calls
-        try:
-            self.root.after_cancel(self.after_id)
-        except:
-            pass
+        self.sessions.stop_all()
+        self.status_poller.stop()
+        self.job_events_future.cancel()
+        if self.job_refresh_after is not None:
+            self.root.after_cancel(self.job_refresh_after)
+            self.job_refresh_after = None
 
         self.app_controller.show_login_page()
 
     def connect_cluster(self):
         """Connect to cluster using tunnel.sh script."""
-        if self.is_running:
-            messagebox.showwarning(
-                "Warning", "A connection is already running. Please stop it first."
-            )
-            return
-
         try:
             cluster = self.user_info["cluster"]
             username = self.user_info["username"]
-            self.append_output(f"=== Connecting to {cluster} using tunnel.sh ===\n")
-            self.append_output(f"User: {username}\n")
-            self.append_output("=" * 50 + "\n")
 
             # Build tunnel.sh command with parameters
-            tunnel_cmd = self.build_resource_command("./tunnel.sh")
-            tunnel_cmd.extend(["--tool", self.param_vars["tunnel_tool"].get()])
-
-            if self.param_vars["no_log"].get():
-                tunnel_cmd.append("-n")
+            tunnel_cmd = build_tunnel_command(
+                "./tunnel.sh",
+                self.current_params(),
+                self.user_info.get("remote_shared_root"),
+            )
 
             self.start_script_execution(
                 tunnel_cmd,
+                title="tunnel.sh",
+                header=(
+                    f"=== Connecting to {cluster} using tunnel.sh ===\n"
+                    f"User: {username}\n" + "=" * 50 + "\n"
+                ),
                 status_text="🚀 Executing tunnel.sh script...",
-                success_status="success",
-                error_status_prefix="error",
+                messages=TUNNEL_MESSAGES,
             )
 
         except Exception as e:
             self.append_output(f"Error setting up tunnel.sh execution: {str(e)}\n")
-            self.reset_ui_state()
 
     def execute_remote_sshd_script(self):
         """Execute remote_sshd.sh to start Dropbear SSHD on an allocated node."""
-        if self.is_running:
-            messagebox.showwarning(
-                "Warning", "A connection is already running. Please stop it first."
-            )
-            return
-
         try:
             cluster = self.user_info["cluster"]
             username = self.user_info["username"]
-            self.append_output(f"=== Starting remote SSHD on {cluster} ===\n")
-            self.append_output(f"User: {username}\n")
-            self.append_output("=" * 50 + "\n")
 
             remote_sshd_cmd = self.build_resource_command("./remote_sshd.sh")
 
             self.start_script_execution(
                 remote_sshd_cmd,
+                title="remote_sshd.sh",
+                header=(
+                    f"=== Starting remote SSHD on {cluster} ===\n"
+                    f"User: {username}\n" + "=" * 50 + "\n"
+                ),
                 status_text="🔐 Executing remote_sshd.sh script...",
-                success_status="remote_sshd_success",
-                error_status_prefix="remote_sshd_error",
+                messages=REMOTE_SSHD_MESSAGES,
             )
 
         except Exception as e:
             self.append_output(
                 f"Error setting up remote_sshd.sh execution: {str(e)}\n"
             )
-            self.reset_ui_state()
-
-    def execute_pls_script(self):
-        """Execute pls.sh script."""
-        if self.is_running:
-            messagebox.showwarning(
-                "Warning", "A connection is already running. Please stop it first."
-            )
-            return
-
-        try:
-            self.append_output("=== Executing pls.sh script ===\n")
-
-            # Execute pls.sh script
-            pls_cmd = ["./pls.sh", "-a", self.user_info["cluster"]]
-
-            self.start_script_execution(
-                pls_cmd,
-                status_text="📊 Executing pls.sh script...",
-                success_status="success",
-                error_status_prefix="error",
-            )
 
-        except Exception as e:
-            self.append_output(f"Error executing pls.sh: {str(e)}\n")
-            self.reset_ui_state()
+    def show_dashboard(self):
+        """Show the cluster dashboard and refresh every cluster now."""
+        self.output_notebook.select(self.dashboard.frame)
+        self.status_poller.refresh()
 
     def update_cursor_server(self):
         """Deploy remote tools to the configured shared root."""
-        if self.is_running:
-            messagebox.showwarning(
-                "Warning", "A connection is already running. Please stop it first."
-            )
-            return
-
         try:
-            self.append_output("=== Deploying Remote Tools ===\n")
-
-            update_cmd = [
+            update_cmd = build_deploy_command(
                 "./deploy_remote_tools.sh",
-                "-a",
                 self.user_info["cluster"],
-                "--root",
-                self.user_info.get("remote_shared_root", DEFAULT_REMOTE_SHARED_ROOT),
-                "--all",
-            ]
+                self.user_info.get("remote_shared_root"),
+            )
 
             self.start_script_execution(
                 update_cmd,
+                title="deploy_remote_tools.sh",
+                header="=== Deploying Remote Tools ===\n",
                 status_text="🔄 Deploying remote tools...",
-                success_status="update_success",
-                error_status_prefix="update_error",
+                messages=DEPLOY_MESSAGES,
             )
 
         except Exception as e:
             self.append_output(f"Error setting up remote tool deployment: {str(e)}\n")
-            self.reset_ui_state()
+
+    def current_params(self):
+        """Return the parameter values entered for the logged-in cluster."""
+        params = {key: var.get() for key, var in self.param_vars.items()}
+        params["cluster"] = self.user_info["cluster"]
+        return params
 
     def build_resource_command(self, script_name):
         """Build a command with the shared SLURM resource parameters."""
-        cmd = [
+        return build_resource_command(
             script_name,
-            "-a",
-            self.user_info["cluster"],
-            "-p",
-            self.param_vars["partition"].get(),
-            "-c",
-            self.param_vars["cpus"].get(),
-            "-g",
-            self.param_vars["gpus"].get(),
-            "-m",
-            self.param_vars["memory"].get(),
-            "-t",
-            self.param_vars["time"].get(),
-            "--root",
-            self.user_info.get("remote_shared_root", DEFAULT_REMOTE_SHARED_ROOT),
-        ]
+            self.current_params(),
+            self.user_info.get("remote_shared_root"),
+        )
 
-        if self.param_vars["node"].get():
-            cmd.extend(["-w", self.param_vars["node"].get()])
+    def start_script_execution(self, cmd, title, header, status_text, messages):
+        """
+        Start a script in its own session and output tab.
 
-        return cmd
+        Different scripts run side by side; a second run of a script that is
+        still running is refused.
 
-    def set_action_buttons_state(self, state):
-        """Set all action buttons to the same state when available."""
-        for button in getattr(self, "action_buttons", []):
-            button.config(state=state)
+        Args:
+            cmd (list): Command and arguments to execute
+            title (str): Short label for the session
+            header (str): Text shown at the top of the tab
+            status_text (str): Status shown while the script runs
+            messages (SessionMessages): Texts shown when the script ends
+        """
+        if self.sessions.find_running(title):
+            messagebox.showwarning(
+                "Warning", f"{title} is already running. Please stop it first."
+            )
+            return
 
-    def start_script_execution(
-        self,
-        cmd,
-        status_text,
-        success_status,
-        error_status_prefix,
-    ):
-        """Update UI state and run a script in a background thread."""
-        self.status_label.config(text=status_text, foreground=Colors.WARNING)
-        self.set_action_buttons_state(tk.DISABLED)
-        self.stop_btn.config(state=tk.NORMAL)
-        self.is_running = True
+        session = self.sessions.start(title, cmd)
+        session_id = session.session_id
 
-        thread = threading.Thread(
-            target=self.run_script,
-            args=(cmd, success_status, error_status_prefix),
+        tab = SessionTab(
+            self.output_notebook,
+            f"{title} #{session_id}",
+            on_stop=lambda: self.stop_session(session_id),
+            on_close=lambda: self.close_session(session_id),
+            on_timing=lambda: self.show_timing(session_id),
+            on_log=lambda: self.show_log(session_id),
+            messages=messages,
         )
-        thread.daemon = True
-        thread.start()
+        tab.append_output(header, self.auto_scroll.get())
+        tab.set_status(status_text, Colors.WARNING)
+        self.session_tabs[session_id] = tab
+        self.output_notebook.select(tab.frame)
 
-    def run_script(self, cmd, success_status, error_status_prefix):
-        """Run a script in a background thread and stream its output."""
-        try:
-            self.current_process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1,
-            )
+        self.status_label.config(text=status_text, foreground=Colors.WARNING)
+        self.update_stop_button_state()
 
-            self.output_queue.put(("output", f"✓ Executing: {' '.join(cmd)}\n"))
-
-            # Read output line by line in real-time
-            while self.current_process and self.current_process.poll() is None:
-                try:
-                    output = self.current_process.stdout.readline()
-                    if output:
-                        self.output_queue.put(("output", output))
-                except Exception as e:
-                    self.output_queue.put(
-                        ("output", f"Error reading output: {str(e)}\n")
-                    )
-                    break
+    def stop_session(self, session_id, cancel_jobs=None):
+        """
+        Stop a single running session.
 
-            # Get return code if process still exists
-            if self.current_process:
-                return_code = self.current_process.poll()
+        Args:
+            session_id (int): Session to stop
+            cancel_jobs (bool): Also scancel the Slurm jobs the run started;
+                None asks the user when the run has started any
+        """
+        session = self.sessions.get(session_id)
+        tab = self.session_tabs.get(session_id)
+        if session is None or tab is None:
+            return
 
-                if return_code == 0:
-                    self.output_queue.put(("status", success_status))
-                else:
-                    self.output_queue.put(
-                        ("status", f"{error_status_prefix}:{return_code}")
-                    )
+        if cancel_jobs is None:
+            cancel_jobs = self.confirm_cancel_jobs(session.tracked_jobs())
 
+        try:
+            if session.stop(cancel_jobs):
+                # The SessionFinished event confirms the stop
+                tab.append_output("\n⏹️ Stopping...\n", self.auto_scroll.get())
+                tab.set_status("⏹️ Stopping...", Colors.WARNING)
+                if tab.stop_btn is not None:
+                    tab.stop_btn.config(state=tk.DISABLED)
+                self.status_label.config(
+                    text=f"⏹️ Stopping {session.title}...", foreground=Colors.WARNING
+                )
         except Exception as e:
-            self.output_queue.put(("status", f"exception:{str(e)}"))
-        finally:
-            self.current_process = None
+            tab.append_output(
+                f"\n❌ Error stopping script: {str(e)}\n", self.auto_scroll.get()
+            )
+
+        self.update_stop_button_state()
 
     def stop_command(self):
-        """Stop the currently running command."""
-        # Stop tunnel.sh process if running
-        if self.current_process:
-            try:
-                self.current_process.terminate()
-                self.append_output("\n=== ⏹️ Script execution stopped by user ===\n")
-                self.status_label.config(
-                    text="⏹️ Script stopped", foreground=Colors.ERROR
-                )
-            except Exception as e:
-                self.append_output(f"\n❌ Error stopping script: {str(e)}\n")
-
-        self.reset_ui_state()
-
-    def reset_ui_state(self):
-        """Reset UI state after command completion."""
-        self.is_running = False
-        self.set_action_buttons_state(tk.NORMAL)
-        self.stop_btn.config(state=tk.DISABLED)
-        self.current_process = None
-
-    def check_queue(self):
-        """Check output queue and update display."""
-        # Check if the page is still active
-        if not hasattr(self, "status_label") or not self.status_label.winfo_exists():
-            return
+        """Stop every running session, asking once about their Slurm jobs."""
+        sessions = [
+            session
+            for session in self.sessions.running()
+            if session.state in ("pending", "running")
+        ]
+        jobs = [job for session in sessions for job in session.tracked_jobs()]
+        cancel_jobs = self.confirm_cancel_jobs(jobs)
+        for session in sessions:
+            self.stop_session(session.session_id, cancel_jobs)
 
-        try:
-            while True:
-                msg_type, msg_content = self.output_queue.get_nowait()
-
-                if msg_type == "output":
-                    self.append_output(msg_content)
-                elif msg_type == "status":
-                    if msg_content == "success":
-                        self.status_label.config(
-                            text="✅ Script completed successfully",
-                            foreground=Colors.SUCCESS,
-                        )
-                        self.append_output(
-                            "\n=== ✅ Script completed successfully ===\n"
-                        )
-                    elif msg_content == "update_success":
-                        self.status_label.config(
-                            text="✅ Remote tools deployed successfully",
-                            foreground=Colors.SUCCESS,
-                        )
-                        self.append_output(
-                            "\n=== ✅ Remote tool deployment completed successfully ===\n"
-                        )
-                    elif msg_content == "remote_sshd_success":
-                        self.status_label.config(
-                            text="✅ Remote SSHD started successfully",
-                            foreground=Colors.SUCCESS,
-                        )
-                        self.append_output(
-                            "\n=== ✅ remote_sshd.sh completed successfully ===\n"
-                        )
-                    elif msg_content.startswith("error:"):
-                        return_code = msg_content.split(":", 1)[1]
-                        self.status_label.config(
-                            text=f"❌ Script failed (exit code: {return_code})",
-                            foreground=Colors.ERROR,
-                        )
-                        self.append_output(
-                            f"\n=== ❌ Script failed with exit code: {return_code} ===\n"
-                        )
-                    elif msg_content.startswith("update_error:"):
-                        return_code = msg_content.split(":", 1)[1]
-                        self.status_label.config(
-                            text=f"❌ Remote tool deployment failed (exit code: {return_code})",
-                            foreground=Colors.ERROR,
-                        )
-                        self.append_output(
-                            f"\n=== ❌ Remote tool deployment failed with exit code: {return_code} ===\n"
-                        )
-                    elif msg_content.startswith("remote_sshd_error:"):
-                        return_code = msg_content.split(":", 1)[1]
-                        self.status_label.config(
-                            text=f"❌ Remote SSHD failed (exit code: {return_code})",
-                            foreground=Colors.ERROR,
-                        )
-                        self.append_output(
-                            f"\n=== ❌ remote_sshd.sh failed with exit code: {return_code} ===\n"
-                        )
-                    elif msg_content.startswith("exception:"):
-                        error = msg_content.split(":", 1)[1]
-                        self.status_label.config(
-                            text="❌ Script execution error", foreground=Colors.ERROR
-                        )
-                        self.append_output(f"\n=== ❌ Error: {error} ===\n")
-
-                    self.reset_ui_state()
+    def confirm_cancel_jobs(self, jobs):
+        """
+        Ask whether the Slurm jobs started by the stopped runs should go too.
 
-        except queue.Empty:
-            pass
-        except tk.TclError:
-            # Widget has been destroyed, stop checking
+        Args:
+            jobs (list): TrackedJob records of the runs being stopped
+
+        Returns:
+            bool: True if the jobs should be cancelled
+        """
+        if not jobs:
+            return False
+
+        listing = "\n".join(
+            f"• {job.cluster}: job {job.job_id} ({job.name})" for job in jobs
+        )
+        return messagebox.askyesno(
+            "Cancel Slurm Jobs",
+            f"The runs being stopped started these Slurm jobs:\n\n{listing}\n\n"
+            "Cancel them as well? Choose No to keep them running.",
+        )
+
+    def close_session(self, session_id):
+        """Close the tab of a finished session."""
+        session = self.sessions.get(session_id)
+        if session is not None and session.is_running:
             return
 
-        # Schedule next check only if still active
-        if hasattr(self, "status_label") and self.status_label.winfo_exists():
-            self.after_id = self.root.after(100, self.check_queue)
+        tab = self.session_tabs.pop(session_id, None)
+        if tab is not None:
+            self.output_notebook.forget(tab.frame)
+            tab.frame.destroy()
+        self.sessions.remove(session_id)
+
+    def show_timing(self, session_id):
+        """Open the phase timing waterfall for a session."""
+        session = self.sessions.get(session_id)
+        if session is not None:
+            TimingWindow(self.root, session)
+
+    def show_log(self, session_id):
+        """Open the full on-disk log of a session."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        if session.log.error:
+            self.append_output(f"❌ Session log unavailable: {session.log.error}\n")
+            return
+        SessionLogWindow(self.root, session.log.path, f"{session.title} #{session_id}")
+
+    def show_session_logs(self):
+        """Open the list of session logs on disk."""
+        SessionLogBrowser(self.root)
+
+    def update_stop_button_state(self):
+        """Enable the Stop All button while any session is running."""
+        if self.sessions.running():
+            self.stop_btn.config(state=tk.NORMAL)
+        else:
+            self.stop_btn.config(state=tk.DISABLED)
+
+    def handle_events(self, events):
+        """
+        Apply a batch of engine events to the display.
+
+        All output a session produced since the previous batch is merged
+        into a single insert, and flushed before that session's completion
+        banner.
+
+        Args:
+            events (list): Events drained from the engine queue
+        """
+        auto_scroll = self.auto_scroll.get()
+        pending_output = collections.defaultdict(list)
+
+        for event in events:
+            if isinstance(event, SessionOutput):
+                pending_output[event.session_id].append(event.text)
+            elif isinstance(event, SessionFinished):
+                tab = self.session_tabs.get(event.session_id)
+                session = self.sessions.get(event.session_id)
+                if tab is None or session is None:
+                    continue
+                # Keep script output ahead of the completion banner
+                texts = pending_output.pop(event.session_id, [])
+                tab.append_output("".join(texts), auto_scroll)
+                self.handle_session_finished(session, tab, event)
+            elif isinstance(event, ClusterSnapshot):
+                self.dashboard.apply_snapshot(event)
+            elif isinstance(event, JobEvent):
+                self.handle_job_event(event)
+
+        for session_id, texts in pending_output.items():
+            tab = self.session_tabs.get(session_id)
+            if tab is not None:
+                tab.append_output("".join(texts), auto_scroll)
+
+        self.update_connection_indicator()
+
+    def handle_job_event(self, event):
+        """Report a job state change and refresh the dashboard for it."""
+        if not event.old_state:
+            change = f"submitted ({event.new_state})"
+        elif event.new_state == "ENDED":
+            change = f"left the queue ({event.old_state})"
+        elif event.old_state == event.new_state:
+            change = f"assigned {event.nodes}"
+        else:
+            change = f"{event.old_state} → {event.new_state}"
+            if event.nodes:
+                change += f" on {event.nodes}"
+
+        self.append_output(
+            f"🔔 {event.cluster} job {event.job_id} ({event.name}): {change}\n"
+        )
+        self.job_refresh_clusters.add(event.cluster)
+        if self.job_refresh_after is None:
+            self.job_refresh_after = self.root.after(
+                JOB_REFRESH_DELAY_MS, self.refresh_job_clusters
+            )
+
+    def refresh_job_clusters(self):
+        """Refresh the dashboard for the clusters whose jobs changed."""
+        self.job_refresh_after = None
+        for cluster in self.job_refresh_clusters:
+            self.status_poller.refresh(cluster)
+        self.job_refresh_clusters.clear()
+
+    def refresh_dashboard(self):
+        """Query every cluster for the dashboard now."""
+        self.status_poller.refresh()
+
+    def update_connection_indicator(self):
+        """Reflect the pooled control master's health in the header."""
+        state = self.app_controller.ssh_pool.state(self.user_info["cluster"])
+        indicator = {"healthy": "🟢", "connecting": "🟡"}.get(state, "🔴")
+        if self.status_indicator.cget("text") != indicator:
+            self.status_indicator.config(text=indicator)
+
+    def handle_session_finished(self, session, tab, event):
+        """Show a session's completion in its tab and the status bar."""
+        status_text, banner = finished_texts(tab.messages, event)
+        color = Colors.SUCCESS if event.state == "success" else Colors.ERROR
+
+        tab.append_output(f"\n{banner}\n", self.auto_scroll.get())
+        tab.set_status(status_text, color)
+        self.status_label.config(
+            text=f"{status_text} • {session.title}", foreground=color
+        )
+        tab.set_finished()
+        self.update_stop_button_state()
+
+    def selected_tab(self):
+        """Return the output tab currently shown in the notebook."""
+        selected = self.output_notebook.select()
+        for tab in self.session_tabs.values():
+            if str(tab.frame) == selected:
+                return tab
+        return self.general_tab
 
     def append_output(self, text):
         """
-        Append text to output display.
+        Append text to the general output tab.
 
         Args:
             text (str): Text to append
         """
-        self.output_text.configure(state=tk.NORMAL)
-        self.output_text.insert(tk.END, text)
-        self.output_text.configure(state=tk.DISABLED)
-
-        # Auto-scroll to bottom if enabled
-        if self.auto_scroll.get():
-            self.output_text.see(tk.END)
+        self.general_tab.append_output(text, self.auto_scroll.get())
 
     def clear_output(self):
-        """Clear the output display."""
-        self.output_text.configure(state=tk.NORMAL)
-        self.output_text.delete(1.0, tk.END)
-        self.output_text.configure(state=tk.DISABLED)
+        """Clear the output of the selected tab."""
+        self.selected_tab().clear()
 
 
 class ClusterManagerApp:
@@ -1438,6 +2343,8 @@ class ClusterManagerApp:
     Handles:
     - Page switching between login and main functionality
     - User session management
+    - The shared SSH control master pool
+    - The orchestrator engine and delivery of its events to the current page
     - Application initialization and cleanup
     """
 
@@ -1445,9 +2352,16 @@ class ClusterManagerApp:
         """Initialize the application."""
         self.root = tk.Tk()
         self.current_page = None
+        self.ssh_pool = ControlMasterPool()
+
+        # Subprocesses and remote operations run on the engine's loop
+        self.engine = Engine()
+        self.engine.start()
+        self.poll_interval = QUEUE_POLL_MIN_MS
 
         # Show login page initially
         self.show_login_page()
+        self.pump_events()
 
     def show_login_page(self):
         """Display the login page."""
@@ -1457,9 +2371,39 @@ class ClusterManagerApp:
         """Display the main functionality page."""
         self.current_page = MainPage(self.root, self, user_info)
 
+    def pump_events(self):
+        """
+        Hand queued engine events to the current page.
+
+        At most MAX_QUEUE_MESSAGES_PER_TICK events are handled per call. The
+        poll interval shrinks while events are flowing and backs off
+        towards QUEUE_POLL_MAX_MS while idle.
+        """
+        events = []
+        try:
+            while len(events) < MAX_QUEUE_MESSAGES_PER_TICK:
+                events.append(self.engine.events.get_nowait())
+        except queue.Empty:
+            pass
+
+        try:
+            self.current_page.handle_events(events)
+        except tk.TclError:
+            # The page's widgets are being replaced
+            pass
+
+        if events:
+            self.poll_interval = QUEUE_POLL_MIN_MS
+        else:
+            self.poll_interval = min(self.poll_interval * 2, QUEUE_POLL_MAX_MS)
+        self.root.after(self.poll_interval, self.pump_events)
+
     def run(self):
         """Start the application main loop."""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.engine.stop()
 
 
 def main():
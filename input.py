@@ -1,19 +1,447 @@
+"""
+Clipboard Typing
+
+Types the clipboard into the focused window, for consoles and VNC sessions
+that do not accept pastes.
+
+<shift>+<ctrl>+v types the clipboard and <shift>+<ctrl>+b cancels typing.
+The text is sent in chunks, paced to at most MAX_CHARS_PER_SECOND so the
+remote end keeps up, with a strategy chosen by payload size:
+
+    burst    up to SMALL_PAYLOAD characters, typed in one call, or one
+             character at a time when capped
+    chunked  up to LARGE_PAYLOAD characters, CHUNK_SIZE at a time
+    lines    larger payloads, line by line with LINE_SETTLE seconds after
+             each line so the remote shell can process it
+
+<shift>+<ctrl>+g sends the clipboard to a cluster instead, gzipped over its
+/tmp/ssh_$CLUSTER control master (see clipboard_transfer.py), and types only
+the path of the new remote file, or feeds it to a remote command with
+--command. Multi-MB payloads then move at network speed.
+
+`python input.py --benchmark` measures characters per second.
+"""
+
+import argparse
+import collections
+import os
+import shlex
+import sys
+import threading
+import time
+
 import pyautogui
 import pyperclip
-import time
 from pynput import keyboard
 
-def type_clipboard_content():
+import clipboard_transfer
+from cluster_commands import read_credentials
+from ssh_pool import CLUSTER_HOSTNAMES, SCRIPT_DIR
+
+PASTE_HOTKEY = "<shift>+<ctrl>+v"
+CANCEL_HOTKEY = "<shift>+<ctrl>+b"
+TRANSFER_HOTKEY = "<shift>+<ctrl>+g"
+DEFAULT_CLUSTER = "bluehive3"
+START_DELAY = 0.5  # Seconds to release the hotkey before typing starts
+MAX_CHARS_PER_SECOND = int(os.environ.get("INPUT_MAX_CPS", 1500))
+CHUNK_SIZE = 64  # Characters per write call
+SMALL_PAYLOAD = 256  # Largest payload typed in one call
+LARGE_PAYLOAD = 8192  # Larger payloads are typed line by line
+LINE_SETTLE = 0.02  # Seconds after each line on the lines strategy
+PROGRESS_INTERVAL = 0.25  # Seconds between progress updates
+BENCHMARK_CHARS = 4000  # Default benchmark payload size
+
+# Outcome of one typing run
+TypingResult = collections.namedtuple(
+    "TypingResult", ["strategy", "typed", "total", "elapsed", "cancelled"]
+)
+
+cancel_event = threading.Event()
+worker_thread = None
+max_chars_per_second = MAX_CHARS_PER_SECOND
+# Set from the command line by main()
+transfer_options = {}
+type_template = "{path}"
+
+
+def send_keys(chunk):
+    """Type a chunk without pyautogui's per-call PAUSE."""
+    pyautogui.write(chunk, _pause=False)
+
+
+def choose_strategy(text):
+    """Return the typing strategy for a payload."""
+    if len(text) <= SMALL_PAYLOAD:
+        return "burst"
+    if len(text) <= LARGE_PAYLOAD:
+        return "chunked"
+    return "lines"
+
+
+def split_chunks(text, strategy):
+    """
+    Split a payload into the pieces one write call sends.
+
+    Args:
+        text (str): Payload
+        strategy (str): "burst", "chars", "chunked" or "lines"
+
+    Returns:
+        list: Pieces in order; on the lines strategy no piece spans a line
+            break
+    """
+    if strategy == "burst":
+        return [text]
+    if strategy == "chars":
+        return list(text)
+    if strategy == "chunked":
+        return [text[i : i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+
+    pieces = []
+    for line in text.splitlines(keepends=True):
+        pieces.extend(line[i : i + CHUNK_SIZE] for i in range(0, len(line), CHUNK_SIZE))
+    return pieces
+
+
+def print_progress(done, total, elapsed, unit="chars"):
+    """Show a one-line progress bar on the terminal."""
+    width = 30
+    filled = width * done // max(total, 1)
+    rate = done / elapsed if elapsed > 0 else 0
+    sys.stdout.write(
+        f"\r[{'#' * filled}{' ' * (width - filled)}] "
+        f"{100 * done // max(total, 1):3d}% {done}/{total} {unit}, {rate:.0f} {unit}/s"
+    )
+    sys.stdout.flush()
+
+
+def type_text(
+    text,
+    send=send_keys,
+    max_cps=MAX_CHARS_PER_SECOND,
+    strategy=None,
+    progress=True,
+    cancel=cancel_event,
+):
+    """
+    Type a payload in paced chunks until it is done or cancelled.
+
+    Args:
+        text (str): Payload to type
+        send (callable): Types one chunk
+        max_cps (int): Characters per second cap; 0 for no cap
+        strategy (str): Force a strategy instead of choosing by size
+        progress (bool): Print a progress bar
+        cancel (threading.Event): Stops typing between chunks when set
+
+    Returns:
+        TypingResult: What was typed and how fast
+    """
+    strategy = strategy or choose_strategy(text)
+    typed = 0
+    cancelled = False
+    start = time.monotonic()
+    last_progress = start
+
+    # One call would send a whole burst uncapped, so a capped burst is
+    # paced per character instead
+    pieces = split_chunks(
+        text, "chars" if strategy == "burst" and max_cps else strategy
+    )
+
+    try:
+        for piece in pieces:
+            if cancel.is_set():
+                cancelled = True
+                break
+
+            # Hold back until the cap allows the characters sent so far
+            if max_cps:
+                delay = typed / max_cps - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            send(piece)
+            typed += len(piece)
+            if strategy == "lines" and piece.endswith("\n"):
+                time.sleep(LINE_SETTLE)
+
+            now = time.monotonic()
+            if progress and now - last_progress >= PROGRESS_INTERVAL:
+                print_progress(typed, len(text), now - start)
+                last_progress = now
+    except pyautogui.FailSafeException:
+        # Mouse moved into a screen corner
+        cancelled = True
+
+    elapsed = time.monotonic() - start
+    if progress and strategy != "burst":
+        print_progress(typed, len(text), elapsed)
+        print()
+    return TypingResult(strategy, typed, len(text), elapsed, cancelled)
+
+
+def type_clipboard_worker(clipboard_content):
+    """Type the clipboard on the worker thread and report the result."""
+    time.sleep(START_DELAY)
+    result = type_text(clipboard_content, max_cps=max_chars_per_second)
+    rate = result.typed / result.elapsed if result.elapsed > 0 else 0
+    state = "Cancelled" if result.cancelled else "Typed"
+    print(
+        f"{state} {result.typed}/{result.total} chars in {result.elapsed:.1f}s "
+        f"({rate:.0f} chars/s, {result.strategy})"
+    )
+
+
+def transfer_clipboard_worker(clipboard_content):
+    """Send the clipboard to the cluster and type the resulting path."""
+    command = transfer_options["command"]
+    data = clipboard_content.encode("utf-8")
+    # A bar only for payloads sent in more than one chunk
+    progress = (
+        None
+        if len(data) <= clipboard_transfer.CHUNK_BYTES
+        else lambda sent, total, elapsed: print_progress(sent, total, elapsed, "bytes")
+    )
+    try:
+        result = clipboard_transfer.transfer(
+            data,
+            progress=progress,
+            cancel=cancel_event,
+            output=print if command else None,
+            **transfer_options,
+        )
+    except (OSError, RuntimeError) as e:
+        # OSError when ssh cannot be started or its pipe fails
+        if progress is not None:
+            print()
+        print(f"❌ {e}")
+        return
+    if progress is not None:
+        print()
+
+    state = "Cancelled" if result.cancelled else "Sent"
+    destination = result.path or f"'{command}'"
+    print(
+        f"{state} {result.sent}/{result.total} bytes to {destination} "
+        f"in {result.elapsed:.1f}s"
+    )
+    if result.path is None:
+        return
+
+    # 只输入远程文件路径
+    if result.elapsed < START_DELAY:
+        time.sleep(START_DELAY - result.elapsed)
+    type_text(
+        type_template.replace("{path}", shlex.quote(result.path)),
+        max_cps=max_chars_per_second,
+        progress=False,
+    )
+
+
+def start_worker(target, action):
+    """Run a hotkey action on the clipboard unless one is still running."""
+    global worker_thread
+
+    if worker_thread is not None and worker_thread.is_alive():
+        print(f"Still busy; press {CANCEL_HOTKEY} to cancel.")
+        return
+
     # 获取剪切板内容
     clipboard_content = pyperclip.paste()
+    if not clipboard_content:
+        return
+
+    print(f"{action} {len(clipboard_content)} chars; {CANCEL_HOTKEY} cancels.")
+    cancel_event.clear()
+    # 在后台线程中运行, 以便热键监听器能接收取消热键
+    worker_thread = threading.Thread(
+        target=target, args=(clipboard_content,), daemon=True
+    )
+    worker_thread.start()
+
+
+def type_clipboard_content():
+    start_worker(type_clipboard_worker, "Typing")
+
+
+def transfer_clipboard_content():
+    cluster = transfer_options["cluster"]
+    start_worker(transfer_clipboard_worker, f"Sending to {cluster}:")
+
+
+def cancel_typing():
+    if worker_thread is not None and worker_thread.is_alive():
+        cancel_event.set()
+
+
+def benchmark_payload(size):
+    """Return shell-like text of about size characters."""
+    line = "echo 'The quick brown fox jumps over the lazy dog' >> /tmp/input_bench\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def run_benchmark(chars, max_cps, dry_run):
+    """
+    Measure typing throughput for every strategy.
+
+    Without dry_run the payload is really typed into the focused window,
+    which should be a scratch editor or terminal, after a short countdown;
+    the per-character loop used before this engine is measured on a small
+    sample for comparison.
+
+    Args:
+        chars (int): Payload size for the chunked and lines strategies
+        max_cps (int): Characters per second cap; 0 for no cap
+        dry_run (bool): Pace and split without pressing keys, measuring
+            the engine alone
+    """
+    payload = benchmark_payload(chars)
+    send = (lambda chunk: None) if dry_run else send_keys
+    results = []
+
+    if not dry_run:
+        for remaining in range(3, 0, -1):
+            print(f"Focus a scratch window; typing starts in {remaining}s...")
+            time.sleep(1)
+
+        # The previous loop: one write call per character with PAUSE
+        sample = payload[:40]
+        start = time.monotonic()
+        for char in sample:
+            pyautogui.write(char, interval=0.001)
+        results.append(
+            TypingResult(
+                "per-char", len(sample), len(sample), time.monotonic() - start, False
+            )
+        )
+
+    # A burst is measured on the largest payload it takes
+    results.append(type_text(payload[:SMALL_PAYLOAD], send, max_cps, "burst", False))
+    for strategy in ("chunked", "lines"):
+        results.append(type_text(payload, send, max_cps, strategy, progress=False))
+
+    cap = f"{max_cps} chars/s cap" if max_cps else "no cap"
+    print(f"\nTyping benchmark, {chars} chars, {cap}{', dry run' if dry_run else ''}:")
+    for result in results:
+        rate = result.typed / result.elapsed if result.elapsed > 0 else 0
+        print(
+            f"  {result.strategy:<9} {result.typed:>7} chars {result.elapsed:7.2f}s "
+            f"{rate:9.0f} chars/s"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=f"Type the clipboard on {PASTE_HOTKEY} or send it to a cluster "
+        f"on {TRANSFER_HOTKEY}; {CANCEL_HOTKEY} cancels."
+    )
+    parser.add_argument(
+        "--max-cps",
+        type=int,
+        default=MAX_CHARS_PER_SECOND,
+        help="Characters per second cap, 0 for none (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--benchmark", action="store_true", help="Measure characters per second"
+    )
+    parser.add_argument(
+        "--chars",
+        type=int,
+        default=BENCHMARK_CHARS,
+        help="Benchmark payload size (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Benchmark the engine without pressing keys",
+    )
+    transfer_group = parser.add_argument_group(
+        f"clipboard transfer ({TRANSFER_HOTKEY})"
+    )
+    transfer_group.add_argument(
+        "-a",
+        "--cluster",
+        choices=list(CLUSTER_HOSTNAMES),
+        default=DEFAULT_CLUSTER,
+        help="Cluster to send to (default: %(default)s)",
+    )
+    transfer_group.add_argument(
+        "--user", help="Login user name (default: from user_password.txt)"
+    )
+    transfer_group.add_argument(
+        "--remote-dir",
+        default=clipboard_transfer.DEFAULT_REMOTE_DIR,
+        help="Remote directory, relative to the home directory unless absolute "
+        "(default: %(default)s)",
+    )
+    transfer_group.add_argument(
+        "--suffix",
+        default=clipboard_transfer.DEFAULT_SUFFIX,
+        help="Remote file name suffix, e.g. .ipynb (default: %(default)s)",
+    )
+    transfer_group.add_argument(
+        "--command", help="Remote command that reads the clipboard on stdin"
+    )
+    transfer_group.add_argument(
+        "-w",
+        "--node",
+        help="Compute node to deliver to, reached from the login node",
+    )
+    transfer_group.add_argument(
+        "--type",
+        dest="type_template",
+        default="{path}",
+        help="What to type after a file transfer; {path} is the remote file "
+        "(default: %(default)s)",
+    )
+    transfer_group.add_argument(
+        "--send",
+        action="store_true",
+        help="Send the clipboard once, print the remote path and exit",
+    )
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        run_benchmark(args.chars, args.max_cps, args.dry_run)
+        return
+
+    global max_chars_per_second, type_template
+    max_chars_per_second = args.max_cps
+    type_template = args.type_template
+    transfer_options.update(
+        cluster=args.cluster,
+        user=args.user
+        or read_credentials(SCRIPT_DIR / "user_password.txt")["username"]
+        or os.environ.get("USER", ""),
+        remote_dir=args.remote_dir,
+        suffix=args.suffix,
+        command=args.command,
+        node=args.node,
+    )
+
+    if args.send:
+        try:
+            result = clipboard_transfer.transfer(
+                pyperclip.paste().encode("utf-8"),
+                output=print if args.command else None,
+                **transfer_options,
+            )
+        except (OSError, RuntimeError) as e:
+            sys.exit(str(e))
+        if result.path is not None:
+            print(result.path)
+        return
 
-    time.sleep(0.5)
-    # 使用 pyautogui 模拟键盘输入
-    print(clipboard_content)
-    for char in clipboard_content:
-        pyautogui.write(char, interval=0.001)
+    with keyboard.GlobalHotKeys(
+        {
+            PASTE_HOTKEY: type_clipboard_content,
+            TRANSFER_HOTKEY: transfer_clipboard_content,
+            CANCEL_HOTKEY: cancel_typing,
+        }
+    ) as h:
+        h.join()
 
-with keyboard.GlobalHotKeys({
-        '<shift>+<ctrl>+v': type_clipboard_content}) as h:
-    h.join()
 
+if __name__ == "__main__":
+    main()
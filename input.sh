@@ -1,3 +1,3 @@
 current_path="$(dirname "$0")"
 source /Users/sigurd/mambaforge/bin/activate py311
-python $current_path/input.py
\ No newline at end of file
+python $current_path/input.py "$@"
\ No newline at end of file
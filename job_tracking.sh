@@ -0,0 +1,18 @@
+#!/bin/bash
+
+# Slurm jobs started by the launch scripts.
+#
+# When JOB_TRACKING_FILE is set, every job a script submits is appended to
+# it as one tab-separated record:
+#   cluster  job_id  job_name
+# so whoever launched the script can cancel exactly the jobs it started.
+# Jobs that were already running are never recorded.
+#
+# Remote heredocs report jobs by printing
+#   TRACKED_JOB<TAB>job_id<TAB>job_name
+# on stderr; phase_remote_filter records them.
+
+job_track() {
+    [ -n "$JOB_TRACKING_FILE" ] || return 0
+    printf "%s\t%s\t%s\n" "${CLUSTER:-}" "$1" "$2" >> "$JOB_TRACKING_FILE"
+}
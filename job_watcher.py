@@ -0,0 +1,512 @@
+"""
+Job Watcher
+
+One background process per cluster and user that polls the user's Slurm
+jobs over the cluster's SSH control master and keeps their state in a
+local file. Scripts and the GUI read that file instead of each running
+their own squeue on the login node, and follow the append-only events file
+to react to jobs changing state or being assigned a node.
+
+Files live in the temporary directory ($TMPDIR) and are named
+job_watch_<user>_<cluster> with these suffixes:
+
+    .state   key=value lines plus one job=id|name|state|nodes|reason line
+             per job, replaced atomically after every poll
+    .events  time, cluster, job_id, name, old_state, new_state, nodes as
+             tab-separated lines
+    .want    touched by readers that need a newer state than the last poll
+    .seen    touched by readers to keep the watcher running
+    .lock    held by the running watcher
+
+The poll interval adapts: FAST_INTERVAL while jobs are pending or starting,
+or right after a change or a request, then doubling up to SLOW_INTERVAL
+while nothing changes. A watcher nobody has asked for in IDLE_EXIT seconds
+exits. This module does not depend on tkinter.
+
+Usage:
+    python job_watcher.py CLUSTER --user USER --jobs [--max-age SECONDS]
+    python job_watcher.py CLUSTER --user USER --run
+"""
+
+import argparse
+import asyncio
+import collections
+import fcntl
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from ssh_pool import cluster_hostname, control_path
+
+FAST_INTERVAL = 2  # Seconds between polls while jobs are changing
+SLOW_INTERVAL = 30  # Longest interval while nothing changes
+IDLE_EXIT = 600  # Seconds without requests before the watcher exits
+QUERY_TIMEOUT = 20  # Seconds allowed for one squeue round trip
+WAKE_CHECK_INTERVAL = 0.25  # Seconds between checks for poll requests
+FRESH_TIMEOUT = 25  # Seconds a reader waits for a fresh state
+EVENTS_MAX_BYTES = 1 << 20  # Events file size that triggers truncation
+
+JOB_FIELDS = "%i|%j|%T|%N|%r"
+
+# States after which a job is expected to change again soon
+TRANSIENT_STATES = ("PENDING", "CONFIGURING", "COMPLETING", "REQUEUED", "RESIZING")
+
+JobState = collections.namedtuple(
+    "JobState", ["job_id", "name", "state", "nodes", "reason"]
+)
+
+# old_state is "" for a new job; new_state is "ENDED" once it left the queue
+JobEvent = collections.namedtuple(
+    "JobEvent",
+    ["time", "cluster", "job_id", "name", "old_state", "new_state", "nodes"],
+)
+
+WatchState = collections.namedtuple(
+    "WatchState", ["cluster", "updated_at", "interval", "error", "jobs"]
+)
+
+
+def watch_path(user, cluster, suffix):
+    """Return the path of one of a watcher's files."""
+    return os.path.join(tempfile.gettempdir(), f"job_watch_{user}_{cluster}.{suffix}")
+
+
+def parse_jobs(text):
+    """
+    Parse squeue lines printed with JOB_FIELDS.
+
+    Args:
+        text (str): squeue output
+
+    Returns:
+        OrderedDict: JobState records keyed by job id
+    """
+    jobs = collections.OrderedDict()
+    for line in text.splitlines():
+        fields = line.strip().split("|")
+        if len(fields) != len(JobState._fields) or not fields[0]:
+            continue
+        job = JobState(*fields)
+        jobs[job.job_id] = job
+    return jobs
+
+
+def diff_jobs(cluster, old_jobs, new_jobs, now=None):
+    """
+    Compare two job tables.
+
+    Args:
+        cluster (str): Cluster the jobs belong to
+        old_jobs (dict): JobState records from the previous poll
+        new_jobs (dict): JobState records from this poll
+        now (float): Event timestamp, defaults to the current time
+
+    Returns:
+        list: JobEvent records for new jobs, state changes, node
+            assignments and jobs that left the queue
+    """
+    now = time.time() if now is None else now
+    events = []
+    for job_id, job in new_jobs.items():
+        old = old_jobs.get(job_id)
+        if old is None:
+            events.append(
+                JobEvent(now, cluster, job_id, job.name, "", job.state, job.nodes)
+            )
+        elif old.state != job.state or old.nodes != job.nodes:
+            events.append(
+                JobEvent(
+                    now, cluster, job_id, job.name, old.state, job.state, job.nodes
+                )
+            )
+
+    for job_id, old in old_jobs.items():
+        if job_id not in new_jobs:
+            events.append(
+                JobEvent(now, cluster, job_id, old.name, old.state, "ENDED", old.nodes)
+            )
+    return events
+
+
+def read_state(user, cluster):
+    """
+    Read a watcher's state file.
+
+    Args:
+        user (str): Login user name
+        cluster (str): Cluster name
+
+    Returns:
+        WatchState: Parsed state, or None if no watcher has written one
+    """
+    values = {}
+    jobs = collections.OrderedDict()
+    try:
+        with open(watch_path(user, cluster, "state"), encoding="utf-8") as state_file:
+            for line in state_file:
+                key, _, value = line.rstrip("\n").partition("=")
+                if key == "job":
+                    jobs.update(parse_jobs(value))
+                else:
+                    values[key] = value
+    except FileNotFoundError:
+        return None
+
+    try:
+        updated_at = float(values.get("updated_at", 0))
+        interval = float(values.get("interval", 0))
+    except ValueError:
+        return None
+    return WatchState(cluster, updated_at, interval, values.get("error", ""), jobs)
+
+
+def read_events(path, offset=0):
+    """
+    Read events appended to an events file since an offset.
+
+    Args:
+        path (str): Events file path
+        offset (int): Byte offset returned by the previous call
+
+    Returns:
+        tuple: (list of JobEvent, new offset); the offset starts over when
+            the file was truncated
+    """
+    events = []
+    try:
+        with open(path, "rb") as events_file:
+            events_file.seek(0, os.SEEK_END)
+            if events_file.tell() < offset:
+                offset = 0
+            events_file.seek(offset)
+            data = events_file.read()
+    except FileNotFoundError:
+        return events, 0
+
+    # A partially written last line is read again next time
+    complete = data[: data.rfind(b"\n") + 1]
+    for line in complete.decode(errors="replace").splitlines():
+        fields = line.split("\t")
+        if len(fields) != len(JobEvent._fields):
+            continue
+        try:
+            events.append(JobEvent(float(fields[0]), *fields[1:]))
+        except ValueError:
+            continue
+    return events, offset + len(complete)
+
+
+def touch(path):
+    """Create a file or update its modification time."""
+    with open(path, "a"):
+        pass
+    os.utime(path)
+
+
+def request_poll(user, cluster):
+    """Ask the cluster's watcher to poll now instead of at its interval."""
+    touch(watch_path(user, cluster, "want"))
+
+
+def ensure_watcher(user, cluster):
+    """
+    Start the cluster's watcher unless one is already running.
+
+    The watcher runs in its own session with its output discarded, so it
+    outlives the script or window that started it and never holds their
+    output pipes open.
+
+    Args:
+        user (str): Login user name
+        cluster (str): Cluster name
+    """
+    touch(watch_path(user, cluster, "seen"))
+    if watcher_running(user, cluster):
+        return
+
+    subprocess.Popen(
+        [
+            sys.executable,
+            os.path.abspath(__file__),
+            cluster,
+            "--user",
+            user,
+            "--run",
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def watcher_running(user, cluster):
+    """Return True if a watcher holds the cluster's lock."""
+    try:
+        with open(watch_path(user, cluster, "lock"), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return True
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    except OSError:
+        pass
+    return False
+
+
+def fresh_jobs(user, cluster, max_age=FRESH_TIMEOUT, timeout=FRESH_TIMEOUT):
+    """
+    Return the user's jobs from a state no older than max_age seconds.
+
+    Starts the watcher if needed and waits for its next poll when the
+    current state is too old.
+
+    Args:
+        user (str): Login user name
+        cluster (str): Cluster name
+        max_age (float): Oldest acceptable state in seconds
+        timeout (float): Seconds to wait for a fresh state
+
+    Returns:
+        WatchState: Fresh state, or None if none arrived in time or the
+            last poll failed
+    """
+    ensure_watcher(user, cluster)
+    deadline = time.time() + timeout
+    requested = False
+    while True:
+        state = read_state(user, cluster)
+        if state is not None and time.time() - state.updated_at <= max_age:
+            return None if state.error else state
+        if time.time() >= deadline:
+            return None
+        if not requested:
+            request_poll(user, cluster)
+            requested = True
+        time.sleep(WAKE_CHECK_INTERVAL)
+
+
+class JobWatcher:
+    """
+    Poll one cluster's jobs for one user and publish their state.
+
+    Only one watcher per user and cluster runs at a time; run() returns at
+    once when another holds the lock.
+    """
+
+    def __init__(self, user, cluster):
+        """
+        Initialize the watcher.
+
+        Args:
+            user (str): Login user name
+            cluster (str): Cluster name
+        """
+        self.user = user
+        self.cluster = cluster
+        self.hostname = cluster_hostname(cluster)
+        self.jobs = collections.OrderedDict()
+        self.interval = FAST_INTERVAL
+        self.error = ""
+        self.polled = False
+
+    def query(self):
+        """
+        Run squeue for the user's jobs over the control master.
+
+        Returns:
+            OrderedDict: JobState records keyed by job id
+
+        Raises:
+            RuntimeError: If the query failed
+        """
+        try:
+            result = subprocess.run(
+                [
+                    "ssh",
+                    "-o",
+                    "ControlMaster=no",
+                    "-o",
+                    f"ControlPath={control_path(self.cluster)}",
+                    "-o",
+                    "BatchMode=yes",
+                    "-T",
+                    f"{self.user}@{self.hostname}",
+                    f"squeue -h -u {self.user} -o '{JOB_FIELDS}'",
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=QUERY_TIMEOUT,
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"squeue timed out after {QUERY_TIMEOUT}s") from None
+
+        if result.returncode != 0:
+            error = result.stderr.decode(errors="replace").strip()
+            raise RuntimeError(error or f"exit code {result.returncode}")
+        return parse_jobs(result.stdout.decode(errors="replace"))
+
+    def poll(self):
+        """Query once, record changes and adapt the interval."""
+        try:
+            jobs = self.query()
+        except (OSError, RuntimeError) as e:
+            self.error = str(e).replace("\n", " ")
+            self.interval = SLOW_INTERVAL
+            self.write_state()
+            return
+
+        # The first table is the baseline; jobs in it are not new
+        events = diff_jobs(self.cluster, self.jobs, jobs) if self.polled else []
+        self.polled = True
+        self.error = ""
+        self.jobs = jobs
+
+        transient = any(job.state in TRANSIENT_STATES for job in jobs.values())
+        if events or transient:
+            self.interval = FAST_INTERVAL
+        else:
+            self.interval = min(self.interval * 2, SLOW_INTERVAL)
+
+        self.append_events(events)
+        self.write_state()
+
+    def write_state(self):
+        """Replace the state file with the current table."""
+        lines = [
+            f"cluster={self.cluster}",
+            f"updated_at={time.time():.3f}",
+            f"interval={self.interval}",
+            f"error={self.error}",
+        ]
+        lines.extend("job=" + "|".join(job) for job in self.jobs.values())
+
+        path = watch_path(self.user, self.cluster, "state")
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "w", encoding="utf-8") as state_file:
+            state_file.write("\n".join(lines) + "\n")
+        os.replace(temp_path, path)
+
+    def append_events(self, events):
+        """Append state changes to the events file."""
+        if not events:
+            return
+
+        path = watch_path(self.user, self.cluster, "events")
+        try:
+            if os.path.getsize(path) > EVENTS_MAX_BYTES:
+                open(path, "w").close()
+        except FileNotFoundError:
+            pass
+
+        with open(path, "a", encoding="utf-8") as events_file:
+            for event in events:
+                fields = [f"{event.time:.3f}"] + list(event[1:])
+                events_file.write("\t".join(fields) + "\n")
+
+    def touched_at(self, suffix):
+        """Return when a reader last touched one of the watcher's files."""
+        try:
+            return os.path.getmtime(watch_path(self.user, self.cluster, suffix))
+        except OSError:
+            return 0.0
+
+    def run(self):
+        """Poll until no reader has asked for IDLE_EXIT seconds."""
+        with open(watch_path(self.user, self.cluster, "lock"), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return
+
+            while True:
+                polled_at = time.time()
+                self.poll()
+
+                next_poll = polled_at + self.interval
+                while time.time() < next_poll:
+                    if self.touched_at("want") > polled_at:
+                        # A reader wants a newer state than this poll
+                        self.interval = FAST_INTERVAL
+                        break
+                    time.sleep(WAKE_CHECK_INTERVAL)
+
+                last_reader = max(self.touched_at("seen"), self.touched_at("want"))
+                if time.time() - last_reader > IDLE_EXIT:
+                    return
+
+
+async def follow_events(engine, user, cluster, interval=1.0):
+    """
+    Post a cluster's job events to the engine as they are recorded.
+
+    Runs on the orchestrator engine until cancelled and keeps the watcher
+    running while it follows it. Events recorded before the call are
+    skipped.
+
+    Args:
+        engine (Engine): Orchestrator engine that receives the events
+        user (str): Login user name
+        cluster (str): Cluster name
+        interval (float): Seconds between reads of the events file
+    """
+    path = watch_path(user, cluster, "events")
+    try:
+        offset = os.path.getsize(path)
+    except OSError:
+        offset = 0
+
+    last_ensure = 0.0
+    while True:
+        if time.time() - last_ensure > IDLE_EXIT / 2:
+            await engine.run_blocking(ensure_watcher, user, cluster)
+            last_ensure = time.time()
+
+        events, offset = read_events(path, offset)
+        for event in events:
+            engine.post(event)
+        await asyncio.sleep(interval)
+
+
+def main():
+    """Run the watcher or print the user's jobs for the shell scripts."""
+    parser = argparse.ArgumentParser(description="Watch a user's Slurm jobs.")
+    parser.add_argument("cluster", help="Cluster name")
+    parser.add_argument("--user", default=os.environ.get("USER"), help="Login user")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--run", action="store_true", help="Run the watcher")
+    group.add_argument(
+        "--jobs",
+        action="store_true",
+        help="Print id|name|state|nodes|reason for each job",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=FRESH_TIMEOUT,
+        help="Oldest acceptable state in seconds for --jobs",
+    )
+    args = parser.parse_args()
+
+    try:
+        cluster_hostname(args.cluster)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.run:
+        JobWatcher(args.user, args.cluster).run()
+        return 0
+
+    state = fresh_jobs(args.user, args.cluster, args.max_age)
+    if state is None:
+        return 1
+    for job in state.jobs.values():
+        print("|".join(job))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Orchestrator
+
+An asyncio event loop on a background thread that owns the GUI's script
+subprocesses and remote operations. Work is submitted from the Tk thread as
+coroutines; results come back as typed events on a thread-safe queue that
+the Tk main loop drains. This module does not depend on tkinter.
+"""
+
+import asyncio
+import collections
+import queue
+import threading
+
+MAX_CONCURRENT_SCRIPTS = 8  # Script sessions running at once
+MAX_CONCURRENT_REMOTE = 16  # Remote queries and connects running at once
+
+# Events posted to Engine.events
+SessionOutput = collections.namedtuple("SessionOutput", ["session_id", "text"])
+
+# state is "success", "failed", "stopped" or "error"; error holds the
+# exception message when the script could not be run
+SessionFinished = collections.namedtuple(
+    "SessionFinished", ["session_id", "state", "return_code", "error"]
+)
+
+ConnectionResult = collections.namedtuple(
+    "ConnectionResult", ["cluster", "ok", "error"]
+)
+
+
+class Engine:
+    """
+    Background asyncio loop shared by every GUI operation.
+
+    Coroutines run on one loop thread instead of one thread each. Each
+    submission may name a concurrency pool ("scripts" or "remote") whose
+    semaphore bounds how many of its kind run at once, and a timeout after
+    which it is cancelled. The returned concurrent.futures.Future cancels
+    the coroutine when cancelled from any thread.
+    """
+
+    def __init__(
+        self,
+        max_scripts=MAX_CONCURRENT_SCRIPTS,
+        max_remote=MAX_CONCURRENT_REMOTE,
+    ):
+        """
+        Initialize the engine; call start() before submitting work.
+
+        Args:
+            max_scripts (int): Script sessions allowed to run at once
+            max_remote (int): Remote operations allowed to run at once
+        """
+        self.events = queue.Queue()
+        self.loop = asyncio.new_event_loop()
+        self.limits = {"scripts": max_scripts, "remote": max_remote}
+        self.slots = {}
+        self.thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Start the loop thread and wait until it accepts work."""
+        if self.thread is not None:
+            return
+
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        """Run the event loop until stop() is called."""
+        asyncio.set_event_loop(self.loop)
+        # Created on the loop thread so they bind to this loop on Python 3.8
+        self.slots = {
+            name: asyncio.Semaphore(limit) for name, limit in self.limits.items()
+        }
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    def stop(self):
+        """Cancel all outstanding work and stop the loop."""
+        if self.thread is None:
+            return
+
+        def cancel_all():
+            for task in asyncio.all_tasks(self.loop):
+                task.cancel()
+            self.loop.call_soon(self.loop.stop)
+
+        self.loop.call_soon_threadsafe(cancel_all)
+        self.thread.join(timeout=5)
+        self.thread = None
+
+    def post(self, event):
+        """Hand an event to the UI thread."""
+        self.events.put(event)
+
+    def call_soon(self, callback, *args):
+        """Run a plain callback on the loop thread."""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def submit(self, coro, pool=None, timeout=None):
+        """
+        Schedule a coroutine on the loop from any thread.
+
+        Args:
+            coro (coroutine): Work to run
+            pool (str): Concurrency pool to acquire a slot from, or None
+            timeout (float): Seconds before the work is cancelled, or None
+
+        Returns:
+            concurrent.futures.Future: Result of the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.limited(coro, pool, timeout), self.loop
+        )
+
+    async def limited(self, coro, pool=None, timeout=None):
+        """Await a coroutine inside a pool slot and under a timeout."""
+        if pool is None:
+            return await asyncio.wait_for(coro, timeout)
+
+        slot = self.slots[pool]
+        try:
+            await slot.acquire()
+        except asyncio.CancelledError:
+            # Cancelled while waiting for a slot; the coroutine never started
+            coro.close()
+            raise
+
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        finally:
+            slot.release()
+
+    async def run_blocking(self, func, *args, timeout=None):
+        """
+        Run a blocking call in the loop's executor.
+
+        Args:
+            func (callable): Function to call
+            *args: Positional arguments for func
+            timeout (float): Seconds to wait for the result, or None
+
+        Returns:
+            The function's return value
+        """
+        return await asyncio.wait_for(
+            self.loop.run_in_executor(None, lambda: func(*args)), timeout
+        )
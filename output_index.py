@@ -0,0 +1,292 @@
+"""
+Output Index
+
+Line index over a session's output for the GUI's output pane. Each line is
+classified once, when it is completed, into a category the pane uses as
+its colour tag and as a filtered view ("Errors", "Status", ...). Filters
+extend their match lists with only the lines added since their last
+update, so following a long run costs the same per new line no matter how
+much output came before. This module does not depend on tkinter.
+"""
+
+import bisect
+import collections
+import re
+
+# Checked in order; the first category whose pattern matches is the line's.
+# A pattern only runs when one of its keywords occurs in the lowercased
+# line, which keeps the common plain line to a few substring checks.
+CATEGORY_PATTERNS = [
+    (
+        "error",
+        ("❌", "error", "fail", "fatal", "denied", "traceback", "exception"),
+        re.compile(
+            r"❌|\b(error|failed|failure|fatal|denied|traceback|exception)\b",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "warning",
+        ("⚠", "warn", "retrying", "trying another"),
+        re.compile(r"⚠|\bwarn(ing)?\b|\bretrying\b|trying another", re.IGNORECASE),
+    ),
+    (
+        "status",
+        (
+            "using ",
+            "detected ",
+            "submitted batch job",
+            "job_id",
+            "chosen:",
+            "login/device",
+            "use code",
+            "vscode.dev/tunnel",
+            "reusing ",
+            "is already running",
+            "starting ",
+            "🔔",
+        ),
+        re.compile(
+            r"Using (port|node):|Detected (node|port):|Submitted batch job|"
+            r"JOB_ID|Chosen:|login/device|use code|vscode\.dev/tunnel|"
+            r"Reusing |is already running|^Starting |🔔",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "success",
+        ("✅", "✓", "success", "finished in", "is up to date"),
+        re.compile(
+            r"✅|✓|\bsuccess(ful(ly)?)?\b|\bfinished in\b|is up to date", re.IGNORECASE
+        ),
+    ),
+    ("header", ("=== ",), re.compile(r"^=== .* ===$")),
+]
+
+CATEGORIES = [category for category, _, _ in CATEGORY_PATTERNS]
+
+
+def classify_line(line):
+    """
+    Return the category of an output line.
+
+    Args:
+        line (str): Line without its newline
+
+    Returns:
+        str: One of CATEGORIES, or None for plain output
+    """
+    lowered = line.lower()
+    for category, keywords, pattern in CATEGORY_PATTERNS:
+        for keyword in keywords:
+            if keyword in lowered:
+                if pattern.search(line):
+                    return category
+                break
+    return None
+
+
+class OutputIndex:
+    """
+    The retained lines of a session's output with their categories.
+
+    Lines are numbered from the start of the output, so numbers stay valid
+    while the oldest lines are trimmed. Like a text widget, the index always
+    ends with an open line that the next text continues; it is classified
+    once a newline completes it.
+    """
+
+    def __init__(self, max_lines=None):
+        """
+        Initialize an empty index.
+
+        Args:
+            max_lines (int): Lines kept, including the open line; None
+                keeps everything
+        """
+        self.max_lines = max_lines
+        self.first = 0
+        self.lines = collections.deque([""])
+        self.categories = collections.deque([None])
+        self.by_category = {category: MatchList() for category in CATEGORIES}
+
+    @property
+    def end(self):
+        """Return the number of the open line."""
+        return self.first + len(self.lines) - 1
+
+    def append(self, text):
+        """
+        Add output text.
+
+        Args:
+            text (str): Text as received; it may end mid-line
+
+        Returns:
+            tuple: (completed, trimmed) where completed lists the numbers of
+                the lines the text completed and trimmed is how many of the
+                oldest lines were dropped
+        """
+        parts = text.split("\n")
+        self.lines[-1] += parts[0]
+        completed = []
+        for part in parts[1:]:
+            number = self.end
+            category = classify_line(self.lines[-1])
+            self.categories[-1] = category
+            if category is not None:
+                self.by_category[category].append(number)
+            completed.append(number)
+            self.lines.append(part)
+            self.categories.append(None)
+
+        trimmed = 0
+        if self.max_lines is not None and len(self.lines) > self.max_lines:
+            trimmed = len(self.lines) - self.max_lines
+            for _ in range(trimmed):
+                self.lines.popleft()
+                self.categories.popleft()
+            self.first += trimmed
+            for matches in self.by_category.values():
+                matches.trim(self.first)
+        return completed, trimmed
+
+    def line(self, number):
+        """Return the text and category of a retained line."""
+        offset = number - self.first
+        return self.lines[offset], self.categories[offset]
+
+    def clear(self):
+        """Forget every line; numbering continues after the cleared ones."""
+        self.first = self.end
+        self.lines = collections.deque([""])
+        self.categories = collections.deque([None])
+        for matches in self.by_category.values():
+            matches.trim(self.first)
+
+
+class MatchList:
+    """
+    Ascending line numbers with cheap appends, trims and neighbour lookups.
+
+    Trimmed numbers are skipped by an offset and compacted away once they
+    make up half of the list.
+    """
+
+    def __init__(self):
+        """Initialize an empty list."""
+        self.numbers = []
+        self.start = 0
+
+    def __len__(self):
+        """Return how many numbers are retained."""
+        return len(self.numbers) - self.start
+
+    def __iter__(self):
+        """Iterate over the retained numbers in order."""
+        return iter(self.numbers[self.start :])
+
+    def append(self, number):
+        """Add a number larger than every retained one."""
+        self.numbers.append(number)
+
+    def trim(self, first):
+        """
+        Drop numbers below first.
+
+        Returns:
+            int: How many numbers were dropped
+        """
+        start = bisect.bisect_left(self.numbers, first, self.start)
+        dropped = start - self.start
+        self.start = start
+        if self.start > len(self.numbers) // 2:
+            del self.numbers[: self.start]
+            self.start = 0
+        return dropped
+
+    def at(self, position):
+        """Return the number at a zero-based position."""
+        return self.numbers[self.start + position]
+
+    def position(self, number):
+        """Return the zero-based position of a retained number, or None."""
+        position = bisect.bisect_left(self.numbers, number, self.start)
+        if position < len(self.numbers) and self.numbers[position] == number:
+            return position - self.start
+        return None
+
+    def after(self, number):
+        """Return the first number greater than number, or None."""
+        position = bisect.bisect_right(self.numbers, number, self.start)
+        if position < len(self.numbers):
+            return self.numbers[position]
+        return None
+
+    def before(self, number):
+        """Return the last number smaller than number, or None."""
+        position = bisect.bisect_left(self.numbers, number, self.start)
+        if position > self.start:
+            return self.numbers[position - 1]
+        return None
+
+
+class LineFilter:
+    """
+    Lines of an OutputIndex that have a category and match a pattern.
+
+    Creating a filter scans the retained lines once (a category alone reuses
+    the index's own list); update() then only looks at completed lines it
+    has not seen yet.
+    """
+
+    def __init__(self, index, category=None, pattern=None):
+        """
+        Initialize the filter over the lines indexed so far.
+
+        Args:
+            index (OutputIndex): Index to filter
+            category (str): Keep only lines of this category, or None
+            pattern (str): Keep only lines this regex finds a match in, or
+                None
+
+        Raises:
+            re.error: If the pattern is not a valid regular expression
+        """
+        self.index = index
+        self.category = category
+        self.regex = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self.matches = MatchList()
+        self.scanned = index.first
+
+        if self.regex is None and category is not None:
+            for number in index.by_category[category]:
+                self.matches.append(number)
+            self.scanned = index.end
+        else:
+            self.update()
+
+    def accepts(self, number):
+        """Return True if a retained, completed line passes the filter."""
+        text, category = self.index.line(number)
+        if self.category is not None and category != self.category:
+            return False
+        return self.regex is None or self.regex.search(text) is not None
+
+    def update(self):
+        """
+        Catch up with the index.
+
+        Returns:
+            tuple: (added, dropped) where added lists the new matching line
+                numbers and dropped is how many of the oldest matches were
+                trimmed from the index since the last update
+        """
+        dropped = self.matches.trim(self.index.first)
+        added = []
+        for number in range(max(self.scanned, self.index.first), self.index.end):
+            if self.accepts(number):
+                self.matches.append(number)
+                added.append(number)
+        self.scanned = self.index.end
+        return added, dropped
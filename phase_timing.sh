@@ -0,0 +1,92 @@
+#!/bin/bash
+
+# Per-phase timing spans for the launch scripts.
+#
+# When PHASE_TIMING_FILE is set, each span is appended to it as one
+# tab-separated record:
+#   phase  start  end  cluster  exit_code
+# start and end are epoch seconds. Nothing is written when the variable is
+# unset, so the helpers cost nothing in normal interactive use.
+#
+# Remote heredocs report their own spans by printing
+#   PHASE_SPAN<TAB>phase<TAB>start<TAB>end<TAB>exit_code
+# on stderr; pipe the ssh stderr through phase_remote_filter to record them.
+# The filter also records TRACKED_JOB lines (see job_tracking.sh).
+
+source "$(dirname "${BASH_SOURCE[0]}")/job_tracking.sh"
+
+phase_now() {
+    if [ -n "$EPOCHREALTIME" ]; then
+        printf "%s" "$EPOCHREALTIME"
+    else
+        date +%s
+    fi
+}
+
+phase_record() {
+    [ -n "$PHASE_TIMING_FILE" ] || return 0
+    printf "%s\t%s\t%s\t%s\t%s\n" "$1" "$2" "$3" "${CLUSTER:-}" "$4" >> "$PHASE_TIMING_FILE"
+}
+
+phase_begin() {
+    printf -v "PHASE_START_${1//[^A-Za-z0-9_]/_}" "%s" "$(phase_now)"
+}
+
+phase_end() {
+    local start_var="PHASE_START_${1//[^A-Za-z0-9_]/_}"
+    local end
+    end="$(phase_now)"
+    phase_record "$1" "${!start_var:-$end}" "$end" "${2:-0}"
+}
+
+# Run a command (or shell function) as a named phase and keep its status.
+phase_run() {
+    local phase="$1"
+    local start
+    local status
+    shift
+
+    start="$(phase_now)"
+    "$@"
+    status=$?
+    phase_record "$phase" "$start" "$(phase_now)" "$status"
+    return $status
+}
+
+# Print 1 when remote heredocs should report spans, 0 otherwise.
+phase_remote_flag() {
+    if [ -n "$PHASE_TIMING_FILE" ]; then
+        printf "1"
+    else
+        printf "0"
+    fi
+}
+
+# Record PHASE_SPAN and TRACKED_JOB lines read from stdin and pass
+# everything else to stderr.
+phase_remote_filter() {
+    local line
+    local record
+    local phase
+    local start
+    local end
+    local status
+    local job_id
+    local job_name
+    while IFS= read -r line; do
+        case "$line" in
+            PHASE_SPAN$'\t'*)
+                record="${line#PHASE_SPAN$'\t'}"
+                IFS=$'\t' read -r phase start end status <<< "$record"
+                phase_record "$phase" "$start" "$end" "$status"
+                ;;
+            TRACKED_JOB$'\t'*)
+                IFS=$'\t' read -r _ job_id job_name <<< "$line"
+                job_track "$job_id" "$job_name"
+                ;;
+            *)
+                printf "%s\n" "$line" >&2
+                ;;
+        esac
+    done
+}
@@ -1,11 +1,13 @@
 #!/bin/bash
 current_path="$(dirname "$0")"
 source "$current_path/cluster_helpers.sh"
+source "$current_path/phase_timing.sh"
 
 CLUSTER=bluehive3
+PARTITIONS="doppelbock,dmi"
 
 usage() {
-    echo "Usage: $0 [-a|--cluster CLUSTER]"
+    echo "Usage: $0 [-a|--cluster CLUSTER] [-p|--partitions PARTITION[,PARTITION...]]"
     echo "Supported clusters: $(cluster_supported_list)"
 }
 
@@ -23,6 +25,18 @@ while [[ $# -gt 0 ]]; do
             CLUSTER="${1#*=}"
             shift
             ;;
+        -p|--partitions)
+            if [[ -z "$2" || "$2" == -* ]]; then
+                echo "Error: $1 requires a comma-separated partition list" >&2
+                exit 1
+            fi
+            PARTITIONS=$2
+            shift 2
+            ;;
+        --partitions=*)
+            PARTITIONS="${1#*=}"
+            shift
+            ;;
         -h|--help)
             usage
             exit 0
@@ -45,52 +59,86 @@ HOSTNAME="$(cluster_hostname "$CLUSTER")" || exit 1
 echo "CLUSTER: $CLUSTER"
 echo "HOSTNAME: $HOSTNAME"
 
-source "$current_path/start_ssh_control.sh" -a "$CLUSTER"
-ssh -o ControlMaster=auto -o ControlPath=/tmp/ssh_$CLUSTER -o StrictHostKeyChecking=no "$USER@$HOSTNAME"<<ENDSSH
+phase_run ssh_control source "$current_path/start_ssh_control.sh" -a "$CLUSTER"
+phase_run cluster_status_query ssh -o ControlMaster=auto -o ControlPath=/tmp/ssh_$CLUSTER -o StrictHostKeyChecking=no "$USER@$HOSTNAME" \
+    "PARTITIONS=$(printf "%q" "$PARTITIONS") bash -s" <<'ENDSSH'
+# One squeue and one sinfo call; every table below is computed from these.
+JOB_HEADER="JOBID|PARTITION|USER|TIME|TIME_LIMIT|CPUS|GRES|MEMORY|NODELIST|NAME|REASON"
+JOBS="$(squeue -h -o '%i|%P|%u|%M|%l|%C|%b|%m|%N|%j|%r')"
+NODES="$(sinfo -h -N -p "$PARTITIONS" -O 'NodeList:60,Partition:40,CPUsState:30,Memory:20,AllocMem:20,Gres:80,GresUsed:100')"
+
+# A pending job submitted to several partitions lists them all in %P,
+# comma separated; shares(a, b) is true when the two lists overlap.
+print_jobs() {
+    { echo "$JOB_HEADER"; printf "%s\n" "$JOBS" | awk -F'|' '
+        function shares(a, b,    parts, n, i) {
+            n = split(a, parts, ",")
+            for (i = 1; i <= n; i++) {
+                if (index("," b ",", "," parts[i] ",")) return 1
+            }
+            return 0
+        }
+        '"$1"; } | column -t -s '|'
+}
+
 echo
 echo "=================================== CLUSTER STATUS ==================================="
 echo
-echo "📊 DOPPELBOCK PARTITION JOBS:"
-squeue -O jobarrayid:12,partition:12,username:10,timeused:12,timelimit:12,numcpus:5,gres:12,minmemory:15,nodelist:10,name:40,reason:30 | awk 'NR == 1 || /doppelbock/' | column -t
-echo
 
-echo "📊 DMI PARTITION JOBS:"
-squeue -O jobarrayid:12,partition:12,username:10,timeused:12,timelimit:12,numcpus:5,gres:12,minmemory:15,nodelist:10,name:40,reason:30 | awk 'NR == 1 || /dmi/' | column -t
-echo
+IFS=',' read -r -a partition_list <<< "$PARTITIONS"
+for partition in "${partition_list[@]}"; do
+    echo "📊 $(printf "%s" "$partition" | tr '[:lower:]' '[:upper:]') PARTITION JOBS:"
+    print_jobs "shares(\$2, \"$partition\")"
+    echo
+done
 
 echo "👤 YOUR JOBS IN OTHER PARTITIONS:"
-squeue -O jobarrayid:12,partition:12,username:10,timeused:12,timelimit:12,numcpus:5,gres:12,minmemory:15,nodelist:10,name:40,reason:30 -u \$USER | awk 'NR > 1 && !/doppelbock/ && !/dmi/' | column -t
+print_jobs "\$3 == \"$USER\" && !shares(\$2, \"$PARTITIONS\")"
 echo
 
 echo "================================================================================"
 
-# Get free CPU count
-DMI_FREE_CPU=\$(scontrol show node bhc0208 | grep 'CPUAlloc' | awk '{print \$1}' | awk -F'=' '{print 24-\$2}')
-DOPPELBOCK_FREE_CPU=\$(scontrol show node bhg0061 | grep 'CPUAlloc' | awk '{print \$1}' | awk -F'=' '{print 64-\$2}')
-
-# Get free GPU count with error handling
-DMI_FREE_GPU=\$(squeue -w bhc0208 -O gres:15 | awk 'NR>1' | grep -o 'gpu:[0-9]*' | awk -F':' '{sum += \$2} END {print 1-sum+0}')
-DOPPELBOCK_FREE_GPU=\$(squeue -w bhg0061 -O gres:15 | awk 'NR>1' | grep -o 'gpu:[0-9]*' | awk -F':' '{sum += \$2} END {print 4-sum+0}')
-
-# Get memory info for DMI node
-DMI_TOTAL_MEMORY=\$(scontrol show node bhc0208 | grep -o 'RealMemory=[0-9]*' | cut -d'=' -f2)
-DMI_ALLOC_MEMORY=\$(scontrol show node bhc0208 | grep -o 'AllocMem=[0-9]*' | cut -d'=' -f2)
-DMI_TOTAL_MEMORY_GB=\$(((\${DMI_TOTAL_MEMORY:-0}+512)/1024))
-DMI_FREE_MEMORY_GB=\$(((\${DMI_TOTAL_MEMORY:-0}-\${DMI_ALLOC_MEMORY:-0}+512)/1024))
-
-# Get memory info for DOPPELBOCK node
-DOPPELBOCK_TOTAL_MEMORY=\$(scontrol show node bhg0061 | grep -o 'RealMemory=[0-9]*' | cut -d'=' -f2)
-DOPPELBOCK_ALLOC_MEMORY=\$(scontrol show node bhg0061 | grep -o 'AllocMem=[0-9]*' | cut -d'=' -f2)
-DOPPELBOCK_TOTAL_MEMORY_GB=\$(((\${DOPPELBOCK_TOTAL_MEMORY:-0}+512)/1024))
-DOPPELBOCK_FREE_MEMORY_GB=\$(((\${DOPPELBOCK_TOTAL_MEMORY:-0}-\${DOPPELBOCK_ALLOC_MEMORY:-0}+512)/1024))
-
 echo
 echo "🖥️  RESOURCE AVAILABILITY:"
 echo
 printf "%-15s %-15s %-15s %-20s\n" "PARTITION" "CPU:FREE/TOTAL" "GPU:FREE/TOTAL" "MEMORY:FREE/TOTAL"
 printf "%-15s %-15s %-15s %-20s\n" "----------" "---------------" "---------------" "--------------------"
-printf "%-15s %-15s %-15s %-20s\n" "DMI" "\${DMI_FREE_CPU}c/24c" "\${DMI_FREE_GPU}g/1g" "\${DMI_FREE_MEMORY_GB}GB/\${DMI_TOTAL_MEMORY_GB}GB"
-printf "%-15s %-15s %-15s %-20s\n" "DOPPELBOCK" "\${DOPPELBOCK_FREE_CPU}c/64c" "\${DOPPELBOCK_FREE_GPU}g/4g" "\${DOPPELBOCK_FREE_MEMORY_GB}GB/\${DOPPELBOCK_TOTAL_MEMORY_GB}GB"
+printf "%s\n" "$NODES" | awk -v partitions="$PARTITIONS" '
+    # Sum the GPU counts in a GRES string such as gpu:a100:2(S:0-1),gpu:1
+    function gpu_count(gres,    total, item, n, fields) {
+        total = 0
+        while (match(gres, /gpu(:[A-Za-z0-9_.-]+)?:[0-9]+/)) {
+            item = substr(gres, RSTART, RLENGTH)
+            n = split(item, fields, ":")
+            total += fields[n]
+            gres = substr(gres, RSTART + RLENGTH)
+        }
+        return total
+    }
+    NF >= 7 {
+        partition = $2
+        sub(/\*$/, "", partition)
+        # CPUsState is allocated/idle/other/total
+        split($3, cpus, "/")
+        cpu_free[partition] += cpus[2]
+        cpu_total[partition] += cpus[4]
+        mem_total[partition] += $4
+        mem_free[partition] += $4 - $5
+        gpus = gpu_count($6)
+        gpu_total[partition] += gpus
+        gpu_free[partition] += gpus - gpu_count($7)
+    }
+    END {
+        n = split(partitions, order, ",")
+        for (i = 1; i <= n; i++) {
+            p = order[i]
+            printf "%-15s %-15s %-15s %-20s\n", toupper(p), \
+                sprintf("%dc/%dc", cpu_free[p], cpu_total[p]), \
+                sprintf("%dg/%dg", gpu_free[p], gpu_total[p]), \
+                sprintf("%dGB/%dGB", int((mem_free[p] + 512) / 1024), int((mem_total[p] + 512) / 1024))
+        }
+    }
+'
 echo
 
 echo
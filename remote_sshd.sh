@@ -1,6 +1,8 @@
 #!/bin/bash
 current_path="$(dirname "$0")"
 source "$current_path/cluster_helpers.sh"
+source "$current_path/phase_timing.sh"
+source "$current_path/submission_planner.sh"
 
 # Set default value.
 CLUSTER=bluehive3
@@ -9,11 +11,16 @@ CPUS=16
 GPUS=1
 MEMORY=256
 TIME=24
-PORT=30022
+PORT_ATTEMPTS=20   # Random ports dropbear tries before the job gives up
 ROOT_OVERRIDE=""
+PLAN=false
+PLAN_PARTITIONS=""
+PLAN_CLUSTERS=""
+WAIT_TIMEOUT=0      # Seconds to wait for the SSHD endpoint, 0 waits while queued
+START_TIMEOUT=120   # Seconds a running job may take to report its port
 
 usage() {
-    echo "Usage: $0 [-a CLUSTER] [-p PARTITION] [-c CPUS] [-g GPUS] [-m MEMORY_GB] [-t HOURS] [-w NODE] [--root PATH]"
+    echo "Usage: $0 [-a CLUSTER] [-p PARTITION] [-c CPUS] [-g GPUS] [-m MEMORY_GB] [-t HOURS] [-w NODE] [--root PATH] [--plan] [--plan-partitions LIST] [--plan-clusters LIST] [--wait-timeout SECONDS]"
     echo "Supported clusters: $(cluster_supported_list)"
 }
 
@@ -91,6 +98,40 @@ while [[ $# -gt 0 ]]; do
             ROOT_OVERRIDE="${1#*=}"
             shift
             ;;
+        --wait-timeout)
+            if [[ -z "$2" || "$2" == -* ]]; then
+                echo "Error: $1 requires a number of seconds" >&2
+                exit 1
+            fi
+            WAIT_TIMEOUT="$2"
+            shift 2
+            ;;
+        --wait-timeout=*)
+            WAIT_TIMEOUT="${1#*=}"
+            shift
+            ;;
+        --plan)
+            PLAN=true
+            shift
+            ;;
+        --plan-partitions)
+            if [[ -z "$2" || "$2" == -* ]]; then
+                echo "Error: $1 requires a comma-separated partition list" >&2
+                exit 1
+            fi
+            PLAN=true
+            PLAN_PARTITIONS="$2"
+            shift 2
+            ;;
+        --plan-clusters)
+            if [[ -z "$2" || "$2" == -* ]]; then
+                echo "Error: $1 requires a comma-separated cluster list" >&2
+                exit 1
+            fi
+            PLAN=true
+            PLAN_CLUSTERS="$2"
+            shift 2
+            ;;
         -h|--help)
             usage
             exit 0
@@ -115,7 +156,7 @@ echo "MEMORY: $MEMORY"
 echo "TIME: $TIME"
 echo "NODE: $NODE"
 HOSTNAME="$(cluster_hostname "$CLUSTER")" || exit 1
-source "$current_path/start_ssh_control.sh" -a "$CLUSTER"
+phase_run ssh_control source "$current_path/start_ssh_control.sh" -a "$CLUSTER"
 
 if [ -n "$ROOT_OVERRIDE" ]; then
     REMOTE_SHARED_ROOT="$ROOT_OVERRIDE"
@@ -125,108 +166,240 @@ fi
 echo "REMOTE_SHARED_ROOT: $REMOTE_SHARED_ROOT"
 
 source "$current_path/remote_tools.sh"
-ensure_remote_dropbear || exit $?
+
+if [ "$PLAN" = "true" ]; then
+    if remote_state_jobs | awk -F'|' '$2 == "my_sshd" {found = 1} END {exit !found}'; then
+        echo "A my_sshd job is already running on $CLUSTER; skipping placement planning."
+    else
+        phase_run plan_placement plan_and_apply || exit $?
+    fi
+fi
+
+phase_run ensure_dropbear ensure_remote_dropbear || exit $?
 DROPBEAR_DIR="$REMOTE_SHARED_ROOT/dropbear"
+NODE_DIRECTIVE=""
+if [ -n "$NODE" ]; then
+    NODE_DIRECTIVE="#SBATCH -w $NODE"
+fi
 
-ssh -o ControlMaster=auto -o ControlPath=/tmp/ssh_$CLUSTER -o StrictHostKeyChecking=no -T $USER@$HOSTNAME <<ENDSSH
+# The job's log and endpoint live in the cluster home; REMOTE_LOG_DIR moves
+# them, e.g. into the sandbox of the offline benchmark (benchmark.py)
+REMOTE_LOG_DIR="${REMOTE_LOG_DIR:-/home/$USER/logs}"
+ENDPOINT_FILE="$REMOTE_LOG_DIR/dropbear.endpoint"
+
+# Remote scripts are read into variables first so no heredoc sits inside a
+# command substitution, which older bash releases parse incorrectly
+read -r -d '' SUBMIT_SCRIPT <<ENDSSH || true
 #!/bin/bash
 module load gcc 2>/dev/null || true
-mkdir -p /home/$USER/logs
+mkdir -p "$REMOTE_LOG_DIR"
 # Your commands go here
 
-if squeue -u $USER -O name:32|grep my_sshd; then
+JOB_ID=\$(squeue -h -u $USER -n my_sshd -o %i | head -n 1)
+if [ -n "\$JOB_ID" ]; then
     echo "SSHD is already running."
-    job=\$(squeue -u $USER -O jobarrayid:18,partition:13,username:12,submittime:22,starttime:22,timeused:13,timelimit:13,numcpus:10,gres:15,minmemory:12,nodelist:10,priorityLong:9,reason:9,name:4)
+    job=\$(squeue -j "\$JOB_ID" -O jobarrayid:18,partition:13,username:12,submittime:22,starttime:22,timeused:13,timelimit:13,numcpus:10,gres:15,minmemory:12,nodelist:10,priorityLong:9,reason:9,name:4)
     echo "\$job"
 else
-    rm -rf /home/$USER/logs/dropbear.log
-    cat <<'INNEREOF' | sbatch
+    rm -f "$REMOTE_LOG_DIR/dropbear.log" "$ENDPOINT_FILE"
+    JOB_ID=\$(cat <<'INNEREOF' | sbatch --parsable | cut -d';' -f1
 #!/bin/bash
 #SBATCH -p $PARTITION -t $TIME:00:00
 #SBATCH -c $CPUS
 #SBATCH --mem="${MEMORY}G"
 #SBATCH --gres=gpu:$GPUS
-#SBATCH -o /home/$USER/logs/dropbear.log
+$NODE_DIRECTIVE
+#SBATCH -o $REMOTE_LOG_DIR/dropbear.log
 #SBATCH --job-name=my_sshd
 #SBATCH --mail-type=BEGIN
 #SBATCH --mail-user=guoyang_liao@urmc.rochester.edu
 
 cd "$DROPBEAR_DIR"
 
-# Function to check if a port is available using ss command
-function check_port_available() {
-    local port=\$1
-    # Check if the port is in use
-    ss -tuln | grep ":\$port " > /dev/null
-    if [ \$? -ne 0 ]; then
-        return 0  # Port is available
-    else
-        return 1  # Port is in use
-    fi
-}
-
-# Find an available port in range 30000-40000
-function find_available_port() {
-    local port
-    # Try up to 50 times to find an available port
-    for attempt in {1..50}; do
-        # Generate a random port number between 30000 and 40000
-        port=\$((30000 + RANDOM % 10000))
-        if check_port_available \$port; then
-            echo \$port
-            return 0
-        fi
+# Bind first, publish second: dropbear claims a random port itself and only
+# writes its pid file once it listens, so there is no window between checking
+# a port and binding it. A port taken in the meantime makes dropbear exit at
+# once and the next candidate is tried. Listening on 0.0.0.0 alone makes a
+# taken IPv4 port fail the start instead of leaving only an IPv6 listener.
+PID_FILE="/tmp/dropbear_\$SLURM_JOB_ID.pid"
+for attempt in \$(seq 1 $PORT_ATTEMPTS); do
+    PORT=\$((30000 + RANDOM % 10000))
+    rm -f "\$PID_FILE"
+    ./sbin/dropbear -F -E -p "0.0.0.0:\$PORT" -P "\$PID_FILE" -r ./.ssh/dropbear_rsa_host_key -r ./.ssh/dropbear_ecdsa_host_key -r ./.ssh/dropbear_ed25519_host_key &
+    DROPBEAR_PID=\$!
+    while [ ! -s "\$PID_FILE" ] && kill -0 "\$DROPBEAR_PID" 2>/dev/null; do
+        sleep 0.1
     done
-    # If no port found after 50 attempts, use default 30022
-    echo 30022
-    return 1
-}
 
-# Get an available port
-PORT=\$(find_available_port)
-echo "Using port: \$PORT"
-echo "Using Node: \$SLURM_JOB_NODELIST"
+    if [ -s "\$PID_FILE" ]; then
+        echo "Using port: \$PORT"
+        echo "Using Node: \$SLURM_JOB_NODELIST"
+
+        # Hand the endpoint to remote_sshd.sh in one atomic write
+        printf "%s %s %s\n" "\$SLURM_JOB_ID" "\$SLURM_JOB_NODELIST" "\$PORT" > "$ENDPOINT_FILE.\$SLURM_JOB_ID"
+        mv -f "$ENDPOINT_FILE.\$SLURM_JOB_ID" "$ENDPOINT_FILE"
+
+        wait "\$DROPBEAR_PID"
+        exit \$?
+    fi
+    wait "\$DROPBEAR_PID"
+    echo "Port \$PORT is not available, trying another one"
+done
 
-# Start dropbear with the selected port
-./sbin/dropbear -F -E -p \$PORT -r ./.ssh/dropbear_rsa_host_key -r ./.ssh/dropbear_ecdsa_host_key -r ./.ssh/dropbear_ed25519_host_key
+echo "Error: dropbear could not listen on any of $PORT_ATTEMPTS ports" >&2
+exit 1
 
 INNEREOF
+)
 fi
+echo "JOB_ID=\$JOB_ID"
 ENDSSH
+# The remote state snapshot already lists the user's jobs; only open a
+# submit session when no my_sshd job is active
+JOBS="$(remote_state_jobs)"
+JOB_ID=$(printf "%s\n" "$JOBS" | awk -F'|' '$2 == "my_sshd" {print $1; exit}')
+PORT=""
+NODE=""
+if [ -n "$JOB_ID" ]; then
+    echo "SSHD is already running."
+    printf "%s\n" "$JOBS" | awk -F'|' '$2 == "my_sshd" {print "JOBID " $1 "  NAME " $2 "  STATE " $3}'
 
-# SSH into cluster and check for port in a loop
-PORT=$(ssh -o ControlMaster=auto -o ControlPath=/tmp/ssh_$CLUSTER -o StrictHostKeyChecking=no -T $USER@$HOSTNAME <<ENDSSH2
-while true; do
-    # Get SSH port from the job if it's running
-    PORT_INFO=\$(grep 'Using port:' /home/$USER/logs/dropbear.log 2>/dev/null | tail -1)
-    PORT=\$(echo \$PORT_INFO | awk '{print \$3}')
-    
-    # Break the loop if a valid port (greater than 0) is found
-    if [ -n "\$PORT" ]; then
-        echo \$PORT
-        break
+    # A running job whose dropbear already published its endpoint needs no
+    # wait session; the endpoint is only written once dropbear listens
+    if printf "%s\n" "$JOBS" | awk -F'|' -v id="$JOB_ID" '$1 == id && $3 == "RUNNING" {found = 1} END {exit !found}'; then
+        read -r endpoint_job endpoint_node endpoint_port <<< "$(remote_state_get sshd.endpoint)"
+        if [ "$endpoint_job" = "$JOB_ID" ]; then
+            NODE="$endpoint_node"
+            PORT="$endpoint_port"
+        fi
     fi
-    sleep 1
-done
-ENDSSH2
-)
-NODE=$(ssh -o ControlMaster=auto -o ControlPath=/tmp/ssh_$CLUSTER -o StrictHostKeyChecking=no -T $USER@$HOSTNAME <<ENDSSH2
-echo "Waiting for port allocation..." > /home/$USER/logs/dropbear_test.log
+else
+    SUBMIT_OUTPUT=$(phase_run sshd_submit ssh -o ControlMaster=auto -o ControlPath=/tmp/ssh_$CLUSTER -o StrictHostKeyChecking=no -T $USER@$HOSTNAME <<< "$SUBMIT_SCRIPT")
+    remote_state_invalidate
+    echo "$SUBMIT_OUTPUT" | grep -v '^JOB_ID='
+    JOB_ID=$(echo "$SUBMIT_OUTPUT" | sed -n 's/^JOB_ID=//p')
+    if ! echo "$SUBMIT_OUTPUT" | grep -q '^SSHD is already running'; then
+        job_track "$JOB_ID" my_sshd
+    fi
+fi
+if [ -z "$JOB_ID" ]; then
+    echo "Error: Could not submit or find the my_sshd job." >&2
+    exit 1
+fi
+echo "JOB_ID: $JOB_ID"
+
+# Wait for the job's endpoint in one remote session. The job writes node and
+# port together; the remote loop wakes on changes to the log directory and
+# watches the job state so a failed or cancelled job ends the wait at once.
+read -r -d '' WAIT_SCRIPT <<'ENDSSH2' || true
+job_id="$1"
+endpoint_file="$2"
+wait_timeout="$3"
+start_timeout="$4"
+log_dir="$(dirname "$endpoint_file")"
+log_file="$log_dir/dropbear.log"
+
+state_interval=2
+last_state_check=-$state_interval
+last_report=""
+running_since=""
+
+if command -v inotifywait >/dev/null 2>&1; then
+    # Home directories are shared, so inotify may miss writes made on the
+    # compute node; the timeout keeps the loop polling as a fallback
+    wait_for_change() { inotifywait -qq -t 1 -e close_write,moved_to,create "$log_dir" 2>/dev/null; }
+else
+    wait_for_change() { sleep 0.5; }
+fi
+
 while true; do
-    # Get SSH port from the job if it's running
-    NODE_INFO=\$(grep 'Using Node:' /home/$USER/logs/dropbear.log 2>/dev/null | tail -1)
-    NODE=\$(echo \$NODE_INFO | awk '{print \$3}')
-    
-    # Break the loop if a valid port (greater than 0) is found
-    if [ -n "\$NODE" ]; then
-        echo \$NODE
-        break
+    # Stop waiting once the SSH session that started this loop is gone
+    [ -e "/proc/$PPID" ] || exit 1
+
+    if [ -s "$endpoint_file" ]; then
+        read -r file_job node port < "$endpoint_file"
+        if [ "$file_job" = "$job_id" ] && [ -n "$node" ] && [ -n "$port" ]; then
+            echo "ENDPOINT $node $port"
+            exit 0
+        fi
+    fi
+
+    if (( SECONDS - last_state_check >= state_interval )); then
+        last_state_check=$SECONDS
+        IFS='|' read -r state reason partition start_time <<< "$(squeue -h -j "$job_id" -o '%T|%r|%P|%S' 2>/dev/null)"
+        if [ -z "$state" ]; then
+            # The job has left the queue; sacct knows how it ended
+            state=$(sacct -n -X -j "$job_id" -o State 2>/dev/null | awk 'NR == 1 {print $1}')
+            state=${state:-UNKNOWN}
+        fi
+
+        case "$state" in
+            PENDING|CONFIGURING|REQUEUED|RESIZING|SUSPENDED)
+                position=$(squeue -h -t PENDING -p "$partition" -o '%i' --sort=-p,i 2>/dev/null | grep -n -x "$job_id" | cut -d: -f1)
+                report="Job $job_id is $state (queue position ${position:-?} in $partition, reason: $reason, expected start: $start_time)"
+                ;;
+            RUNNING|COMPLETING)
+                running_since=${running_since:-$SECONDS}
+                report="Job $job_id is running, waiting for dropbear to report its port..."
+                if (( start_timeout > 0 && SECONDS - running_since > start_timeout )); then
+                    echo "ERROR Job $job_id has been running for ${start_timeout}s without reporting a port"
+                    tail -n 20 "$log_file" 2>/dev/null
+                    exit 1
+                fi
+                ;;
+            *)
+                echo "ERROR Job $job_id ended with state $state"
+                tail -n 20 "$log_file" 2>/dev/null
+                exit 1
+                ;;
+        esac
+
+        if [ "$report" != "$last_report" ]; then
+            echo "STATUS $report"
+            last_report="$report"
+        fi
     fi
-    sleep 1
+
+    if (( wait_timeout > 0 && SECONDS >= wait_timeout )); then
+        echo "ERROR Gave up after ${wait_timeout}s; job $job_id is still $state"
+        exit 1
+    fi
+
+    wait_for_change
 done
 ENDSSH2
-)
+
+if [ -n "$PORT" ] && [ -n "$NODE" ]; then
+    echo "Reusing endpoint of job $JOB_ID."
+else
+    phase_begin wait_sshd
+    while IFS= read -r line; do
+        case "$line" in
+            "ENDPOINT "*)
+                read -r _ NODE PORT <<< "$line"
+                ;;
+            "STATUS "*)
+                echo "${line#STATUS }"
+                ;;
+            "ERROR "*)
+                echo "Error: ${line#ERROR }" >&2
+                ;;
+            *)
+                echo "$line"
+                ;;
+        esac
+    done < <(ssh -o ControlMaster=auto -o ControlPath=/tmp/ssh_$CLUSTER -o StrictHostKeyChecking=no -T $USER@$HOSTNAME \
+        bash -s -- "$JOB_ID" "$ENDPOINT_FILE" "$WAIT_TIMEOUT" "$START_TIMEOUT" <<< "$WAIT_SCRIPT")
+
+    if [ -z "$PORT" ] || [ -z "$NODE" ]; then
+        remote_state_invalidate
+        phase_end wait_sshd 1
+        echo "Error: Could not detect the SSHD port and node." >&2
+        exit 1
+    fi
+    phase_end wait_sshd 0
+fi
 
 echo "Detected port: $PORT"
 echo "Detected node: $NODE"
-$current_path/update_ssh_config.sh -a $CLUSTER -p $PARTITION -o $PORT -w $NODE
+phase_run update_ssh_config $current_path/update_ssh_config.sh -a $CLUSTER -p $PARTITION -o $PORT -w $NODE -u $USER
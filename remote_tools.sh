@@ -1,6 +1,7 @@
 #!/bin/bash
 
 remote_tools_dir="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$remote_tools_dir/phase_timing.sh"
 REMOTE_SHARED_ROOT_DEFAULT="/scratch/snormanh_lab/shared"
 REMOTE_SHARED_ROOT="${REMOTE_SHARED_ROOT:-$REMOTE_SHARED_ROOT_DEFAULT}"
 
@@ -28,115 +29,494 @@ remote_tools_ssh_bash() {
         "REMOTE_SHARED_ROOT=$(printf "%q" "$REMOTE_SHARED_ROOT") bash -s"
 }
 
-ensure_remote_vscode_cli() {
+# Remote state snapshot. One SSH round trip reports tool presence and
+# versions under $REMOTE_SHARED_ROOT, the Dropbear manifest checksum, host
+# keys and last endpoint, and the user's active jobs as key=value lines.
+# The snapshot is cached locally for REMOTE_STATE_TTL seconds and shared by
+# every caller; anything that changes remote state calls
+# remote_state_invalidate.
+REMOTE_STATE_TTL="${REMOTE_STATE_TTL:-15}"
+
+remote_state_file() {
+    printf "%s/remote_state_%s_%s" "${TMPDIR:-/tmp}" "$USER" "$CLUSTER"
+}
+
+remote_state_probe() {
+    local state_file
+    local tmp_file
+
     remote_tools_require_context || return 1
+    state_file="$(remote_state_file)"
+    # Parallel probes from one script share $$, so each gets its own file
+    tmp_file="$(mktemp "$state_file.XXXXXX")" || return 1
+
+    remote_tools_ssh_bash > "$tmp_file" <<'ENDSSH'
 
-    if remote_tools_ssh "test -x $(printf "%q" "$REMOTE_SHARED_ROOT/code")"; then
-        echo "VS Code CLI already exists: $REMOTE_SHARED_ROOT/code"
+echo "root=$REMOTE_SHARED_ROOT"
+for tool in code cursor; do
+    if [ -x "$REMOTE_SHARED_ROOT/$tool" ]; then
+        echo "tool.$tool=1"
+    else
+        echo "tool.$tool=0"
+    fi
+    echo "version.$tool=$(cat "$REMOTE_SHARED_ROOT/.$tool.version" 2>/dev/null)"
+done
+
+dropbear_dir="$REMOTE_SHARED_ROOT/dropbear"
+if [ -x "$dropbear_dir/sbin/dropbear" ] && [ -x "$dropbear_dir/bin/dropbearkey" ]; then
+    echo "tool.dropbear=1"
+else
+    echo "tool.dropbear=0"
+fi
+manifest_sum=""
+if [ -f "$dropbear_dir/.manifest" ]; then
+    manifest_sum="$(cksum < "$dropbear_dir/.manifest" | awk '{print $1}')"
+fi
+echo "dropbear.manifest=$manifest_sum"
+if [ -s "$dropbear_dir/.ssh/dropbear_rsa_host_key" ] &&
+    [ -s "$dropbear_dir/.ssh/dropbear_ecdsa_host_key" ] &&
+    [ -s "$dropbear_dir/.ssh/dropbear_ed25519_host_key" ]; then
+    echo "dropbear.host_keys=1"
+else
+    echo "dropbear.host_keys=0"
+fi
+# "job_id node port" of the last Dropbear job that started listening
+echo "sshd.endpoint=$(cat "$HOME/logs/dropbear.endpoint" 2>/dev/null)"
+
+squeue -h -u "${USER:-$(id -un)}" -o 'job=%i|%j|%T' 2>/dev/null
+exit 0
+ENDSSH
+    if [ $? -ne 0 ]; then
+        rm -f "$tmp_file"
+        return 1
+    fi
+
+    echo "probed_at=$(date +%s)" >> "$tmp_file"
+    mv -f "$tmp_file" "$state_file"
+}
+
+# Probe again unless the cached snapshot is recent and for the same root.
+remote_state_ensure() {
+    local state_file
+    local probed_at
+    local root
+
+    state_file="$(remote_state_file)"
+    if [ -f "$state_file" ]; then
+        probed_at="$(sed -n 's/^probed_at=//p' "$state_file")"
+        root="$(sed -n 's/^root=//p' "$state_file")"
+        if [ "$root" = "$REMOTE_SHARED_ROOT" ] && [ -n "$probed_at" ] &&
+            [ $(($(date +%s) - probed_at)) -lt "$REMOTE_STATE_TTL" ]; then
+            return 0
+        fi
+    fi
+
+    phase_run remote_probe remote_state_probe
+}
+
+# Print one value of the snapshot, e.g. remote_state_get tool.code
+remote_state_get() {
+    remote_state_ensure || return 1
+    sed -n "s/^$1=//p" "$(remote_state_file)" | head -n 1
+}
+
+# Print the user's active jobs as "id|name|state[|nodes|reason]" lines.
+# The local job watcher (job_watcher.py) answers when Python is available,
+# so every script and the GUI share one adaptive squeue poll per cluster;
+# the snapshot is the fallback.
+remote_state_jobs() {
+    if command -v python3 >/dev/null 2>&1 &&
+        python3 "$remote_tools_dir/job_watcher.py" "$CLUSTER" --user "$USER" \
+            --jobs --max-age "$REMOTE_STATE_TTL" 2>/dev/null; then
         return 0
     fi
+    remote_state_ensure || return 1
+    sed -n 's/^job=//p' "$(remote_state_file)"
+}
+
+remote_state_invalidate() {
+    # The job watcher polls again before its next answer
+    rm -f "$(remote_state_file)" "${TMPDIR:-/tmp}/job_watch_${USER}_${CLUSTER}.state"
+}
+
+# Release archives of the VS Code and Cursor CLIs are cached locally, keyed
+# by tool and version, and pushed through the control master, so the login
+# nodes never download them. The URLs can point at a local HTTP stand-in.
+VSCODE_CLI_URL="${VSCODE_CLI_URL:-https://update.code.visualstudio.com/latest/cli-linux-x64/stable}"
+CURSOR_CLI_URL="${CURSOR_CLI_URL:-https://api2.cursor.sh/updates/download-latest?os=cli-alpine-x64}"
+REMOTE_TOOLS_CACHE="${REMOTE_TOOLS_CACHE:-${XDG_CACHE_HOME:-$HOME/.cache}/unix-scripts/tools}"
+
+# Print the version key of a release from its resolved download URL, or a
+# hash of the URL and ETag when the URL carries no version.
+remote_tools_version_key() {
+    local effective_url="$1"
+    local etag="$2"
+    local version
+
+    # Only the path can carry a version; the host may look like one
+    version="$(printf "%s\n" "${effective_url#*://*/}" | grep -Eo '[0-9a-f]{40}|[0-9]+\.[0-9]+\.[0-9]+' | head -n 1)"
+    if [ -z "$version" ]; then
+        version="$(printf "%s %s" "$effective_url" "$etag" | cksum | awk '{print $1}')"
+    fi
+    printf "%s" "$version"
+}
+
+# Parallel deploys share the cache, so each version directory is filled
+# under a lock. mkdir is atomic and needs no flock(1), which macOS lacks; a
+# lock whose owner has exited is taken over.
+REMOTE_TOOLS_LOCK_TIMEOUT="${REMOTE_TOOLS_LOCK_TIMEOUT:-900}"
+
+# Usage: remote_tools_lock DIR
+remote_tools_lock() {
+    local lock="$1"
+    local deadline=$((SECONDS + REMOTE_TOOLS_LOCK_TIMEOUT))
+    local owner
+
+    until mkdir "$lock" 2>/dev/null; do
+        owner="$(cat "$lock/pid" 2>/dev/null)"
+        if [ -n "$owner" ] && ! kill -0 "$owner" 2>/dev/null; then
+            rm -rf "$lock"
+            continue
+        fi
+        if [ "$SECONDS" -ge "$deadline" ]; then
+            echo "Error: Timed out waiting for $lock" >&2
+            return 1
+        fi
+        sleep 0.2
+    done
+    # $$ is the top-level script in subshells; the parent of a child shell
+    # is the (sub)shell that holds the lock
+    sh -c 'echo $PPID' > "$lock/pid"
+}
+
+# Usage: remote_tools_unlock DIR
+remote_tools_unlock() {
+    rm -rf "$1"
+}
+
+# Download an archive into the cache, resuming a partial download. Call
+# with the version directory's lock held.
+#
+# Usage: remote_tools_download_archive TOOL VERSION ARCHIVE URL ETAG [CURL_OPTION...]
+remote_tools_download_archive() {
+    local tool="$1"
+    local version="$2"
+    local archive="$3"
+    local url="$4"
+    local etag="$5"
+    shift 5
+    local curl_opts=("$@")
+    local status
+
+    echo "Downloading $tool $version to the local cache..." >&2
+    curl -L --fail --retry 3 -C - "${curl_opts[@]}" -o "$archive.part" "$url" >&2
+    status=$?
+    if [ $status -eq 33 ]; then
+        # The server does not support ranges; start over
+        rm -f "$archive.part"
+        curl -L --fail --retry 3 "${curl_opts[@]}" -o "$archive.part" "$url" >&2
+        status=$?
+    fi
+    if [ $status -ne 0 ]; then
+        echo "Error: downloading $tool $version failed (curl exit $status); rerun to resume" >&2
+        return 1
+    fi
+    if ! tar -tzf "$archive.part" >/dev/null 2>&1; then
+        rm -f "$archive.part"
+        echo "Error: downloaded $tool archive is not a valid tar.gz" >&2
+        return 1
+    fi
+    mv -f "$archive.part" "$archive" || return 1
+    printf "%s\n%s\n" "$url" "$etag" > "$(dirname "$archive")/source"
+}
+
+# Make sure the current release of a CLI is in the local cache and print
+# the path of its archive. The release URL is resolved to a version first;
+# a cached version is reused as is, and a partial download is resumed. If
+# the release server cannot be reached, the newest cached version is used.
+#
+# Usage: remote_tools_cache_archive TOOL URL [CURL_OPTION...]
+remote_tools_cache_archive() {
+    local tool="$1"
+    local url="$2"
+    shift 2
+    local curl_opts=("$@")
+    local tool_cache="$REMOTE_TOOLS_CACHE/$tool"
+    local headers
+    local effective_url
+    local etag
+    local version
+    local archive
+    local status
+
+    if ! command -v curl >/dev/null 2>&1; then
+        echo "Error: curl is required to fill the local tool cache" >&2
+        return 1
+    fi
+
+    mkdir -p "$tool_cache" || return 1
+
+    # A one-byte ranged GET follows the redirects of "latest" URLs and works
+    # on servers that reject HEAD requests
+    headers="$(curl -sSL --fail --max-time 20 -r 0-0 -o /dev/null -D - "${curl_opts[@]}" -w 'EFFECTIVE_URL %{url_effective}\n' "$url")"
+    status=$?
+    if [ $status -ne 0 ]; then
+        version="$(cat "$tool_cache/latest" 2>/dev/null)"
+        if [ -n "$version" ] && [ -s "$tool_cache/$version/archive.tar.gz" ]; then
+            echo "Release server unreachable; using cached $tool $version" >&2
+            printf "%s\n" "$tool_cache/$version/archive.tar.gz"
+            return 0
+        fi
+        echo "Error: could not resolve the $tool release at $url" >&2
+        return 1
+    fi
+
+    effective_url="$(printf "%s\n" "$headers" | sed -n 's/^EFFECTIVE_URL //p' | tail -n 1)"
+    etag="$(printf "%s\n" "$headers" | tr -d '\r' | sed -n 's/^[Ee][Tt][Aa][Gg]: *//p' | tail -n 1)"
+    version="$(remote_tools_version_key "$effective_url" "$etag")"
+    archive="$tool_cache/$version/archive.tar.gz"
+
+    mkdir -p "$tool_cache/$version" || return 1
+    remote_tools_lock "$tool_cache/$version/lock" || return 1
+    # Another deploy may have finished the download while this one waited
+    if [ -s "$archive" ]; then
+        echo "Using cached $tool $version" >&2
+        status=0
+    else
+        remote_tools_download_archive "$tool" "$version" "$archive" "$effective_url" "$etag" "${curl_opts[@]}"
+        status=$?
+    fi
+    remote_tools_unlock "$tool_cache/$version/lock"
+    [ $status -eq 0 ] || return 1
+
+    printf "%s\n" "$version" > "$tool_cache/latest"
+    printf "%s\n" "$archive"
+}
+
+# Install a CLI from an archive read on stdin into $REMOTE_SHARED_ROOT/TOOL
+# and record its version next to it.
+#
+# Usage: remote_tools_install_cli TOOL VERSION < ARCHIVE
+remote_tools_install_cli() {
+    local script
 
-    echo "Deploying VS Code CLI to $REMOTE_SHARED_ROOT/code..."
-    remote_tools_ssh_bash <<'ENDSSH'
+    remote_tools_require_context || return 1
+    read -r -d '' script <<'ENDSSH'
 set -euo pipefail
 
 mkdir -p "$REMOTE_SHARED_ROOT"
-tmp_dir="$(mktemp -d "${TMPDIR:-/tmp}/vscode-cli.XXXXXX")"
+tmp_dir="$(mktemp -d "${TMPDIR:-/tmp}/$TOOL-cli.XXXXXX")"
 trap 'rm -rf "$tmp_dir"' EXIT
 
-download_url="https://update.code.visualstudio.com/latest/cli-linux-x64/stable"
-archive="$tmp_dir/code_cli.tar.gz"
-
-if command -v curl >/dev/null 2>&1; then
-    curl -L --fail --retry 3 -o "$archive" "$download_url"
-elif command -v wget >/dev/null 2>&1; then
-    wget -O "$archive" "$download_url"
-else
-    echo "Error: neither curl nor wget exists on the remote host" >&2
-    exit 1
-fi
-
-tar -xzf "$archive" -C "$tmp_dir"
-code_bin="$(find "$tmp_dir" -type f -name code | head -n 1)"
-if [ -z "$code_bin" ]; then
-    echo "Error: downloaded VS Code CLI archive did not contain an executable named code" >&2
+tar -xzf - -C "$tmp_dir"
+tool_bin="$(find "$tmp_dir" -type f -name "$TOOL" | head -n 1)"
+if [ -z "$tool_bin" ]; then
+    echo "Error: $TOOL CLI archive did not contain an executable named $TOOL" >&2
     exit 1
 fi
 
-cp "$code_bin" "$REMOTE_SHARED_ROOT/code"
-chmod 755 "$REMOTE_SHARED_ROOT/code"
-"$REMOTE_SHARED_ROOT/code" --version | head -n 1 || true
+cp "$tool_bin" "$REMOTE_SHARED_ROOT/.$TOOL.$$"
+chmod 755 "$REMOTE_SHARED_ROOT/.$TOOL.$$"
+mv -f "$REMOTE_SHARED_ROOT/.$TOOL.$$" "$REMOTE_SHARED_ROOT/$TOOL"
+printf "%s\n" "$VERSION" > "$REMOTE_SHARED_ROOT/.$TOOL.version"
+"$REMOTE_SHARED_ROOT/$TOOL" --version | head -n 1 || true
 ENDSSH
+
+    ssh -o ControlMaster=auto \
+        -o ControlPath="/tmp/ssh_$CLUSTER" \
+        -o StrictHostKeyChecking=no \
+        -T "$USER@$HOSTNAME" \
+        "REMOTE_SHARED_ROOT=$(printf "%q" "$REMOTE_SHARED_ROOT") TOOL=$(printf "%q" "$1") VERSION=$(printf "%q" "$2") bash -c $(printf "%q" "$script")"
 }
 
-ensure_remote_cursor_cli() {
+# Deploy a CLI from the local cache unless it is already on the cluster.
+#
+# Usage: ensure_remote_cli TOOL LABEL URL [CURL_OPTION...]
+ensure_remote_cli() {
+    local tool="$1"
+    local label="$2"
+    local url="$3"
+    shift 3
+    local archive
+    local version
+
     remote_tools_require_context || return 1
 
-    if remote_tools_ssh "test -x $(printf "%q" "$REMOTE_SHARED_ROOT/cursor")"; then
-        echo "Cursor tunnel CLI already exists: $REMOTE_SHARED_ROOT/cursor"
+    if [ "$(remote_state_get "tool.$tool")" = 1 ]; then
+        echo "$label already exists: $REMOTE_SHARED_ROOT/$tool"
         return 0
     fi
 
-    echo "Deploying Cursor tunnel CLI to $REMOTE_SHARED_ROOT/cursor..."
-    remote_tools_ssh_bash <<'ENDSSH'
-set -euo pipefail
+    archive="$(phase_run "fetch_${tool}_cli" remote_tools_cache_archive "$tool" "$url" "$@")" || return 1
+    version="$(basename "$(dirname "$archive")")"
 
-mkdir -p "$REMOTE_SHARED_ROOT"
-tmp_dir="$(mktemp -d "${TMPDIR:-/tmp}/cursor-cli.XXXXXX")"
-trap 'rm -rf "$tmp_dir"' EXIT
+    echo "Deploying $label $version to $REMOTE_SHARED_ROOT/$tool..."
+    phase_run "push_${tool}_cli" remote_tools_install_cli "$tool" "$version" < "$archive"
+    local status=$?
+    remote_state_invalidate
+    return $status
+}
 
-download_url="https://api2.cursor.sh/updates/download-latest?os=cli-alpine-x64"
-archive="$tmp_dir/cursor_cli.tar.gz"
+ensure_remote_vscode_cli() {
+    ensure_remote_cli code "VS Code CLI" "$VSCODE_CLI_URL"
+}
 
-if command -v curl >/dev/null 2>&1; then
-    curl -Lk --fail --retry 3 -o "$archive" "$download_url"
-elif command -v wget >/dev/null 2>&1; then
-    wget --no-check-certificate -O "$archive" "$download_url"
-else
-    echo "Error: neither curl nor wget exists on the remote host" >&2
-    exit 1
-fi
+ensure_remote_cursor_cli() {
+    # The Cursor update server has needed certificate checks disabled
+    ensure_remote_cli cursor "Cursor tunnel CLI" "$CURSOR_CLI_URL" -k
+}
 
-tar -xzf "$archive" -C "$tmp_dir"
-cursor_bin="$(find "$tmp_dir" -type f -name cursor | head -n 1)"
-if [ -z "$cursor_bin" ]; then
-    echo "Error: downloaded Cursor CLI archive did not contain an executable named cursor" >&2
-    exit 1
-fi
+# Print the content manifest of a local tool tree: one
+# "<sha256> <mode> <relative path>" line per file, sorted by path. The mode
+# is 755 for executables and 644 otherwise. The manifest file itself, its
+# temporary copies and .ssh (host keys generated on the cluster) are not
+# part of the tree.
+remote_tools_manifest() {
+    local tree="$1"
+    local hash_cmd=(sha256sum)
+    local path
+    local mode
+
+    if ! command -v sha256sum >/dev/null 2>&1; then
+        hash_cmd=(shasum -a 256)
+    fi
+
+    (
+        cd "$tree" || exit 1
+        find . -type f ! -name .manifest ! -name '.manifest.*' ! -path './.ssh/*' | sed 's|^\./||' | LC_ALL=C sort |
+            while IFS= read -r path; do
+                if [ -x "$path" ]; then
+                    mode=755
+                else
+                    mode=644
+                fi
+                printf "%s %s %s\n" "$("${hash_cmd[@]}" "$path" | awk '{print $1}')" "$mode" "$path"
+            done
+    )
+}
 
-cp "$cursor_bin" "$REMOTE_SHARED_ROOT/cursor"
-chmod 755 "$REMOTE_SHARED_ROOT/cursor"
-"$REMOTE_SHARED_ROOT/cursor" --version | head -n 1 || true
+# Print the files of a tool tree whose remote copy under $REMOTE_SHARED_ROOT
+# is missing, different, or lost its executable bit. The remote side hashes
+# its files in the same round trip, so partial or corrupted copies are found
+# even if the stored remote manifest claims otherwise. .manifest is printed
+# too when the remote one is missing or differs, as on trees deployed
+# before manifests were stored, so the snapshot's fast path can match.
+remote_tools_stale_files() {
+    local name="$1"
+    local manifest="$2"
+
+    remote_tools_require_context || return 1
+    ssh -o ControlMaster=auto \
+        -o ControlPath="/tmp/ssh_$CLUSTER" \
+        -o StrictHostKeyChecking=no \
+        -T "$USER@$HOSTNAME" \
+        "TREE=$(printf "%q" "$REMOTE_SHARED_ROOT/$name") MANIFEST=$(printf "%q" "$manifest") bash -s" <<'ENDSSH'
+set -uo pipefail
+
+while read -r hash mode path; do
+    [ -n "$path" ] || continue
+    file="$TREE/$path"
+    if [ ! -f "$file" ]; then
+        echo "$path"
+    elif [ "$mode" = 755 ] && [ ! -x "$file" ]; then
+        echo "$path"
+    elif [ "$(sha256sum "$file" | awk '{print $1}')" != "$hash" ]; then
+        echo "$path"
+    fi
+done <<< "$MANIFEST"
+
+if [ "$(cat "$TREE/.manifest" 2>/dev/null)" != "$MANIFEST" ]; then
+    echo .manifest
+fi
 ENDSSH
 }
 
-copy_remote_dropbear_tree() {
+# Store a tree's manifest in its .manifest file. Parallel deploys read and
+# tar the file, so it is only replaced, by rename, when its content changes.
+#
+# Usage: remote_tools_store_manifest TREE MANIFEST
+remote_tools_store_manifest() {
+    local tree="$1"
+    local manifest="$2"
+    local tmp_file
+
+    if [ -f "$tree/.manifest" ] && [ "$(cat "$tree/.manifest")" = "$manifest" ]; then
+        return 0
+    fi
+    tmp_file="$(mktemp "$tree/.manifest.XXXXXX")" || return 1
+    if ! printf "%s\n" "$manifest" > "$tmp_file" || ! chmod 644 "$tmp_file"; then
+        rm -f "$tmp_file"
+        return 1
+    fi
+    mv -f "$tmp_file" "$tree/.manifest"
+}
+
+# Bring $REMOTE_SHARED_ROOT/<name> in line with the local <name> tree,
+# transferring only the files whose content differs, then store the local
+# manifest next to them.
+sync_remote_tool_tree() {
+    local name="$1"
+    local tree="$remote_tools_dir/$name"
+    local manifest
+    local stale
+    local stale_files=()
+
     remote_tools_require_context || return 1
 
-    if [ ! -d "$remote_tools_dir/dropbear" ]; then
-        echo "Error: local dropbear directory not found at $remote_tools_dir/dropbear" >&2
+    if [ ! -d "$tree" ]; then
+        echo "Error: local $name directory not found at $tree" >&2
         return 1
     fi
 
-    echo "Copying local dropbear tree to $REMOTE_SHARED_ROOT/dropbear..."
-    tar -C "$remote_tools_dir" -czf - dropbear | ssh -o ControlMaster=auto \
+    manifest="$(remote_tools_manifest "$tree")" || return 1
+    remote_tools_store_manifest "$tree" "$manifest" || return 1
+
+    stale="$(phase_run "probe_$name" remote_tools_stale_files "$name" "$manifest")" || return 1
+    if [ -z "$stale" ]; then
+        echo "$name is up to date: $REMOTE_SHARED_ROOT/$name"
+        return 0
+    fi
+
+    # .manifest goes with every copy, so it is not listed separately
+    while IFS= read -r path; do
+        if [ "$path" != .manifest ]; then
+            stale_files+=("$path")
+        fi
+    done <<< "$stale"
+
+    if [ "${#stale_files[@]}" -eq 0 ]; then
+        echo "Storing the $name manifest in $REMOTE_SHARED_ROOT/$name..."
+    else
+        echo "Copying ${#stale_files[@]} changed file(s) of the local $name tree to $REMOTE_SHARED_ROOT/$name..."
+        printf "  %s\n" "${stale_files[@]}"
+    fi
+    tar -C "$tree" -czf - .manifest "${stale_files[@]}" | phase_run "copy_$name" ssh -o ControlMaster=auto \
         -o ControlPath="/tmp/ssh_$CLUSTER" \
         -o StrictHostKeyChecking=no \
         -T "$USER@$HOSTNAME" \
-        "mkdir -p $(printf "%q" "$REMOTE_SHARED_ROOT") && tar -xzf - -C $(printf "%q" "$REMOTE_SHARED_ROOT")"
+        "mkdir -p $(printf "%q" "$REMOTE_SHARED_ROOT/$name") && tar -xzf - -C $(printf "%q" "$REMOTE_SHARED_ROOT/$name")"
 }
 
 ensure_remote_dropbear() {
+    local manifest_sum
+
     remote_tools_require_context || return 1
 
-    if ! remote_tools_ssh "test -x $(printf "%q" "$REMOTE_SHARED_ROOT/dropbear/sbin/dropbear") && test -x $(printf "%q" "$REMOTE_SHARED_ROOT/dropbear/bin/dropbearkey")"; then
-        copy_remote_dropbear_tree || return 1
-    else
-        echo "Dropbear already exists: $REMOTE_SHARED_ROOT/dropbear"
+    # The snapshot's manifest checksum vouches for an unchanged tree; set
+    # REMOTE_TOOLS_VERIFY=1 to rehash the remote files instead
+    manifest_sum="$(remote_tools_manifest "$remote_tools_dir/dropbear" | cksum | awk '{print $1}')"
+    if [ -z "$REMOTE_TOOLS_VERIFY" ] &&
+        [ "$(remote_state_get dropbear.manifest)" = "$manifest_sum" ] &&
+        [ "$(remote_state_get dropbear.host_keys)" = 1 ]; then
+        echo "Dropbear is up to date: $REMOTE_SHARED_ROOT/dropbear"
+        return 0
     fi
 
+    remote_state_invalidate
+    sync_remote_tool_tree dropbear || return 1
+
     echo "Ensuring Dropbear host keys exist under $REMOTE_SHARED_ROOT/dropbear/.ssh..."
-    remote_tools_ssh_bash <<'ENDSSH'
+    phase_run dropbear_host_keys remote_tools_ssh_bash <<'ENDSSH'
 set -euo pipefail
 
 dropbear_dir="$REMOTE_SHARED_ROOT/dropbear"
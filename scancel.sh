@@ -1,6 +1,7 @@
 #!/bin/bash
 script_dir="$(cd -- "$(dirname -- "${BASH_SOURCE[0]}")" && pwd)"
 source "$script_dir/cluster_helpers.sh"
+source "$script_dir/phase_timing.sh"
 
 CLUSTER="${SCANCEL_CLUSTER:-bluehive3}"
 SCANCEL_ARGS=()
@@ -85,10 +86,13 @@ main() {
 
     parse_args "$@"
 
-    env "${SSH_LOCALE_ENV[@]}" "$script_dir/start_ssh_control.sh" -a "$CLUSTER" || exit $?
+    phase_run ssh_control env "${SSH_LOCALE_ENV[@]}" "$script_dir/start_ssh_control.sh" -a "$CLUSTER" || exit $?
 
     remote_command="$(build_remote_command "${SCANCEL_ARGS[@]}")"
     login_command="LC_ALL=C LANG=C LC_CTYPE=C bash -lc $(shell_quote "$remote_command")"
+    # Cancelled jobs must not linger in remote_tools.sh's state snapshot or
+    # the job watcher's state
+    rm -f "${TMPDIR:-/tmp}/remote_state_"*"_$CLUSTER" "${TMPDIR:-/tmp}/job_watch_"*"_$CLUSTER.state"
     exec env "${SSH_LOCALE_ENV[@]}" ssh -T "$CLUSTER" "$login_command"
 }
 
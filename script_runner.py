@@ -0,0 +1,545 @@
+"""
+Script Runner
+
+Helpers for running the cluster shell scripts and streaming their output
+as coroutines on the orchestrator engine. This module does not depend on
+tkinter so it can be reused outside the GUI.
+"""
+
+import asyncio
+import codecs
+import collections
+import glob
+import itertools
+import os
+import signal
+import tempfile
+import threading
+import time
+
+from orchestrator import SessionFinished, SessionOutput
+from session_log import SessionLogWriter
+from ssh_pool import cluster_hostname, control_path
+
+READ_CHUNK_SIZE = 65536  # Bytes requested per read from the output pipe
+BATCH_INTERVAL = 0.05  # Seconds output is held back to form larger batches
+EXIT_POLL_INTERVAL = 0.1  # Seconds between exit checks while output is idle
+DRAIN_TIMEOUT = 0.05  # Seconds allowed per read when draining after exit
+STOP_TIMEOUT = 3.0  # Seconds a stopped script gets before it is killed
+SCANCEL_TIMEOUT = 20  # Seconds allowed for cancelling one cluster's jobs
+
+# Session ids are unique per process so events of a closed page's sessions
+# can never be mistaken for those of a new page
+_session_ids = itertools.count(1)
+
+# One timing span reported by phase_timing.sh
+PhaseSpan = collections.namedtuple(
+    "PhaseSpan", ["phase", "start", "end", "cluster", "exit_code"]
+)
+
+
+def read_phase_spans(path):
+    """
+    Read the timing spans a script wrote to its PHASE_TIMING_FILE.
+
+    Args:
+        path (str): Path of the tab-separated span file
+
+    Returns:
+        list: PhaseSpan records ordered by start time; malformed lines and
+            a missing file are ignored
+    """
+    spans = []
+    try:
+        with open(path, encoding="utf-8", errors="replace") as span_file:
+            for line in span_file:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) != 5:
+                    continue
+                try:
+                    spans.append(
+                        PhaseSpan(
+                            fields[0],
+                            float(fields[1]),
+                            float(fields[2]),
+                            fields[3],
+                            int(fields[4] or 0),
+                        )
+                    )
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+
+    spans.sort(key=lambda span: span.start)
+    return spans
+
+
+# One Slurm job a script reported through job_tracking.sh
+TrackedJob = collections.namedtuple("TrackedJob", ["cluster", "job_id", "name"])
+
+
+def read_tracked_jobs(path):
+    """
+    Read the Slurm jobs a script wrote to its JOB_TRACKING_FILE.
+
+    Args:
+        path (str): Path of the tab-separated job file
+
+    Returns:
+        list: TrackedJob records in the order they were started, without
+            duplicates; malformed lines and a missing file are ignored
+    """
+    jobs = []
+    try:
+        with open(path, encoding="utf-8", errors="replace") as job_file:
+            for line in job_file:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) != 3 or not fields[0] or not fields[1].isdigit():
+                    continue
+                job = TrackedJob(*fields)
+                if job not in jobs:
+                    jobs.append(job)
+    except FileNotFoundError:
+        pass
+
+    return jobs
+
+
+async def stream_process_output(process, emit, chunk_size=READ_CHUNK_SIZE):
+    """
+    Stream an asyncio subprocess's stdout to a callback in decoded batches.
+
+    Output is read in large chunks and decoded incrementally, so multi-byte
+    characters split across reads are kept intact. Batches are emitted at
+    most every BATCH_INTERVAL seconds. Once the process exits, whatever is
+    already buffered is drained before returning; background children that
+    inherited the pipe (such as an ``ssh -fN`` control master) do not keep
+    the reader alive.
+
+    Args:
+        process (asyncio.subprocess.Process): Process started with
+            stdout=PIPE
+        emit (callable): Called with each decoded text batch
+        chunk_size (int): Bytes requested per read
+
+    Returns:
+        int: The process return code
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    pending = []
+    last_emit = time.monotonic()
+
+    try:
+        while True:
+            timeout = BATCH_INTERVAL if pending else EXIT_POLL_INTERVAL
+            try:
+                data = await asyncio.wait_for(process.stdout.read(chunk_size), timeout)
+            except asyncio.TimeoutError:
+                data = None
+
+            if data == b"":
+                break
+            if data:
+                pending.append(decoder.decode(data))
+
+            # returncode is set as soon as the process exits, whereas
+            # process.wait() may also wait for the pipe to close
+            if process.returncode is not None:
+                # Take what is already buffered, but do not wait for
+                # background children that still hold the pipe
+                while True:
+                    try:
+                        data = await asyncio.wait_for(
+                            process.stdout.read(chunk_size), DRAIN_TIMEOUT
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                    if not data:
+                        break
+                    pending.append(decoder.decode(data))
+                    if len(data) < chunk_size:
+                        break
+                break
+
+            now = time.monotonic()
+            if pending and now - last_emit >= BATCH_INTERVAL:
+                emit("".join(pending))
+                pending = []
+                last_emit = now
+    finally:
+        pending.append(decoder.decode(b"", final=True))
+        text = "".join(pending)
+        if text:
+            emit(text)
+
+    if process.returncode is None:
+        # The pipe reached EOF first; the exit follows promptly
+        await process.wait()
+    return process.returncode
+
+
+class ScriptSession:
+    """
+    A single script run with its own process group.
+
+    run() is a coroutine executed by the orchestrator engine. It posts
+    SessionOutput events while the script runs and one SessionFinished
+    event when it ends, is stopped, or cannot be started.
+
+    The script leads a new process group so stopping it also ends the ssh
+    clients and helpers it started; closing those clients closes their
+    channels on the shared control master. Control masters started by the
+    scripts detach into their own session and keep running.
+
+    Everything the session outputs is also appended to its session log on
+    disk, which outlives the session and the app.
+    """
+
+    def __init__(self, session_id, title, cmd, user=None):
+        """
+        Initialize a script session.
+
+        Args:
+            session_id (int): Unique session identifier
+            title (str): Short label for the session
+            cmd (list): Command and arguments to execute
+            user (str): Login user name used to cancel the session's jobs
+        """
+        self.session_id = session_id
+        self.title = title
+        self.cmd = cmd
+        self.user = user
+
+        self.process = None
+        self.return_code = None
+        self.state = "pending"
+        self.future = None
+        self.post = None  # Event sink of the run, for a stop before it starts
+        self.entered = False
+        # Decides between stop() and run() which one reports a stop that
+        # lands before the run starts
+        self.start_lock = threading.Lock()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_jobs_on_stop = False
+
+        # Side channels for the scripts' phase_timing.sh spans and the
+        # Slurm jobs they report through job_tracking.sh
+        timing_fd, self.timing_file = tempfile.mkstemp(
+            prefix="phase_timing_", suffix=".tsv"
+        )
+        os.close(timing_fd)
+        tracking_fd, self.tracking_file = tempfile.mkstemp(
+            prefix="job_tracking_", suffix=".tsv"
+        )
+        os.close(tracking_fd)
+
+        self.log = SessionLogWriter(title, cmd)
+
+    @property
+    def is_running(self):
+        """Return True while the session has not finished."""
+        return self.state in ("pending", "running", "stopping")
+
+    async def run(self, post, slot=None):
+        """
+        Run the script and post its output and result.
+
+        Args:
+            post (callable): Receives SessionOutput and SessionFinished events
+            slot (asyncio.Semaphore): Concurrency slot held while the script
+                runs; waiting for it counts as part of the run, so a session
+                stopped before it starts still reports its stop
+        """
+        session_id = self.session_id
+        with self.start_lock:
+            if self.state == "stopped":
+                # stop() already reported the session
+                return
+            self.entered = True
+        post = self.logged(post)
+        try:
+            if slot is None:
+                await self._execute(post)
+            else:
+                async with slot:
+                    await self._execute(post)
+
+        except asyncio.CancelledError:
+            self.state = "stopping"
+            await self._terminate()
+            if self.cancel_jobs_on_stop:
+                await self.cancel_jobs(post)
+            self.state = "stopped"
+            self.finished_at = time.time()
+            post(SessionFinished(session_id, "stopped", self.return_code, ""))
+            raise
+
+        except Exception as e:
+            await self._terminate()
+            self.state = "error"
+            self.finished_at = time.time()
+            post(SessionFinished(session_id, "error", None, str(e)))
+
+    def logged(self, post):
+        """Wrap post so the session's output and end also reach its log."""
+
+        def post_and_log(event):
+            if isinstance(event, SessionOutput):
+                self.log.write(event.text)
+            elif isinstance(event, SessionFinished):
+                self.log.close(event.state, event.return_code)
+            post(event)
+
+        return post_and_log
+
+    async def _execute(self, post):
+        """Start the script and stream it until it exits."""
+        session_id = self.session_id
+        self.started_at = time.time()
+        self.state = "running"
+        self.process = await asyncio.create_subprocess_exec(
+            *self.cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            env=dict(
+                os.environ,
+                PHASE_TIMING_FILE=self.timing_file,
+                JOB_TRACKING_FILE=self.tracking_file,
+            ),
+            start_new_session=True,
+        )
+
+        post(SessionOutput(session_id, f"✓ Executing: {' '.join(self.cmd)}\n"))
+
+        self.return_code = await stream_process_output(
+            self.process, lambda text: post(SessionOutput(session_id, text))
+        )
+        self.finished_at = time.time()
+        self.state = "success" if self.return_code == 0 else "failed"
+        post(SessionFinished(session_id, self.state, self.return_code, ""))
+
+    def _signal_group(self, signum):
+        """Send a signal to the script's process group."""
+        try:
+            os.killpg(self.process.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    async def _terminate(self):
+        """
+        Terminate the script's process group.
+
+        The group gets SIGTERM and STOP_TIMEOUT seconds to exit; anything
+        still left in it afterwards, including children that outlived the
+        script itself, is killed. Exit is detected from returncode rather
+        than wait(), which also waits for a detached control master to
+        close the inherited output pipe.
+        """
+        if self.process is None:
+            return
+
+        if self.process.returncode is None:
+            self._signal_group(signal.SIGTERM)
+            deadline = time.monotonic() + STOP_TIMEOUT
+            while self.process.returncode is None and time.monotonic() < deadline:
+                await asyncio.sleep(EXIT_POLL_INTERVAL)
+        self._signal_group(signal.SIGKILL)
+        while self.process.returncode is None:
+            await asyncio.sleep(EXIT_POLL_INTERVAL)
+        self.return_code = self.process.returncode
+
+    async def cancel_jobs(self, post):
+        """
+        Cancel the Slurm jobs this run started.
+
+        Each cluster's jobs are cancelled with one scancel over its control
+        master, and the result is posted as session output.
+
+        Args:
+            post (callable): Receives SessionOutput events
+        """
+        jobs_by_cluster = collections.OrderedDict()
+        for job in self.tracked_jobs():
+            jobs_by_cluster.setdefault(job.cluster, []).append(job.job_id)
+
+        for cluster, job_ids in jobs_by_cluster.items():
+            listing = ", ".join(job_ids)
+            process = None
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    "ssh",
+                    "-o",
+                    "ControlMaster=no",
+                    "-o",
+                    f"ControlPath={control_path(cluster)}",
+                    "-o",
+                    "BatchMode=yes",
+                    "-T",
+                    f"{self.user}@{cluster_hostname(cluster)}",
+                    "scancel",
+                    *job_ids,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                )
+                output, _ = await asyncio.wait_for(
+                    process.communicate(), SCANCEL_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                post(
+                    SessionOutput(
+                        self.session_id,
+                        f"❌ scancel on {cluster} timed out for jobs {listing}\n",
+                    )
+                )
+                continue
+            except Exception as e:
+                post(
+                    SessionOutput(
+                        self.session_id,
+                        f"❌ Could not cancel jobs {listing} on {cluster}: {e}\n",
+                    )
+                )
+                continue
+
+            # Drop the cached remote state so the next launch sees the change
+            for path in glob.glob(
+                os.path.join(tempfile.gettempdir(), f"remote_state_*_{cluster}")
+            ):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+            text = output.decode(errors="replace")
+            if process.returncode == 0:
+                text += f"✓ Cancelled jobs {listing} on {cluster}\n"
+            else:
+                text += f"❌ scancel failed on {cluster} for jobs {listing}\n"
+            post(SessionOutput(self.session_id, text))
+
+    def phase_spans(self):
+        """Return the timing spans the script has reported so far."""
+        return read_phase_spans(self.timing_file)
+
+    def tracked_jobs(self):
+        """Return the Slurm jobs the script has reported starting."""
+        return read_tracked_jobs(self.tracking_file)
+
+    def cleanup(self):
+        """Remove the session's side-channel files."""
+        for path in (self.timing_file, self.tracking_file):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stop(self, cancel_jobs=False):
+        """
+        Stop the session if it has not finished.
+
+        The stop completes asynchronously; the SessionFinished event with
+        state "stopped" confirms it.
+
+        Args:
+            cancel_jobs (bool): Also scancel the Slurm jobs the run started
+
+        Returns:
+            bool: True if a stop was requested
+        """
+        with self.start_lock:
+            if self.state not in ("pending", "running"):
+                return False
+
+            self.cancel_jobs_on_stop = cancel_jobs
+            # A run cancelled before it starts never reaches its handler,
+            # so the stop is reported here; nothing of it ever ran
+            never_ran = not self.entered
+            self.state = "stopped" if never_ran else "stopping"
+
+        if self.future is not None:
+            self.future.cancel()
+        if never_ran:
+            self.finished_at = time.time()
+            if self.post is not None:
+                self.logged(self.post)(
+                    SessionFinished(self.session_id, "stopped", None, "")
+                )
+        return True
+
+
+class SessionManager:
+    """
+    Registry of script sessions that may run concurrently.
+
+    Sessions run as coroutines on the orchestrator engine, limited by its
+    "scripts" pool.
+    """
+
+    def __init__(self, engine, user=None):
+        """
+        Initialize an empty session registry.
+
+        Args:
+            engine (Engine): Orchestrator engine that runs the sessions
+            user (str): Login user name used to cancel the sessions' jobs
+        """
+        self.engine = engine
+        self.user = user
+        self.sessions = {}
+
+    def start(self, title, cmd):
+        """
+        Create and start a new session.
+
+        Args:
+            title (str): Short label for the session
+            cmd (list): Command and arguments to execute
+
+        Returns:
+            ScriptSession: The started session
+        """
+        session = ScriptSession(next(_session_ids), title, cmd, self.user)
+        self.sessions[session.session_id] = session
+        session.post = self.engine.post
+        session.future = self.engine.submit(
+            session.run(session.post, self.engine.slots["scripts"])
+        )
+        return session
+
+    def get(self, session_id):
+        """Return the session with the given id, or None."""
+        return self.sessions.get(session_id)
+
+    def remove(self, session_id):
+        """Forget a finished session."""
+        session = self.sessions.get(session_id)
+        if session and not session.is_running:
+            session.cleanup()
+            del self.sessions[session_id]
+
+    def running(self):
+        """Return all sessions that have not finished."""
+        return [session for session in self.sessions.values() if session.is_running]
+
+    def find_running(self, title):
+        """Return the running session with the given title, or None."""
+        for session in self.running():
+            if session.title == title:
+                return session
+        return None
+
+    def stop_all(self, cancel_jobs=False):
+        """
+        Stop every running session.
+
+        Args:
+            cancel_jobs (bool): Also scancel the Slurm jobs each run started
+        """
+        for session in self.running():
+            session.stop(cancel_jobs)
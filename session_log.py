@@ -0,0 +1,446 @@
+"""
+Session Log
+
+Every script session's output on disk, so it survives clearing the output
+pane and restarting the app, and so a viewer can page through it without
+holding it in memory. This module does not depend on tkinter.
+
+A session's log is a directory under SESSION_LOG_DIR (default
+~/.cache/unix-scripts/sessions):
+
+    session.json    title, command, times, final state and segment list
+    000000.log.gz   completed segments of SEGMENT_LINES lines, gzipped
+    000001.log      the open segment, appended to as output arrives
+
+When the open segment is full it is compressed, the manifest is replaced
+atomically to list it, and only then is the plain file removed, so a reader
+in another thread or process always finds every line exactly once. Each
+session keeps its newest MAX_SEGMENTS segments and the newest
+MAX_SESSION_LOGS sessions are kept overall.
+"""
+
+import collections
+import gzip
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+SEGMENT_LINES = 10000  # Lines per segment before it is compressed
+MAX_SEGMENTS = 200  # Compressed segments kept per session
+MAX_SESSION_LOGS = 100  # Session logs kept before the oldest are removed
+SEGMENT_CACHE_SIZE = 3  # Decompressed segments a reader keeps in memory
+MANIFEST_NAME = "session.json"
+
+
+def session_log_root():
+    """Return the directory holding the session logs."""
+    root = os.environ.get("SESSION_LOG_DIR")
+    if root:
+        return Path(root)
+    return Path.home() / ".cache" / "unix-scripts" / "sessions"
+
+
+def segment_name(number, compressed):
+    """Return the file name of a segment."""
+    return f"{number:06d}.log" + (".gz" if compressed else "")
+
+
+def read_manifest(path):
+    """
+    Read a session log's manifest.
+
+    Args:
+        path (Path): Session log directory
+
+    Returns:
+        dict: The manifest, or None if it is missing or unreadable
+    """
+    try:
+        with open(path / MANIFEST_NAME, encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+
+def log_state(manifest):
+    """
+    Return a session log's state, "interrupted" if its writer died.
+
+    Args:
+        manifest (dict): The log's manifest
+
+    Returns:
+        str: The session state recorded by the writer, or "interrupted"
+            for a running log whose process no longer exists
+    """
+    state = manifest["state"]
+    if state == "running":
+        try:
+            os.kill(manifest["pid"], 0)
+        except ProcessLookupError:
+            return "interrupted"
+        except (KeyError, OSError):
+            pass
+    return state
+
+
+def list_session_logs(root=None):
+    """
+    List the session logs on disk, newest first by directory name.
+
+    Args:
+        root (Path): Directory holding the logs; defaults to
+            session_log_root()
+
+    Returns:
+        list: (path, manifest) pairs
+    """
+    root = Path(root) if root is not None else session_log_root()
+    try:
+        paths = sorted((path for path in root.iterdir() if path.is_dir()), reverse=True)
+    except OSError:
+        return []
+
+    logs = []
+    for path in paths:
+        manifest = read_manifest(path)
+        if manifest is not None:
+            logs.append((path, manifest))
+    return logs
+
+
+class SessionLogWriter:
+    """
+    Appends one session's output to its log directory.
+
+    Disk errors never reach the session: the first one disables the log and
+    is kept in self.error.
+    """
+
+    def __init__(self, title, cmd, root=None):
+        """
+        Create the session's log directory and prune the oldest logs.
+
+        Args:
+            title (str): Short label for the session
+            cmd (list): Command and arguments of the session
+            root (Path): Directory holding the logs; defaults to
+                session_log_root()
+        """
+        root = Path(root) if root is not None else session_log_root()
+        started_at = time.time()
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", title).strip("_") or "session"
+        self.path = root / (
+            time.strftime("%Y%m%d-%H%M%S", time.localtime(started_at))
+            + f"-{os.getpid()}-{slug}"
+        )
+        self.manifest = {
+            "title": title,
+            "cmd": list(cmd),
+            "started_at": started_at,
+            "finished_at": None,
+            "state": "running",
+            "return_code": None,
+            "pid": os.getpid(),
+            # Lines in segments that were rotated away
+            "dropped_lines": 0,
+            # Compressed segments in order: {"file", "first", "lines"}
+            "segments": [],
+            "open": segment_name(0, False),
+        }
+        self.next_segment = 1
+        self.open_lines = 0
+        self.open_file = None
+        self.error = None
+
+        try:
+            suffix = 1
+            base = self.path
+            while self.path.exists():
+                suffix += 1
+                self.path = base.with_name(f"{base.name}-{suffix}")
+            self.path.mkdir(parents=True)
+            self.open_file = open(
+                self.path / self.manifest["open"], "a", encoding="utf-8"
+            )
+            self.write_manifest()
+            self.prune_sessions(root)
+        except OSError as e:
+            self.fail(e)
+
+    @property
+    def first_open_line(self):
+        """Return the number of the open segment's first line."""
+        segments = self.manifest["segments"]
+        if segments:
+            return segments[-1]["first"] + segments[-1]["lines"]
+        return self.manifest["dropped_lines"]
+
+    def fail(self, error):
+        """Disable the log after a disk error."""
+        self.error = str(error)
+        if self.open_file is not None:
+            try:
+                self.open_file.close()
+            except OSError:
+                pass
+            self.open_file = None
+
+    def write(self, text):
+        """
+        Append output text and make it visible to readers.
+
+        A segment that fills up is rotated after the text's last line
+        break, so segments always hold whole lines.
+
+        Args:
+            text (str): Output as received; it may end mid-line
+        """
+        if self.open_file is None or not text:
+            return
+
+        try:
+            line_count = text.count("\n")
+            if line_count and self.open_lines + line_count >= SEGMENT_LINES:
+                cut = text.rfind("\n") + 1
+                self.open_file.write(text[:cut])
+                self.open_lines += line_count
+                self.rotate()
+                text = text[cut:]
+            self.open_file.write(text)
+            self.open_file.flush()
+            self.open_lines += text.count("\n")
+        except OSError as e:
+            self.fail(e)
+
+    def rotate(self):
+        """Compress the open segment and start the next one."""
+        self.open_file.close()
+        self.open_file = None
+
+        open_path = self.path / self.manifest["open"]
+        number = self.next_segment - 1
+        compressed = self.path / segment_name(number, True)
+        with open(open_path, "rb") as source:
+            with gzip.open(str(compressed) + ".tmp", "wb") as target:
+                shutil.copyfileobj(source, target)
+        os.replace(str(compressed) + ".tmp", compressed)
+
+        segments = self.manifest["segments"]
+        segments.append(
+            {
+                "file": compressed.name,
+                "first": self.first_open_line,
+                "lines": self.open_lines,
+            }
+        )
+        removed = []
+        while len(segments) > MAX_SEGMENTS:
+            oldest = segments.pop(0)
+            self.manifest["dropped_lines"] = oldest["first"] + oldest["lines"]
+            removed.append(oldest["file"])
+
+        self.manifest["open"] = segment_name(self.next_segment, False)
+        self.next_segment += 1
+        self.open_lines = 0
+        self.open_file = open(self.path / self.manifest["open"], "a", encoding="utf-8")
+        self.write_manifest()
+
+        # Readers switch to the new manifest before these disappear
+        for name in [open_path.name] + removed:
+            try:
+                os.remove(self.path / name)
+            except OSError:
+                pass
+
+    def write_manifest(self):
+        """Replace the manifest atomically."""
+        tmp_path = self.path / (MANIFEST_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(self.manifest, manifest_file)
+        os.replace(tmp_path, self.path / MANIFEST_NAME)
+
+    def close(self, state, return_code=None):
+        """
+        Record how the session ended and close the open segment.
+
+        Args:
+            state (str): Final session state
+            return_code (int): Exit code of the script, if it ran
+        """
+        if self.open_file is None:
+            return
+
+        self.manifest.update(
+            finished_at=time.time(), state=state, return_code=return_code
+        )
+        try:
+            self.open_file.close()
+            self.open_file = None
+            self.write_manifest()
+        except OSError as e:
+            self.fail(e)
+
+    def prune_sessions(self, root):
+        """Remove the oldest session logs beyond MAX_SESSION_LOGS."""
+        logs = sorted(
+            list_session_logs(root),
+            key=lambda log: log[1].get("started_at") or 0,
+            reverse=True,
+        )
+        for path, _ in logs[MAX_SESSION_LOGS:]:
+            if path != self.path:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+class SessionLogReader:
+    """
+    Random access to the lines of a session log, live or finished.
+
+    Completed segments are decompressed on demand and the most recent few
+    kept; the open segment is indexed by the byte offset of each line and
+    extended by refresh(). Memory therefore stays bounded however long the
+    session ran.
+    """
+
+    def __init__(self, path):
+        """
+        Open a session log.
+
+        Args:
+            path (Path): Session log directory
+        """
+        self.path = Path(path)
+        self.manifest = None
+        self.segment_cache = collections.OrderedDict()
+        self.open_name = None
+        self.open_offsets = []
+        self.open_scanned = 0
+        self.open_first = 0
+        self.tail = ""
+        self.refresh()
+
+    @property
+    def first_line(self):
+        """Return the number of the oldest line still on disk."""
+        return self.manifest["dropped_lines"] if self.manifest else 0
+
+    @property
+    def line_count(self):
+        """Return the number of complete lines logged so far."""
+        return self.open_first + len(self.open_offsets)
+
+    @property
+    def is_live(self):
+        """Return True while the session is still writing to the log."""
+        return self.manifest is not None and log_state(self.manifest) == "running"
+
+    def refresh(self):
+        """
+        Pick up lines written since the last refresh.
+
+        Returns:
+            bool: True if the log grew or its state changed
+        """
+        old = (self.line_count, self.tail, self.manifest and self.manifest["state"])
+        manifest = read_manifest(self.path)
+        if manifest is None:
+            return False
+        self.manifest = manifest
+
+        segments = manifest["segments"]
+        if manifest["open"] != self.open_name:
+            self.open_name = manifest["open"]
+            self.open_offsets = []
+            self.open_scanned = 0
+            self.tail = ""
+            if segments:
+                self.open_first = segments[-1]["first"] + segments[-1]["lines"]
+            else:
+                self.open_first = manifest["dropped_lines"]
+
+        try:
+            with open(self.path / self.open_name, "rb") as open_file:
+                open_file.seek(self.open_scanned)
+                data = open_file.read()
+        except FileNotFoundError:
+            # Rotated after the manifest was read; the next refresh sees it
+            data = b""
+
+        end = data.rfind(b"\n") + 1
+        position = 0
+        while position < end:
+            self.open_offsets.append(self.open_scanned + position)
+            position = data.index(b"\n", position) + 1
+        self.open_scanned += end
+        self.tail = data[end:].decode("utf-8", errors="replace")
+
+        return (self.line_count, self.tail, manifest["state"]) != old
+
+    def segment_lines(self, segment):
+        """Return the decoded lines of a compressed segment."""
+        name = segment["file"]
+        if name in self.segment_cache:
+            self.segment_cache.move_to_end(name)
+            return self.segment_cache[name]
+
+        with gzip.open(self.path / name, "rb") as segment_file:
+            lines = segment_file.read().decode("utf-8", errors="replace").split("\n")
+        lines.pop()
+        self.segment_cache[name] = lines
+        while len(self.segment_cache) > SEGMENT_CACHE_SIZE:
+            self.segment_cache.popitem(last=False)
+        return lines
+
+    def lines(self, start, stop):
+        """
+        Return the complete lines numbered start to stop - 1.
+
+        Lines that were rotated away or not written yet are left out.
+
+        Args:
+            start (int): First line number
+            stop (int): Line number after the last one
+
+        Returns:
+            list: Line texts without their newlines
+        """
+        start = max(start, self.first_line)
+        stop = min(stop, self.line_count)
+        result = []
+        for segment in self.manifest["segments"] if self.manifest else []:
+            segment_stop = segment["first"] + segment["lines"]
+            if start >= segment_stop or stop <= segment["first"]:
+                continue
+            try:
+                lines = self.segment_lines(segment)
+            except OSError:
+                # Rotated away since the last refresh
+                continue
+            result.extend(
+                lines[
+                    max(start, segment["first"])
+                    - segment["first"] : min(stop, segment_stop)
+                    - segment["first"]
+                ]
+            )
+
+        if stop > self.open_first:
+            first = max(start, self.open_first) - self.open_first
+            last = stop - self.open_first
+            try:
+                with open(self.path / self.open_name, "rb") as open_file:
+                    open_file.seek(self.open_offsets[first])
+                    end = (
+                        self.open_offsets[last]
+                        if last < len(self.open_offsets)
+                        else self.open_scanned
+                    )
+                    data = open_file.read(end - self.open_offsets[first])
+                result.extend(data.decode("utf-8", errors="replace").split("\n")[:-1])
+            except (OSError, IndexError):
+                pass
+        return result
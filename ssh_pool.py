@@ -0,0 +1,361 @@
+"""
+SSH ControlMaster Pool
+
+Keeps one health-checked SSH control master per cluster so every script and
+GUI action can reuse an authenticated connection. The masters live at the
+same /tmp/ssh_$CLUSTER control paths the shell scripts use, so scripts that
+source start_ssh_control.sh find them already running.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+CLUSTER_HOSTNAMES = {
+    "bluehive": "bluehive.circ.rochester.edu",
+    "bluehive3": "bluehive3.circ.rochester.edu",
+    "bhward": "bhward.circ.rochester.edu",
+}
+
+HEALTH_CHECK_INTERVAL = 1.0  # Seconds between master health checks
+CHECK_TIMEOUT = 0.8  # Seconds allowed for `ssh -O check`
+CONNECT_TIMEOUT = 15  # Seconds allowed for the initial handshake
+RECONNECT_DELAY = 5.0  # Seconds between background reconnect attempts
+SSHPASS_WRONG_PASSWORD = 5  # sshpass exit code for a rejected password
+
+MASTER_OPTIONS = [
+    "-o",
+    "ControlMaster=yes",
+    "-o",
+    "ControlPersist=yes",
+    "-o",
+    "ServerAliveInterval=15",
+    "-o",
+    "ServerAliveCountMax=3",
+    "-o",
+    "StrictHostKeyChecking=no",
+]
+
+
+def control_path(cluster):
+    """Return the control socket path shared with the shell scripts."""
+    return f"/tmp/ssh_{cluster}"
+
+
+def cluster_hostname(cluster):
+    """Return the login hostname for a supported cluster."""
+    try:
+        return CLUSTER_HOSTNAMES[cluster]
+    except KeyError:
+        supported = ", ".join(CLUSTER_HOSTNAMES)
+        raise ValueError(
+            f"Unknown cluster '{cluster}'. Supported clusters: {supported}"
+        ) from None
+
+
+def sshpass_binary():
+    """Return the bundled sshpass binary for this platform."""
+    if sys.platform == "darwin":
+        return str(SCRIPT_DIR / "sshpass_mac_arm64")
+    return str(SCRIPT_DIR / "sshpass_linux_amd64")
+
+
+class ControlMaster:
+    """
+    Connection state for a single cluster's control master.
+
+    state is one of "disconnected", "connecting", "healthy" or "failed".
+    """
+
+    def __init__(self, cluster, user, password):
+        """
+        Initialize the master record.
+
+        Args:
+            cluster (str): Cluster name
+            user (str): Login user name
+            password (str): Password used for (re)authentication
+        """
+        self.cluster = cluster
+        self.user = user
+        self.password = password
+        self.hostname = cluster_hostname(cluster)
+        self.control_path = control_path(cluster)
+        self.state = "disconnected"
+        self.last_error = ""
+        self.last_attempt = 0.0
+        self.password_rejected = False
+        self.lock = threading.Lock()
+
+    @property
+    def target(self):
+        """Return the user@host SSH target."""
+        return f"{self.user}@{self.hostname}"
+
+
+class ControlMasterPool:
+    """
+    Pool of persistent SSH control masters, one per cluster.
+
+    A background thread checks every registered master once per
+    HEALTH_CHECK_INTERVAL with `ssh -O check`, which only talks to the local
+    control socket and answers in milliseconds. Dead masters and stale
+    sockets are cleaned up and reconnected in the background.
+    """
+
+    def __init__(self, check_interval=HEALTH_CHECK_INTERVAL):
+        """
+        Initialize an empty pool.
+
+        Args:
+            check_interval (float): Seconds between health checks
+        """
+        self.check_interval = check_interval
+        self.masters = {}
+        self.masters_lock = threading.Lock()
+        # Cluster -> (user, password) whose login was rejected; they are
+        # not sent again until the credentials change or a caller retries
+        # explicitly, so polling cannot lock the account
+        self.rejected = {}
+        self.monitor_thread = None
+        self.stop_event = threading.Event()
+
+    def connect(
+        self, cluster, user, password, timeout=CONNECT_TIMEOUT, retry_rejected=False
+    ):
+        """
+        Ensure a healthy master for a cluster, reusing a live one.
+
+        Credentials the cluster rejected before are not sent again: the
+        call only succeeds if a live master answers, unless retry_rejected
+        is set.
+
+        Args:
+            cluster (str): Cluster name
+            user (str): Login user name
+            password (str): Password for authentication
+            timeout (float): Seconds allowed for the handshake
+            retry_rejected (bool): Log in even with rejected credentials,
+                for an explicit reconnect by the user
+
+        Raises:
+            RuntimeError: If the master could not be established
+        """
+        with self.masters_lock:
+            master = self.masters.get(cluster)
+            if master is None or master.user != user:
+                master = ControlMaster(cluster, user, password)
+                self.masters[cluster] = master
+            else:
+                master.password = password
+                master.password_rejected = False
+
+        if self.rejected.get(cluster) == (user, password) and not retry_rejected:
+            if self._check_master(master):
+                # Someone logged in since, e.g. from a terminal
+                self.start_monitor()
+                return
+            with self.masters_lock:
+                if self.masters.get(cluster) is master:
+                    del self.masters[cluster]
+            raise RuntimeError(
+                f"Password rejected by {master.hostname}; log in again to retry"
+            )
+
+        if not self._ensure_master(master, timeout):
+            if master.password_rejected:
+                self.rejected[cluster] = (user, password)
+            # Never retry a failed login in the background
+            with self.masters_lock:
+                if self.masters.get(cluster) is master:
+                    del self.masters[cluster]
+            raise RuntimeError(master.last_error or "Connection failed")
+
+        self.rejected.pop(cluster, None)
+
+        self.start_monitor()
+
+    def check(self, cluster):
+        """
+        Check whether a cluster's master is alive.
+
+        Args:
+            cluster (str): Cluster name
+
+        Returns:
+            bool: True if the control socket answers
+        """
+        master = self.masters.get(cluster)
+        if master is None:
+            return False
+        return self._check_master(master)
+
+    def state(self, cluster):
+        """Return the last known state of a cluster's master."""
+        master = self.masters.get(cluster)
+        return master.state if master else "disconnected"
+
+    def is_healthy(self, cluster):
+        """Return True if the cluster's master passed its last check."""
+        return self.state(cluster) == "healthy"
+
+    def close(self, cluster):
+        """Stop tracking a cluster and shut down its master."""
+        with self.masters_lock:
+            master = self.masters.pop(cluster, None)
+        if master is None:
+            return
+
+        try:
+            subprocess.run(
+                [
+                    "ssh",
+                    "-o",
+                    f"ControlPath={master.control_path}",
+                    "-O",
+                    "exit",
+                    master.target,
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=CHECK_TIMEOUT,
+            )
+        except subprocess.TimeoutExpired:
+            pass
+
+    def start_monitor(self):
+        """Start the background health-check thread if needed."""
+        if self.monitor_thread is not None and self.monitor_thread.is_alive():
+            return
+
+        self.stop_event.clear()
+        self.monitor_thread = threading.Thread(target=self._monitor)
+        self.monitor_thread.daemon = True
+        self.monitor_thread.start()
+
+    def stop_monitor(self):
+        """Stop the background health-check thread; masters keep running."""
+        self.stop_event.set()
+
+    def _monitor(self):
+        """Health-check every master and reconnect dead ones."""
+        while not self.stop_event.wait(self.check_interval):
+            with self.masters_lock:
+                masters = list(self.masters.values())
+
+            for master in masters:
+                if master.lock.locked() or master.password_rejected:
+                    # A connect is in progress, or retrying would only
+                    # repeat a rejected login
+                    continue
+                if self._check_master(master):
+                    continue
+                if time.monotonic() - master.last_attempt < RECONNECT_DELAY:
+                    continue
+
+                thread = threading.Thread(
+                    target=self._ensure_master, args=(master, CONNECT_TIMEOUT)
+                )
+                thread.daemon = True
+                thread.start()
+
+    def _check_master(self, master):
+        """Run `ssh -O check` against a master's control socket."""
+        try:
+            result = subprocess.run(
+                [
+                    "ssh",
+                    "-o",
+                    f"ControlPath={master.control_path}",
+                    "-O",
+                    "check",
+                    master.target,
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=CHECK_TIMEOUT,
+            )
+            alive = result.returncode == 0
+        except subprocess.TimeoutExpired:
+            alive = False
+
+        if alive:
+            master.state = "healthy"
+        elif master.state == "healthy":
+            master.state = "disconnected"
+            master.last_error = "Control master stopped responding"
+        return alive
+
+    def _ensure_master(self, master, timeout):
+        """Reuse a live master or start a new one; returns True on success."""
+        with master.lock:
+            if self._check_master(master):
+                return True
+
+            master.state = "connecting"
+            master.last_attempt = time.monotonic()
+
+            # A socket left behind by a dead master blocks ControlMaster=yes
+            try:
+                os.remove(master.control_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                master.state = "failed"
+                master.last_error = f"Cannot remove stale socket: {e}"
+                return False
+
+            cmd = [
+                sshpass_binary(),
+                "-e",
+                "ssh",
+                *MASTER_OPTIONS,
+                "-o",
+                f"ControlPath={master.control_path}",
+                "-fN",
+                master.target,
+            ]
+            env = dict(os.environ, SSHPASS=master.password)
+
+            # The backgrounded master inherits stdio, so stderr goes to a file
+            # rather than a pipe that would never reach EOF
+            with tempfile.TemporaryFile() as stderr_file:
+                try:
+                    result = subprocess.run(
+                        cmd,
+                        stdin=subprocess.DEVNULL,
+                        stdout=subprocess.DEVNULL,
+                        stderr=stderr_file,
+                        env=env,
+                        timeout=timeout,
+                    )
+                    return_code = result.returncode
+                except subprocess.TimeoutExpired:
+                    return_code = None
+                except OSError as e:
+                    master.state = "failed"
+                    master.last_error = str(e)
+                    return False
+
+                stderr_file.seek(0)
+                error_output = stderr_file.read().decode(errors="replace").strip()
+
+            if return_code == 0 and self._check_master(master):
+                master.last_error = ""
+                return True
+
+            master.state = "failed"
+            if return_code == SSHPASS_WRONG_PASSWORD:
+                master.password_rejected = True
+                master.last_error = f"Password rejected by {master.hostname}"
+            elif return_code is None:
+                master.last_error = f"Connection timed out after {timeout} seconds"
+            else:
+                master.last_error = error_output or "Connection failed"
+            return False
@@ -42,11 +42,29 @@ else
     echo "Error: Unknown cluster '$CLUSTER'. Supported clusters: bluehive3, bluehive, bhward"
     exit 1
 fi
-# Detect OS and use appropriate sshpass binary
-if [[ "$OSTYPE" == "darwin"* ]]; then
-    # macOS - Use SSH control master configuration
-    $current_path/sshpass_mac_arm64 -p "$PASSWORD" ssh -o ControlMaster=auto -o StrictHostKeyChecking=no -fN $USER@$HOSTNAME
+
+CONTROL_PATH="/tmp/ssh_$CLUSTER"
+
+# Reuse a live control master (for example the one kept by the GUI pool)
+if ssh -o ControlPath="$CONTROL_PATH" -O check "$USER@$HOSTNAME" 2>/dev/null; then
+    echo "Reusing SSH control master for $CLUSTER."
 else
-    # Linux
-    $current_path/sshpass_linux_amd64 -p "$PASSWORD" ssh -o ControlMaster=auto -o StrictHostKeyChecking=no -fN $USER@$HOSTNAME
+    # A socket left behind by a dead master would block a new one
+    rm -f "$CONTROL_PATH"
+
+    # Detect OS and use appropriate sshpass binary
+    if [[ "$OSTYPE" == "darwin"* ]]; then
+        SSHPASS_BIN="$current_path/sshpass_mac_arm64"
+    else
+        SSHPASS_BIN="$current_path/sshpass_linux_amd64"
+    fi
+
+    SSHPASS="$PASSWORD" "$SSHPASS_BIN" -e ssh \
+        -o ControlMaster=yes \
+        -o ControlPath="$CONTROL_PATH" \
+        -o ControlPersist=yes \
+        -o ServerAliveInterval=15 \
+        -o ServerAliveCountMax=3 \
+        -o StrictHostKeyChecking=no \
+        -fN "$USER@$HOSTNAME"
 fi
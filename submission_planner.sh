@@ -0,0 +1,243 @@
+#!/bin/bash
+
+# Placement planner for tunnel.sh and remote_sshd.sh.
+#
+# Before a submission, each candidate cluster is asked in one SSH round trip,
+# per candidate partition, for:
+#   - nodes whose idle CPUs, GPUs and memory fit the request right now
+#     (sinfo), which start the job immediately
+#   - Slurm's own start estimate for the request (sbatch --test-only)
+#   - how many jobs are pending in the partition (squeue)
+# The placement with the earliest expected start wins; ties keep the order
+# the candidates were given in, so the requested cluster and partition are
+# preferred. Every candidate is printed with the reason for its estimate.
+#
+# plan_submission reads CPUS, GPUS, MEMORY (GB) and TIME (hours) and sets
+# PLAN_CLUSTER, PLAN_PARTITION and PLAN_NODE (empty when Slurm should pick
+# the node). It returns 1 and leaves them empty when no candidate answered.
+
+planner_dir="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$planner_dir/cluster_helpers.sh"
+
+PLAN_PARTITIONS_DEFAULT="doppelbock,dmi"
+
+# Runs on the login node; prints NOW, FREE, TEST, QUEUE and ERROR lines
+read -r -d '' PLAN_QUERY <<'ENDSSH' || true
+partitions="$1"
+cpus="$2"
+gpus="$3"
+memory_gb="$4"
+hours="$5"
+
+echo "NOW|$(date +%s)"
+
+IFS=',' read -r -a partition_list <<< "$partitions"
+for partition in "${partition_list[@]}"; do
+    # Nodes with enough idle capacity start the job now
+    sinfo -h -N -p "$partition" -O 'NodeList:60,StateCompact:14,CPUsState:30,Memory:20,AllocMem:20,Gres:80,GresUsed:100' 2>/dev/null |
+        awk -v partition="$partition" -v cpus="$cpus" -v gpus="$gpus" -v memory_mb="$((memory_gb * 1024))" '
+            function gpu_count(field,    n, i, total, parts, entry) {
+                total = 0
+                n = split(field, parts, ",")
+                for (i = 1; i <= n; i++) {
+                    entry = parts[i]
+                    if (entry !~ /^gpu/) continue
+                    sub(/\(.*/, "", entry)
+                    sub(/.*:/, "", entry)
+                    total += entry + 0
+                }
+                return total
+            }
+            $2 ~ /^(idle|mix)$/ {
+                split($3, cpu_state, "/")
+                free_cpus = cpu_state[2]
+                free_memory = $4 - $5
+                free_gpus = gpu_count($6) - gpu_count($7)
+                if (free_cpus >= cpus && free_memory >= memory_mb && free_gpus >= gpus) {
+                    printf "FREE|%s|%s|%d|%d|%d\n", partition, $1, free_cpus, free_gpus, free_memory / 1024
+                }
+            }'
+
+    # Slurm's own estimate for a job with these resources
+    test_output="$(sbatch --test-only -p "$partition" -N 1 -c "$cpus" --mem="${memory_gb}G" --gres="gpu:$gpus" -t "$hours:00:00" --wrap=true 2>&1)"
+    start="$(printf "%s\n" "$test_output" | sed -n 's/.* to start at \([^ ]*\).*/\1/p' | head -n 1)"
+    nodes="$(printf "%s\n" "$test_output" | sed -n 's/.* on nodes \([^ ]*\).*/\1/p' | head -n 1)"
+    if [ -n "$start" ]; then
+        echo "TEST|$partition|$nodes|$(date -d "$start" +%s)"
+    else
+        echo "ERROR|$partition|$(printf "%s\n" "$test_output" | head -n 1)"
+    fi
+
+    # Pending jobs ahead of it in the partition
+    echo "QUEUE|$partition|$(squeue -h -p "$partition" -t PENDING -o %i 2>/dev/null | wc -l | tr -d ' ')"
+done
+ENDSSH
+
+# Print a comma-separated list without empty or repeated entries
+plan_unique_list() {
+    printf "%s\n" "$1" | tr ',' '\n' | awk 'NF && !seen[$0]++' | paste -sd, -
+}
+
+# Describe a delay in seconds, e.g. "now", "~5m", "~2h10m"
+plan_format_delay() {
+    local delay="$1"
+    if [ "$delay" -le 60 ]; then
+        printf "now"
+    elif [ "$delay" -lt 3600 ]; then
+        printf "~%dm" $(((delay + 59) / 60))
+    else
+        printf "~%dh%02dm" $((delay / 3600)) $((delay % 3600 / 60))
+    fi
+}
+
+# Query one cluster and print "delay|cluster|partition|node|reason" lines;
+# candidates that could not be estimated have the delay ERROR
+plan_query_cluster() {
+    local cluster="$1"
+    local partitions="$2"
+    local hostname
+    local output
+
+    hostname="$(cluster_hostname "$cluster")" || return 1
+    if ! output="$(ssh -o ControlMaster=no -o ControlPath="/tmp/ssh_$cluster" -o BatchMode=yes -T "$USER@$hostname" \
+        bash -s -- "$(printf "%q" "$partitions")" "$CPUS" "$GPUS" "$MEMORY" "$TIME" <<< "$PLAN_QUERY" 2>&1)"; then
+        printf "ERROR|%s|-||%s\n" "$cluster" "$(printf "%s\n" "$output" | head -n 1)"
+        return 1
+    fi
+
+    printf "%s\n" "$output" | awk -F'|' -v cluster="$cluster" '
+        $1 == "NOW" { now = $2 }
+        $1 == "QUEUE" { pending[$2] = $3 }
+        $1 == "FREE" {
+            # Best fit: the node with the fewest idle GPUs, then CPUs, then
+            # memory that still holds the job, keeping larger nodes free
+            fits[$2]++
+            if (!($2 in best_node) || $5 < best_gpus[$2] ||
+                ($5 == best_gpus[$2] && ($4 < best_cpus[$2] ||
+                ($4 == best_cpus[$2] && $6 < best_memory[$2])))) {
+                best_node[$2] = $3
+                best_cpus[$2] = $4
+                best_gpus[$2] = $5
+                best_memory[$2] = $6
+            }
+        }
+        $1 == "TEST" { test_nodes[$2] = $3; test_start[$2] = $4 }
+        $1 == "ERROR" { error[$2] = $3 }
+        END {
+            for (partition in best_node) {
+                printf "0|%s|%s|%s|idle now: %d CPUs, %d GPUs, %d GB free (%d fitting nodes)\n", cluster, partition, best_node[partition], best_cpus[partition], best_gpus[partition], best_memory[partition], fits[partition]
+            }
+            for (partition in test_start) {
+                if (partition in best_node) continue
+                delay = test_start[partition] - now
+                if (delay < 0) delay = 0
+                printf "%d|%s|%s||sbatch --test-only: %s; %d jobs pending\n", delay, cluster, partition, test_nodes[partition], pending[partition]
+            }
+            for (partition in error) {
+                if (partition in best_node) continue
+                printf "ERROR|%s|%s||%s\n", cluster, partition, error[partition]
+            }
+        }'
+}
+
+# Ensure a control master for every candidate cluster except the current one
+plan_connect_clusters() {
+    local cluster
+    local saved_root="$REMOTE_SHARED_ROOT"
+
+    for cluster in ${1//,/ }; do
+        [ "$cluster" = "$CLUSTER" ] && continue
+        require_cluster "$cluster" || continue
+        (source "$planner_dir/start_ssh_control.sh" -a "$cluster" > /dev/null)
+    done
+    REMOTE_SHARED_ROOT="$saved_root"
+}
+
+# plan_submission CLUSTERS PARTITIONS
+plan_submission() {
+    local clusters
+    local partitions
+    local results_dir
+    local cluster
+    local order=0
+    local ranked
+    local errors
+    local best
+    local delay
+    local reason
+    local file
+    local pids=()
+
+    clusters="$(plan_unique_list "$1")"
+    partitions="$(plan_unique_list "$2")"
+    PLAN_CLUSTER=""
+    PLAN_PARTITION=""
+    PLAN_NODE=""
+
+    plan_connect_clusters "$clusters"
+
+    results_dir="$(mktemp -d "${TMPDIR:-/tmp}/plan.XXXXXX")"
+    for cluster in ${clusters//,/ }; do
+        order=$((order + 1))
+        plan_query_cluster "$cluster" "$partitions" > "$results_dir/$order" &
+        pids+=($!)
+    done
+    wait "${pids[@]}"
+
+    # Rank by delay, then by the order clusters and partitions were given in
+    ranked="$(
+        for file in $(ls "$results_dir" | sort -n); do
+            awk -F'|' -v cluster_order="$file" -v partitions=",$partitions," '
+                $1 != "ERROR" {
+                    printf "%s|%d|%d|%s\n", $1, cluster_order, index(partitions, "," $3 ","), $0
+                }' "$results_dir/$file"
+        done | sort -t'|' -k1,1n -k2,2n -k3,3n
+    )"
+    errors="$(cat "$results_dir"/* | awk -F'|' '$1 == "ERROR"')"
+    rm -rf "$results_dir"
+
+    echo "Placement plan for $CPUS CPUs, $GPUS GPUs, $MEMORY GB, $TIME h:"
+    while IFS='|' read -r delay _ _ _ cluster partition node reason; do
+        [ -n "$cluster" ] || continue
+        printf "  %-10s %-12s %-10s %-9s %s\n" "$cluster" "$partition" "${node:--}" "$(plan_format_delay "$delay")" "$reason"
+    done <<< "$ranked"
+    while IFS='|' read -r _ cluster partition _ reason; do
+        [ -n "$cluster" ] || continue
+        printf "  %-10s %-12s %-10s %-9s %s\n" "$cluster" "$partition" "-" "unknown" "$reason"
+    done <<< "$errors"
+
+    best="$(printf "%s\n" "$ranked" | head -n 1)"
+    if [ -z "$best" ]; then
+        echo "No candidate placement could be estimated."
+        return 1
+    fi
+
+    IFS='|' read -r delay _ _ _ PLAN_CLUSTER PLAN_PARTITION PLAN_NODE reason <<< "$best"
+    echo "Chosen: $PLAN_CLUSTER/$PLAN_PARTITION${PLAN_NODE:+ on $PLAN_NODE}, expected start $(plan_format_delay "$delay")"
+}
+
+# Move the rest of a script to another cluster's control master
+plan_switch_cluster() {
+    local saved_root="$REMOTE_SHARED_ROOT"
+
+    source "$planner_dir/start_ssh_control.sh" -a "$1" || return 1
+    REMOTE_SHARED_ROOT="$saved_root"
+    export REMOTE_SHARED_ROOT
+}
+
+# Plan a script's placement and adopt it: CLUSTER (and its control master),
+# PARTITION and NODE. Candidates come from PLAN_CLUSTERS and PLAN_PARTITIONS,
+# defaulting to the current cluster and the requested partition followed by
+# PLAN_PARTITIONS_DEFAULT. Without an estimate the request is kept.
+plan_and_apply() {
+    if ! plan_submission "${PLAN_CLUSTERS:-$CLUSTER}" "${PLAN_PARTITIONS:-$PARTITION,$PLAN_PARTITIONS_DEFAULT}"; then
+        echo "Keeping $CLUSTER/$PARTITION."
+        return 0
+    fi
+
+    if [ "$PLAN_CLUSTER" != "$CLUSTER" ]; then
+        plan_switch_cluster "$PLAN_CLUSTER" || return 1
+    fi
+    PARTITION="$PLAN_PARTITION"
+    NODE="$PLAN_NODE"
+}
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import queue
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from orchestrator import Engine, SessionFinished  # noqa: E402
+from script_runner import SessionManager  # noqa: E402
+
+
+class StopBeforeRunTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        env = mock.patch.dict(os.environ, {"SESSION_LOG_DIR": self.tmp_dir.name})
+        env.start()
+        self.addCleanup(env.stop)
+        self.engine = Engine()
+        self.engine.start()
+
+    def tearDown(self):
+        self.engine.stop()
+        self.tmp_dir.cleanup()
+
+    def finished_events(self):
+        events = []
+        while True:
+            try:
+                event = self.engine.events.get_nowait()
+            except queue.Empty:
+                return events
+            if isinstance(event, SessionFinished):
+                events.append(event)
+
+    def test_stop_before_run_reports_stopped(self):
+        manager = SessionManager(self.engine)
+        marker = os.path.join(self.tmp_dir.name, "ran")
+        release = threading.Event()
+
+        # Hold the loop so the session's coroutine cannot start before the stop
+        self.engine.call_soon(release.wait)
+        session = manager.start(
+            "never runs", [sys.executable, "-c", f"open({marker!r}, 'w')"]
+        )
+        self.assertTrue(session.stop())
+        self.assertFalse(session.is_running)
+        self.assertEqual(session.state, "stopped")
+
+        release.set()
+        # Let the loop process the cancelled submission
+        self.engine.submit(asyncio.sleep(0.2)).result(timeout=5)
+
+        events = self.finished_events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].session_id, session.session_id)
+        self.assertEqual(events[0].state, "stopped")
+        self.assertFalse(os.path.exists(marker))
+        self.assertFalse(session.stop())
+
+        manager.remove(session.session_id)
+        self.assertIsNone(manager.get(session.session_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
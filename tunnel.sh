@@ -1,6 +1,8 @@
 #!/bin/bash
 current_path="$(dirname "$0")"
 source "$current_path/cluster_helpers.sh"
+source "$current_path/phase_timing.sh"
+source "$current_path/submission_planner.sh"
 
 # Set default value.
 CLUSTER=bluehive3
@@ -12,9 +14,12 @@ TIME=12
 NO_LOG=false
 TUNNEL_TOOL=code
 ROOT_OVERRIDE=""
+PLAN=false
+PLAN_PARTITIONS=""
+PLAN_CLUSTERS=""
 
 usage() {
-    echo "Usage: $0 [-a CLUSTER] [-p PARTITION] [-c CPUS] [-g GPUS] [-m MEMORY_GB] [-t HOURS] [-w NODE] [-n] [--tool code|cursor] [--root PATH]"
+    echo "Usage: $0 [-a CLUSTER] [-p PARTITION] [-c CPUS] [-g GPUS] [-m MEMORY_GB] [-t HOURS] [-w NODE] [-n] [--tool code|cursor] [--root PATH] [--plan] [--plan-partitions LIST] [--plan-clusters LIST]"
     echo "Supported clusters: $(cluster_supported_list)"
 }
 
@@ -117,6 +122,28 @@ while [[ $# -gt 0 ]]; do
             ROOT_OVERRIDE="${1#*=}"
             shift
             ;;
+        --plan)
+            PLAN=true
+            shift
+            ;;
+        --plan-partitions)
+            if [[ -z "$2" || "$2" == -* ]]; then
+                echo "Error: $1 requires a comma-separated partition list" >&2
+                exit 1
+            fi
+            PLAN=true
+            PLAN_PARTITIONS="$2"
+            shift 2
+            ;;
+        --plan-clusters)
+            if [[ -z "$2" || "$2" == -* ]]; then
+                echo "Error: $1 requires a comma-separated cluster list" >&2
+                exit 1
+            fi
+            PLAN=true
+            PLAN_CLUSTERS="$2"
+            shift 2
+            ;;
         -h|--help)
             usage
             exit 0
@@ -160,7 +187,7 @@ HOSTNAME="$(cluster_hostname "$CLUSTER")" || exit 1
 
 echo "HOSTNAME: $HOSTNAME"
 
-source "$current_path/start_ssh_control.sh" -a "$CLUSTER"
+phase_run ssh_control source "$current_path/start_ssh_control.sh" -a "$CLUSTER"
 
 if [ -n "$ROOT_OVERRIDE" ]; then
     REMOTE_SHARED_ROOT="$ROOT_OVERRIDE"
@@ -171,44 +198,111 @@ echo "REMOTE_SHARED_ROOT: $REMOTE_SHARED_ROOT"
 
 source "$current_path/remote_tools.sh"
 
+TUNNEL_JOB_NAME="${TUNNEL_TOOL}_tunnel"
+
+if [ "$PLAN" = "true" ]; then
+    if remote_state_jobs | awk -F'|' -v name="$TUNNEL_JOB_NAME" '$2 == name {found = 1} END {exit !found}'; then
+        echo "A $TUNNEL_TOOL tunnel job is already running on $CLUSTER; skipping placement planning."
+    else
+        phase_run plan_placement plan_and_apply || exit $?
+    fi
+fi
+
 if [ "$TUNNEL_TOOL" = "code" ]; then
-    ensure_remote_vscode_cli || exit $?
+    phase_run ensure_tool ensure_remote_vscode_cli || exit $?
     TUNNEL_BIN="$REMOTE_SHARED_ROOT/code"
     TUNNEL_ENV="VSCODE_CLI_DISABLE_KEYCHAIN_ENCRYPT=1"
     TUNNEL_NAME="${CLUSTER}V"
 else
-    ensure_remote_cursor_cli || exit $?
+    phase_run ensure_tool ensure_remote_cursor_cli || exit $?
     TUNNEL_BIN="$REMOTE_SHARED_ROOT/cursor"
     TUNNEL_ENV="CURSOR_CLI_DISABLE_KEYCHAIN_ENCRYPT=1"
     TUNNEL_NAME="${CLUSTER}C"
 fi
 
-TUNNEL_JOB_NAME="${TUNNEL_TOOL}_tunnel"
+# The job watcher (or the state snapshot) already knows whether a tunnel job
+# is active; the remote session only runs its own squeue without an answer
+JOBS_KNOWN=0
+TUNNEL_JOB_ID=""
+if JOBS="$(remote_state_jobs)"; then
+    JOBS_KNOWN=1
+    TUNNEL_JOB_ID="$(printf "%s\n" "$JOBS" | awk -F'|' -v name="$TUNNEL_JOB_NAME" '$2 == name {print $1; exit}')"
+fi
+
+# The session below may submit a job; drop the remote state snapshot
+remote_state_invalidate
 
 ssh -o ControlMaster=auto -o ControlPath=/tmp/ssh_$CLUSTER -o StrictHostKeyChecking=no "$USER@$HOSTNAME" \
-    "REMOTE_USER=$(printf "%q" "$USER") CLUSTER=$(printf "%q" "$CLUSTER") PARTITION=$(printf "%q" "$PARTITION") CPUS=$(printf "%q" "$CPUS") GPUS=$(printf "%q" "$GPUS") MEMORY=$(printf "%q" "$MEMORY") TIME=$(printf "%q" "$TIME") NODE=$(printf "%q" "$NODE") NO_LOG=$(printf "%q" "$NO_LOG") TUNNEL_TOOL=$(printf "%q" "$TUNNEL_TOOL") TUNNEL_BIN=$(printf "%q" "$TUNNEL_BIN") TUNNEL_ENV=$(printf "%q" "$TUNNEL_ENV") TUNNEL_NAME=$(printf "%q" "$TUNNEL_NAME") TUNNEL_JOB_NAME=$(printf "%q" "$TUNNEL_JOB_NAME") bash -s" <<'ENDSSH'
+    "REMOTE_USER=$(printf "%q" "$USER") CLUSTER=$(printf "%q" "$CLUSTER") PARTITION=$(printf "%q" "$PARTITION") CPUS=$(printf "%q" "$CPUS") GPUS=$(printf "%q" "$GPUS") MEMORY=$(printf "%q" "$MEMORY") TIME=$(printf "%q" "$TIME") NODE=$(printf "%q" "$NODE") NO_LOG=$(printf "%q" "$NO_LOG") TUNNEL_TOOL=$(printf "%q" "$TUNNEL_TOOL") TUNNEL_BIN=$(printf "%q" "$TUNNEL_BIN") TUNNEL_ENV=$(printf "%q" "$TUNNEL_ENV") TUNNEL_NAME=$(printf "%q" "$TUNNEL_NAME") TUNNEL_JOB_NAME=$(printf "%q" "$TUNNEL_JOB_NAME") JOBS_KNOWN=$JOBS_KNOWN TUNNEL_JOB_ID=$(printf "%q" "$TUNNEL_JOB_ID") PHASE_TIMING=$(phase_remote_flag) bash -s" 2> >(phase_remote_filter) <<'ENDSSH'
 #!/bin/bash
+phase_now() { date +%s.%N; }
+phase_span() {
+    if [ "$PHASE_TIMING" = "1" ]; then
+        printf "PHASE_SPAN\t%s\t%s\t%s\t%s\n" "$1" "$2" "$(phase_now)" "${3:-0}" >&2
+    fi
+}
+
 module load gcc 2>/dev/null || true
-mkdir -p /home/$USER/logs
+mkdir -p ~/logs
+
+tunnel_job_active() {
+    if [ "$JOBS_KNOWN" = "1" ]; then
+        [ -n "$TUNNEL_JOB_ID" ]
+    else
+        squeue -u "$REMOTE_USER" -O name:32 | grep -q "$TUNNEL_JOB_NAME"
+    fi
+}
 
-if squeue -u "$REMOTE_USER" -O name:32 | grep -q "$TUNNEL_JOB_NAME"; then
+check_start="$(phase_now)"
+if tunnel_job_active; then
+    phase_span tunnel_job_check "$check_start"
     echo "$TUNNEL_TOOL tunnel is already running."
     job=$(squeue -u "$REMOTE_USER" -O jobarrayid:18,partition:13,username:12,submittime:22,starttime:22,timeused:13,timelimit:13,numcpus:10,gres:15,minmemory:12,nodelist:10,priorityLong:9,reason:9,name:4)
     echo "$job"
 else
+    phase_span tunnel_job_check "$check_start"
     echo "Starting $TUNNEL_TOOL tunnel..." > ~/logs/tunnel.log
     srun_args=(-N 1 --ntasks-per-node="$CPUS" -p "$PARTITION" --mem="${MEMORY}g" --gres="gpu:$GPUS" -t "$TIME:00:00" --job-name="$TUNNEL_JOB_NAME")
     if [ -n "$NODE" ]; then
         srun_args+=(-w "$NODE")
     fi
+    submit_start="$(phase_now)"
     nohup srun "${srun_args[@]}" env "$TUNNEL_ENV" "$TUNNEL_BIN" tunnel --accept-server-license-terms --verbose --name "$TUNNEL_NAME" > ~/logs/tunnel.log 2>&1 &
+    srun_pid=$!
+
+    # Report the job this run started so stopping the run can cancel it
+    for attempt in $(seq 1 20); do
+        job_id=$(squeue -h -u "$REMOTE_USER" -n "$TUNNEL_JOB_NAME" -o %i | head -n 1)
+        if [ -n "$job_id" ]; then
+            printf "TRACKED_JOB\t%s\t%s\n" "$job_id" "$TUNNEL_JOB_NAME" >&2
+            break
+        fi
+        kill -0 "$srun_pid" 2>/dev/null || break
+        sleep 0.5
+    done
+
+    if [ "$PHASE_TIMING" = "1" ]; then
+        # Report how long the allocation waited in the queue
+        (
+            while kill -0 "$srun_pid" 2>/dev/null; do
+                if squeue -h -u "$REMOTE_USER" -n "$TUNNEL_JOB_NAME" -t RUNNING -o %i | grep -q .; then
+                    phase_span queue_wait "$submit_start"
+                    exit 0
+                fi
+                sleep 2
+            done
+            phase_span queue_wait "$submit_start" 1
+        ) &
+    fi
 fi
 
 if [ "$NO_LOG" = "false" ]; then
     echo "Continuously monitoring tunnel log... Ctrl+C to exit."
-    while true; do
-        cat ~/logs/tunnel.log
-        sleep 5
-    done
+    # tail keeps its read offset and only sends appended bytes. -F reopens
+    # the log when it is replaced and restarts from the top when it is
+    # truncated, which happens whenever a new tunnel job starts. --pid ends
+    # the follow once this SSH session's parent process goes away, so a
+    # stopped run does not leave tail behind on the login node.
+    tail -n +1 -F --pid="$PPID" ~/logs/tunnel.log
 fi
 ENDSSH
@@ -7,78 +7,156 @@ CLUSTER="bluehive3"
 NODE=""
 PARTITION="doppelbock"
 PORT="22"  # 默认SSH端口
+SSH_USER="$USER"
 
 # Parse command line arguments
-while getopts "a:w:p:o:" opt; do
+while getopts "a:w:p:o:u:" opt; do
     case $opt in
         a) CLUSTER="$OPTARG" ;;
         w) NODE="$OPTARG" ;;
         p) PARTITION="$OPTARG" ;;
         o) PORT="$OPTARG" ;;
+        u) SSH_USER="$OPTARG" ;;
         ?) echo "Invalid option: -$OPTARG" >&2; exit 1 ;;
     esac
 done
 
-# SSH config file path
+# The compute host entries live in a generated fragment that ~/.ssh/config
+# pulls in with Include, so the user's own config is never rewritten. Every
+# update regenerates the fragment for all compute hosts in one atomic write,
+# under a lock shared by all concurrent launches.
 SSH_CONFIG="$HOME/.ssh/config"
+SSH_FRAGMENT="$HOME/.ssh/config.d/unix-scripts.conf"
+SSH_FRAGMENT_LOCK="$SSH_FRAGMENT.lock"
+LOCK_TIMEOUT=10  # Seconds to wait for another writer
 
 COMPUTE_HOST="$(cluster_compute_host "$CLUSTER")" || exit 1
 
-if ! awk -v target="$COMPUTE_HOST" '
-    /^Host[[:space:]]/ {
-        n = split($0, parts, /[[:space:]]+/)
-        for (i = 2; i <= n; i++) {
-            if (parts[i] == target) {
-                found = 1
-            }
-        }
-    }
-    END { exit(found ? 0 : 1) }
-' "$SSH_CONFIG"; then
-    echo "Error: Host $COMPUTE_HOST not found in $SSH_CONFIG" >&2
-    exit 1
-fi
+# mkdir is atomic on every filesystem and needs no flock(1), which macOS
+# lacks. A lock whose owner has exited is taken over.
+acquire_fragment_lock() {
+    local deadline=$((SECONDS + LOCK_TIMEOUT))
+    local owner
+
+    mkdir -p "$(dirname "$SSH_FRAGMENT")" || return 1
+    until mkdir "$SSH_FRAGMENT_LOCK" 2>/dev/null; do
+        owner="$(cat "$SSH_FRAGMENT_LOCK/pid" 2>/dev/null)"
+        if [ -n "$owner" ] && ! kill -0 "$owner" 2>/dev/null; then
+            rm -rf "$SSH_FRAGMENT_LOCK"
+            continue
+        fi
+        if [ "$SECONDS" -ge "$deadline" ]; then
+            echo "Error: Timed out waiting for $SSH_FRAGMENT_LOCK" >&2
+            return 1
+        fi
+        sleep 0.1
+    done
+    echo "$$" > "$SSH_FRAGMENT_LOCK/pid"
+    trap release_fragment_lock EXIT
+}
+
+release_fragment_lock() {
+    rm -rf "$SSH_FRAGMENT_LOCK"
+    trap - EXIT
+}
 
-update_host_value() {
-    local host_alias="$1"
-    local key="$2"
-    local value="$3"
+# Print the file a path finally points to; readlink -f is missing on older
+# macOS
+resolve_symlink() {
+    local path="$1"
+    local target
+
+    while [ -L "$path" ]; do
+        target="$(readlink "$path")" || return 1
+        case "$target" in
+            /*) path="$target" ;;
+            *) path="$(dirname "$path")/$target" ;;
+        esac
+    done
+    printf "%s" "$path"
+}
+
+# Prepend the Include once; ssh takes the first value it finds for each
+# option, so the fragment overrides older entries for the same hosts
+ensure_fragment_included() {
+    local config_file
     local tmp_file
-    tmp_file="$(mktemp "${SSH_CONFIG}.XXXXXX")"
-
-    awk -v target="$host_alias" -v key="$key" -v value="$value" '
-        function host_line_matches(    i, n, parts) {
-            n = split($0, parts, /[[:space:]]+/)
-            for (i = 2; i <= n; i++) {
-                if (parts[i] == target) {
-                    return 1
-                }
-            }
-            return 0
-        }
-        function add_key_if_missing() {
-            if (in_block && !updated) {
-                print "\t" key " " value
-                updated = 1
-            }
-        }
-        /^Host[[:space:]]/ {
-            add_key_if_missing()
-            in_block = host_line_matches()
-            updated = 0
-            print
-            next
-        }
-        in_block && $1 == key {
-            print "\t" key " " value
-            updated = 1
-            next
-        }
-        { print }
-        END {
-            add_key_if_missing()
-        }
-    ' "$SSH_CONFIG" > "$tmp_file" && mv "$tmp_file" "$SSH_CONFIG"
+
+    if [ -f "$SSH_CONFIG" ] &&
+        grep -q "^[[:space:]]*Include[[:space:]].*config\.d/unix-scripts\.conf" "$SSH_CONFIG"; then
+        return 0
+    fi
+
+    # A symlinked config (e.g. into a dotfiles repository) stays a symlink:
+    # the file it points to is replaced instead
+    config_file="$(resolve_symlink "$SSH_CONFIG")" || return 1
+    tmp_file="$(mktemp "${config_file}.XXXXXX")" || return 1
+    if [ -f "$config_file" ]; then
+        # Keep the config's permissions
+        cp -p "$config_file" "$tmp_file" || return 1
+    fi
+    {
+        echo "# Compute host entries generated by update_ssh_config.sh"
+        echo "Include ~/.ssh/config.d/unix-scripts.conf"
+        echo
+        if [ -f "$config_file" ]; then
+            cat "$config_file"
+        fi
+    } > "$tmp_file" || return 1
+    mv -f "$tmp_file" "$config_file"
+}
+
+# write_fragment HOST NODE PORT USER
+# Rewrite the fragment with one host's values replaced and the other hosts'
+# entries kept as they are. A host without a known login host to jump
+# through fails the update rather than being dropped.
+write_fragment() {
+    local tmp_file
+    local content
+    local entries
+
+    entries="$(
+        if [ -f "$SSH_FRAGMENT" ]; then
+            awk '
+                $1 == "Host" { host = $2; hosts[++count] = host }
+                $1 == "Hostname" { node[host] = $2 }
+                $1 == "Port" { port[host] = $2 }
+                $1 == "User" { user[host] = $2 }
+                END {
+                    for (i = 1; i <= count; i++) {
+                        printf "%s %s %s %s\n", hosts[i], node[hosts[i]], port[hosts[i]], user[hosts[i]]
+                    }
+                }' "$SSH_FRAGMENT"
+        fi
+    )"
+    # Replace the host's entry in place, or add it at the end
+    entries="$(printf "%s\n" "$entries" | awk -v host="$1" -v line="$1 $2 $3 $4" '
+        NF && $1 == host { print line; replaced = 1; next }
+        NF { print }
+        END { if (!replaced) print line }')"
+
+    content="$(
+        echo "# Generated by update_ssh_config.sh; changes here are overwritten."
+        while read -r host node port user; do
+            proxy="$(cluster_for_compute_host "$host")" || exit 1
+            echo
+            echo "Host $host"
+            echo "    Hostname $node"
+            echo "    Port $port"
+            if [ -n "$user" ]; then
+                echo "    User $user"
+            fi
+            echo "    ProxyJump $proxy"
+        done <<< "$entries"
+    )" || return 1
+
+    tmp_file="$(mktemp "${SSH_FRAGMENT}.XXXXXX")" || return 1
+    if ! printf "%s\n" "$content" > "$tmp_file"; then
+        rm -f "$tmp_file"
+        return 1
+    fi
+    chmod 600 "$tmp_file"
+    mv -f "$tmp_file" "$SSH_FRAGMENT"
 }
 
 # If node is specified, use it directly
@@ -99,7 +177,9 @@ else
     fi
 fi
 
-update_host_value "$COMPUTE_HOST" "Hostname" "$TARGET_NODE"
-update_host_value "$COMPUTE_HOST" "Port" "$PORT"
+acquire_fragment_lock || exit 1
+ensure_fragment_included || exit 1
+write_fragment "$COMPUTE_HOST" "$TARGET_NODE" "$PORT" "$SSH_USER" || exit 1
+release_fragment_lock
 
-echo "Updated SSH config for $COMPUTE_HOST ($CLUSTER) with node: $TARGET_NODE and port: $PORT"
+echo "Updated SSH config for $COMPUTE_HOST ($CLUSTER) with node: $TARGET_NODE and port: $PORT in $SSH_FRAGMENT"